@@ -0,0 +1,278 @@
+# app/core/cache.py
+
+"""
+In-process caches and cross-worker invalidation.
+- `TTLCache`: bounded LRU cache whose entries also expire after `ttl` seconds
+- `InvalidationBus`: in-memory bus (single worker, tests); `broadcast` is a no-op
+- `PostgresInvalidationBus`: LISTEN/NOTIFY on the app database, so a write in
+  one uvicorn worker updates/evicts the entry in every other worker
+- `invalidation_bus`: the bus selected by CACHE_BUS, started in `lifespan`
+
+Caches register with the bus by name; messages carry the cache name, the key
+and (when small enough) the new value, so other workers can write through too.
+"""
+
+import asyncio
+import json
+import logging
+import re
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any, Protocol, TypeVar
+
+import asyncpg
+from sqlalchemy import text
+
+from app.core.config import get_settings
+from app.core.database import engine, recent_writers
+from app.core.metrics import record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+NOTIFY_CHANNEL = "app_cache_invalidation"
+
+# NOTIFY payloads are capped at 8000 bytes; larger values are sent as evictions
+_MAX_NOTIFY_VALUE = 6000
+
+
+class TTLCache:
+    """
+    LRU cache with a per-entry time to live. Not thread safe: use it from the
+    event loop only.
+    """
+
+    def __init__(self, name: str, max_entries: int, ttl: float):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] < time.monotonic():
+            del self._entries[key]
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            record_cache_lookup(self.name, hit=False)
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        record_cache_lookup(self.name, hit=True)
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        """Stores `value` for `ttl` seconds (default: the cache's ttl; inf = no expiry)."""
+        if self.max_entries <= 0:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def add(self, key: Hashable, value: Any) -> None:
+        """
+        Sets `key` only if it isn't cached, so a slow read that started before
+        a write can't replace the value the write just stored.
+        """
+        if self._peek(key) is None:
+            self.set(key, value)
+
+    def _peek(self, key: Hashable) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def delete(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def keys(self) -> list[Hashable]:
+        return list(self._entries)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+        }
+
+
+class Invalidatable(Protocol):
+    """Anything the bus can keep in sync (caches, directories...)."""
+
+    name: str
+
+    def set(self, key: str, value: Any) -> None: ...
+
+    def delete(self, key: str) -> None: ...
+
+    def clear(self) -> None: ...
+
+
+CacheT = TypeVar("CacheT", bound=Invalidatable)
+
+
+class InvalidationBus:
+    """
+    Keeps caches in sync after writes. This base class only knows about the
+    current process, which is all a single worker (or a test) needs.
+    Keys are strings, so they arrive in other workers as they were sent.
+    """
+
+    def __init__(self):
+        # Lets a worker ignore its own messages (already applied locally)
+        self.origin = uuid.uuid4().hex
+        self._caches: dict[str, Invalidatable] = {}
+
+    def register(self, cache: CacheT) -> CacheT:
+        self._caches[cache.name] = cache
+        return cache
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def invalidate(self, cache_name: str, key: str | None = None) -> None:
+        """Evicts `key` (or everything when None) here and in other workers."""
+        self._apply(cache_name, key, None)
+        await self.broadcast(cache_name, key)
+
+    async def broadcast(
+        self, cache_name: str, key: str | None, value: bytes | None = None
+    ) -> None:
+        """Tells the other workers about a change already applied locally."""
+
+    def _apply(self, cache_name: str, key: str | None, value: Any) -> None:
+        cache = self._caches.get(cache_name)
+        if cache is None:
+            return
+        if key is None:
+            cache.clear()
+        elif value is None:
+            cache.delete(key)
+        else:
+            cache.set(key, value)
+
+    def clear_all(self) -> None:
+        for cache in self._caches.values():
+            cache.clear()
+
+
+class PostgresInvalidationBus(InvalidationBus):
+    """
+    Broadcasts over Postgres LISTEN/NOTIFY.
+    One dedicated connection per worker listens; messages are sent with
+    `pg_notify` through the regular pool. If the listening connection drops,
+    every registered cache is cleared (messages may have been missed) and the
+    connection is re-established in the background.
+    """
+
+    def __init__(self, dsn: str):
+        super().__init__()
+        # asyncpg wants a plain postgresql:// DSN
+        self.dsn = re.sub(r"^postgresql\+asyncpg:", "postgresql:", dsn)
+        self._conn = None
+        self._reconnect_task: asyncio.Task | None = None
+        self._stopping = False
+
+    async def start(self) -> None:
+        self._stopping = False
+        self._conn = await asyncpg.connect(self.dsn)
+        self._conn.add_termination_listener(self._on_terminated)
+        await self._conn.add_listener(NOTIFY_CHANNEL, self._on_notify)
+
+    async def stop(self) -> None:
+        self._stopping = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+        if self._conn is not None and not self._conn.is_closed():
+            await self._conn.close()
+        self._conn = None
+
+    async def broadcast(
+        self, cache_name: str, key: str | None, value: bytes | None = None
+    ) -> None:
+        message = {"o": self.origin, "c": cache_name, "k": key, "v": None}
+        if isinstance(value, bytes) and len(value) <= _MAX_NOTIFY_VALUE:
+            message["v"] = value.decode()
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(
+                    text("SELECT pg_notify(:channel, :payload)"),
+                    {"channel": NOTIFY_CHANNEL, "payload": json.dumps(message)},
+                )
+                await conn.commit()
+        except Exception:
+            # Other workers fall back to their TTL
+            logger.warning("Cache invalidation broadcast failed", exc_info=True)
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            return
+        if message.get("o") == self.origin:
+            return
+        value = message.get("v")
+        try:
+            self._apply(
+                message.get("c"),
+                message.get("k"),
+                value.encode() if value is not None else None,
+            )
+        except Exception:
+            # A bad message must not kill the listener; the entry runs out
+            # with its TTL
+            logger.exception("Could not apply cache invalidation %r", payload)
+
+    def _on_terminated(self, connection) -> None:
+        if self._stopping:
+            return
+        logger.warning("Cache invalidation listener disconnected; clearing caches")
+        self.clear_all()
+        self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        delay = 1.0
+        while not self._stopping:
+            await asyncio.sleep(delay)
+            try:
+                await self.start()
+            except (OSError, asyncpg.PostgresError):
+                delay = min(delay * 2, 30)
+                continue
+            # Anything cached while disconnected may be stale
+            self.clear_all()
+            logger.info("Cache invalidation listener reconnected")
+            return
+
+
+def create_invalidation_bus() -> InvalidationBus:
+    if settings.CACHE_BUS == "postgres":
+        return PostgresInvalidationBus(settings.DATABASE_URL or "")
+    return InvalidationBus()
+
+
+invalidation_bus = create_invalidation_bus()
+
+# Read-your-writes routing (app.core.database) follows writes in every worker
+invalidation_bus.register(recent_writers)
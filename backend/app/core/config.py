@@ -22,6 +22,131 @@ class Settings(BaseSettings):
 
     FRONTEND_URL: str | None = None
 
+    # Logging
+    LOG_LEVEL: str = "INFO"  # Root logger level
+    LOG_LEVELS: str | None = None  # Per-logger overrides, e.g. "uvicorn.access=WARNING"
+    LOG_FORMAT: str = "json"  # "json" or "text"
+    LOG_QUEUE_SIZE: int = 10_000  # Records buffered before new ones are dropped
+
+    # Database engine / connection pool
+    DB_ECHO: bool = False  # Log every SQL statement (debug only)
+    DB_POOL_SIZE: int = 5  # Persistent connections kept per worker
+    DB_MAX_OVERFLOW: int = 10  # Extra connections allowed above the pool size
+    DB_POOL_TIMEOUT: float = 30  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # Recycle connections older than this (seconds)
+    DB_POOL_PRE_PING: bool = True  # Check connections are alive on checkout
+    DB_STATEMENT_CACHE_SIZE: int = 100  # asyncpg prepared statement cache size
+    DB_POOL_WARMUP: int = 2  # Connections opened on startup (0 disables)
+    DB_AUTO_MIGRATE: bool = True  # Create tables/indexes when the models change
+
+    # Optional subsystems
+    CHAT_ENABLED: bool = True  # Mount /chat (Gemini is only loaded on first use)
+
+    # Health probes
+    HEALTH_CACHE_SECONDS: float = 2  # Reuse a readiness result for this long
+    HEALTH_DB_TIMEOUT: float = 1  # Strict timeout for the readiness DB ping
+    HEALTH_MIN_POOL_HEADROOM: int = 1  # Free connections required to be ready
+    HEALTH_CHECK_CHAT: bool = False  # Also report Gemini upstream reachability
+
+    # Optional read replica for GET handlers (falls back to DATABASE_URL)
+    READ_REPLICA_URL: str | None = None
+    # Route a caller's reads to primary after it writes
+    READ_REPLICA_STICKY_SECONDS: float = 5
+
+    # Per-request SQL instrumentation (Server-Timing header + log line)
+    SQL_INSTRUMENTATION: bool = True
+    SQL_QUERY_BUDGET: int = 15  # Warn when a request runs more queries than this
+    SQL_DB_TIME_BUDGET_MS: float = 250  # Warn when a request spends longer in the DB
+
+    # Prometheus metrics at /metrics
+    METRICS_ENABLED: bool = True
+    METRICS_MULTIPROC_DIR: str | None = None  # Shared dir for multi-worker mode
+
+    # On-demand request profiling (admin `X-Profile: 1` header or sampling)
+    PROFILING_ENABLED: bool = False
+    # e.g. "GET /patients/{patient_number}=100"
+    PROFILING_SAMPLE_ROUTES: str | None = None
+    PROFILING_MAX_PER_MINUTE: int = 6  # Cap on sampled profiles
+    PROFILING_INTERVAL: float = 0.001  # pyinstrument sampling interval (seconds)
+    PROFILING_STORE_SIZE: int = 50  # Reports kept in memory per worker
+
+    # In-process caches
+    # "memory" (one worker) or "postgres" (LISTEN/NOTIFY across workers)
+    CACHE_BUS: str = "memory"
+    PATIENT_CACHE_SIZE: int = 2000  # Serialized patients kept per worker (0 disables)
+    PATIENT_CACHE_TTL: float = 30  # Upper bound on staleness for out-of-band writes
+    SURGEON_DIRECTORY_TTL: float = 300  # Reload the surgeon name/id map this often
+
+    # Analytics
+    ANALYTICS_SECTION_TIMEOUT: float = 5  # Per-section timeout for /analytics/dashboard
+    ANALYTICS_CACHE_SIZE: int = 500  # Cached results per worker (LRU, 0 disables)
+    ANALYTICS_CACHE_LIVE_TTL: float = 15  # TTL for results that include today
+    ANALYTICS_CACHE_HISTORICAL_TTL: float = 21600  # Backstop TTL for past ranges
+    ANALYTICS_TIMESERIES_MAX_POINTS: int = 500  # Wider buckets are used past this
+    # Re-check live status counts against the DB
+    STATUS_COUNTS_RECONCILE_SECONDS: float = 60
+
+    # Status logs
+    # "sync" (same transaction) or "write_behind" (batched, may lose rows on crash)
+    STATUS_LOG_WRITE_MODE: str = "sync"
+    STATUS_LOG_BATCH_SIZE: int = 500  # write_behind: rows per INSERT
+    STATUS_LOG_FLUSH_MS: int = 200  # write_behind: max delay before a batch is written
+    STATUS_LOG_QUEUE_SIZE: int = 10000  # write_behind: queued rows before writers wait
+
+    # Status-change notifications (outbox); a channel is off until configured
+    NOTIFY_STATUSES: str = "Recovery,Complete"  # Comma-separated statuses that notify
+    NOTIFY_WORKERS: int = 2  # Outbox sender tasks per API worker (0 = don't send here)
+    NOTIFY_BATCH_SIZE: int = 20  # Notifications claimed per round
+    NOTIFY_POLL_SECONDS: float = 2  # Idle outbox poll interval
+    # A claimed notification is retried after this if unfinished
+    NOTIFY_LEASE_SECONDS: float = 60
+    NOTIFY_MAX_ATTEMPTS: int = 5  # Then it's dead-lettered
+    NOTIFY_RETRY_BASE_SECONDS: float = 30  # Backoff: base * 2^(attempt-1), capped at 1h
+    NOTIFY_SEND_TIMEOUT: float = 10  # Per delivery
+    SMTP_HOST: str | None = None  # "email" channel (patient's contact email)
+    SMTP_PORT: int = 25
+    SMTP_FROM: str = "noreply@hospital.com"
+    SMTP_USERNAME: str | None = None
+    SMTP_PASSWORD: str | None = None
+    SMTP_STARTTLS: bool = False
+    SMS_GATEWAY_URL: str | None = None  # "sms" channel: JSON POST per message
+    NOTIFY_STAFF_WEBHOOK_URL: str | None = None  # "webhook" channel (ward staff)
+
+    # Periodic jobs (app/core/scheduler.py)
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_TIMEZONE: str = "UTC"  # For cron schedules (e.g. "Europe/Berlin")
+    SCHEDULER_LEADER_RETRY_SECONDS: float = 15  # Leader lock (re)acquisition interval
+    # Warm past-range analytics before the shift
+    ANALYTICS_WARMUP_CRON: str | None = "45 6 * * *"
+    NOTIFY_RETENTION_DAYS: int = 30  # Sent notifications are deleted after this
+
+    # Admission control (app/core/rate_limit.py); per-minute rates per caller
+    RATE_LIMIT_ENABLED: bool = True
+    # "memory" (per worker) or "postgres" (shared by all workers)
+    RATE_LIMIT_BACKEND: str = "memory"
+    # Admissions / status updates (0 = unlimited)
+    RATE_LIMIT_CRITICAL_PER_MINUTE: float = 300
+    RATE_LIMIT_CRITICAL_BURST: int = 60
+    RATE_LIMIT_STANDARD_PER_MINUTE: float = 300  # Other routes
+    RATE_LIMIT_STANDARD_BURST: int = 60
+    RATE_LIMIT_BULK_PER_MINUTE: float = 60  # Analytics, chat, patient search
+    RATE_LIMIT_BULK_BURST: int = 20
+    # Per worker; bulk shed at 50%, standard at 80% (0 = off)
+    LOAD_SHED_MAX_IN_FLIGHT: int = 200
+    LOAD_SHED_RETRY_AFTER: float = 2  # Retry-After (seconds) on 503
+
+    # Idempotency-Key on patient admission / updates
+    IDEMPOTENCY_TTL_HOURS: float = 24  # Stored responses are replayed for this long
+    # A claimed key whose request died is re-run after this
+    IDEMPOTENCY_LEASE_SECONDS: float = 60
+    # Retries wait this long for the first request (then 409)
+    IDEMPOTENCY_WAIT_SECONDS: float = 10
+    # Stored responses kept per worker (LRU, 0 disables)
+    IDEMPOTENCY_CACHE_SIZE: int = 1000
+
+    # OR scheduling
+    SCHEDULE_CONFLICT_CHECK: bool = True  # Reject double-booked rooms / surgeons (409)
+
     class Config:
         env_file = ".env"  # Tells Pydantic to load from .env file
         env_file_encoding = "utf-8"
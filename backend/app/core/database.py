@@ -3,51 +3,441 @@
 """
 Sets up the SQLModel database connection (PostgreSQL).
 Provides:
-- `engine`: low-level DB connection
+- `engine`: low-level DB connection (pool sized from `Settings`)
 - `SessionLocal`: async session factory
-- `get_session`: FastAPI dependency
-- `init_db`: creates tables on startup
+- `read_engine` / `ReadSessionLocal`: optional read replica (or the primary)
+- `get_session`: FastAPI dependency (primary)
+- `get_read_session`: FastAPI dependency for read-only handlers
+- `read_session_factory`: the factory behind it, for several sessions at once
+- `init_db`: schema-version check on startup; creates/patches tables on change
+- `register_schema_patch`: idempotent DDL that `create_all` can't express
+- `warm_up_pool` / `dispose_engine`: pool lifecycle hooks for `lifespan`
+- `get_pool_stats`: pool usage snapshot (checked out, overflow, wait time)
 """
+
+import asyncio
+import hashlib
+import logging
 import re
+import threading
+import time
+from collections import OrderedDict
 from collections.abc import AsyncGenerator
 
+from fastapi import Request
+from jose import JWTError, jwt
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
-from sqlmodel import SQLModel
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.schema import CreateIndex, CreateTable
+from sqlmodel import Session, SQLModel
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.config import get_settings
+from app.core.metrics import (
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_OVERFLOW,
+    DB_POOL_SIZE,
+    DB_POOL_WAIT,
+)
+from app.core.query_stats import instrument_engine
+
+logger = logging.getLogger(__name__)
 
 # Load config
 settings = get_settings()
 
-# Transform sync URL to asyncpg-compatible URL
-ASYNC_DATABASE_URL = re.sub(
-    r"^postgresql:", "postgresql+asyncpg:", settings.DATABASE_URL or ""
-)
+
+def _to_async_url(url: str | None) -> str:
+    # Transform sync URL to asyncpg-compatible URL
+    return re.sub(r"^postgresql:", "postgresql+asyncpg:", url or "")
+
+
+ASYNC_DATABASE_URL = _to_async_url(settings.DATABASE_URL)
+
+
+class PoolWaitStats:
+    """
+    Accumulates how long callers waited to check a connection out of the pool.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def observe(self, seconds: float) -> None:
+        DB_POOL_WAIT.observe(seconds)
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            avg = self.total_wait / self.checkouts if self.checkouts else 0.0
+            return {
+                "checkouts": self.checkouts,
+                "wait_avg_ms": round(avg * 1000, 3),
+                "wait_max_ms": round(self.max_wait * 1000, 3),
+                "wait_total_ms": round(self.total_wait * 1000, 3),
+            }
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Default async queue pool that also records checkout wait time and keeps
+    the pool gauges current on every checkout / checkin. In multiprocess
+    metrics mode each worker writes its own gauges this way, not only the
+    worker that happens to serve `/metrics`.
+    """
+
+    # Log under sqlalchemy.pool like the stock pool classes
+    _sqla_logger_namespace = "sqlalchemy.pool.impl.AsyncAdaptedQueuePool"
+
+    # `engine` label of the gauges ("primary" / "replica"); None: not exported
+    label: str | None = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.wait_stats.observe(time.perf_counter() - start)
+            self.update_gauges()
+
+    def _do_return_conn(self, record) -> None:
+        super()._do_return_conn(record)
+        self.update_gauges()
+
+    def recreate(self):
+        # engine.dispose() swaps in a new pool
+        pool = super().recreate()
+        pool.label = self.label
+        pool.update_gauges()
+        return pool
+
+    def update_gauges(self) -> None:
+        if self.label is None:
+            return
+        DB_POOL_CHECKED_OUT.labels(engine=self.label).set(self.checkedout())
+        DB_POOL_OVERFLOW.labels(engine=self.label).set(max(self.overflow(), 0))
+        DB_POOL_SIZE.labels(engine=self.label).set(self.size())
+
+
+def _create_engine(url: str, label: str | None = None):
+    async_engine = create_async_engine(
+        url,
+        # DB_ECHO is applied to the "sqlalchemy.engine" logger in setup_logging
+        # so statements go through the non-blocking log queue.
+        poolclass=InstrumentedPool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args={
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE
+        },
+    )
+    pool = async_engine.sync_engine.pool
+    pool.label = label
+    pool.update_gauges()
+    return async_engine
 
 
 # Create an async DB engine
-engine = create_async_engine(ASYNC_DATABASE_URL, echo=True)
+engine = _create_engine(ASYNC_DATABASE_URL, "primary")
+
+# Read replica engine; the primary doubles as the replica when unset
+read_engine = (
+    _create_engine(_to_async_url(settings.READ_REPLICA_URL), "replica")
+    if settings.READ_REPLICA_URL
+    else engine
+)
+
+if settings.SQL_INSTRUMENTATION:
+    for _target in {engine, read_engine}:
+        instrument_engine(_target)
 
-# Async session factory
+# Async session factories
 SessionLocal = async_sessionmaker(
     bind=engine, class_=AsyncSession, expire_on_commit=False
 )
+ReadSessionLocal = async_sessionmaker(
+    bind=read_engine, class_=AsyncSession, expire_on_commit=False
+)
+
+
+class RecentWriters:
+    """
+    Remembers callers that wrote to the primary in the last `ttl` seconds so
+    their follow-up reads skip the (possibly lagging) replica.
+    Registered with the cache invalidation bus (see `app.core.cache`), so with
+    CACHE_BUS=postgres a write in one worker sends that caller's reads to the
+    primary in every worker. Times are wall-clock, to compare across processes.
+    """
+
+    name = "recent_writers"
+
+    def __init__(self, ttl: float, max_entries: int = 10_000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._writes: OrderedDict[str, float] = OrderedDict()
+
+    def mark(self, key: str, written_at: float | None = None) -> float:
+        written_at = time.time() if written_at is None else written_at
+        if written_at >= self._writes.get(key, 0):
+            self._writes[key] = written_at
+            self._writes.move_to_end(key)
+        while len(self._writes) > self.max_entries:
+            self._writes.popitem(last=False)
+        return written_at
+
+    def wrote_recently(self, key: str) -> bool:
+        written_at = self._writes.get(key)
+        if written_at is None:
+            return False
+        if time.time() - written_at > self.ttl:
+            self._writes.pop(key, None)
+            return False
+        return True
+
+    # Invalidation bus interface; other workers send the write time as bytes
+    def set(self, key: str, value: bytes) -> None:
+        self.mark(key, float(value))
+
+    def delete(self, key: str) -> None:
+        self._writes.pop(key, None)
+
+    def clear(self) -> None:
+        self._writes.clear()
+
+
+recent_writers = RecentWriters(settings.READ_REPLICA_STICKY_SECONDS)
+
+
+def _caller_key(request: Request) -> str:
+    """
+    The JWT `sub` (one entry per user, whichever token they use), else the
+    client address. The token isn't verified here: the key only decides
+    which database serves a read; auth is checked by the route.
+    """
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            subject = jwt.get_unverified_claims(token).get("sub")
+        except JWTError:
+            subject = None
+        if subject:
+            return f"user:{subject}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+async def mark_recent_write(request: Request) -> None:
+    """Sends this caller's reads to the primary, here and in other workers."""
+    from app.core.cache import invalidation_bus  # app.core.cache imports this module
+
+    if read_engine is engine:
+        return
+    key = _caller_key(request)
+    written_at = recent_writers.mark(key)
+    await invalidation_bus.broadcast(
+        recent_writers.name, key, repr(written_at).encode()
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _flag_flush_writes(session, flush_context):
+    session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _flag_dml_writes(orm_execute_state):
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        orm_execute_state.session.info["has_writes"] = True
+
+
+# Idempotent DDL (indexes on existing tables, extensions, constraints...)
+SCHEMA_PATCHES: list[str] = []
+
+# Arbitrary app-wide key for pg_advisory_xact_lock while migrating
+_SCHEMA_LOCK_KEY = 720_034_001
+
+
+def register_schema_patch(statement: str) -> None:
+    """
+    Registers DDL to run when the schema fingerprint changes. Statements must
+    be safe to re-run (`IF NOT EXISTS` and friends).
+    """
+    if statement not in SCHEMA_PATCHES:
+        SCHEMA_PATCHES.append(statement)
+
+
+def schema_fingerprint() -> str:
+    """Hash of the DDL for every SQLModel table, index and schema patch."""
+    dialect = engine.dialect
+    ddl = []
+    for table in SQLModel.metadata.sorted_tables:
+        ddl.append(str(CreateTable(table).compile(dialect=dialect)))
+        ddl.extend(
+            str(CreateIndex(index).compile(dialect=dialect))
+            for index in sorted(table.indexes, key=lambda i: i.name or "")
+        )
+    ddl.extend(SCHEMA_PATCHES)
+    return hashlib.sha256("\n".join(ddl).encode()).hexdigest()
+
+
+async def _stored_fingerprint() -> str | None:
+    try:
+        async with engine.connect() as conn:
+            result = await conn.execute(
+                text("SELECT fingerprint FROM app_schema_version WHERE id = 1")
+            )
+            return result.scalar_one_or_none()
+    except DBAPIError:  # table doesn't exist yet
+        return None
+
+
+def _create_schema(sync_conn) -> None:
+    SQLModel.metadata.create_all(sync_conn)
+    # create_all skips existing tables, including indexes added to them later
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
 
 
 async def init_db():
     """
-    Creates all tables defined using SQLModel.
-    Called once during app startup.
+    Brings the schema up to date on startup.
+    Compares a fingerprint of the models against `app_schema_version` (one
+    cheap SELECT) and only runs `create_all` + schema patches when it changed.
+    Set DB_AUTO_MIGRATE=false to only log the mismatch.
     """
+    fingerprint = schema_fingerprint()
+    if await _stored_fingerprint() == fingerprint:
+        return
+
+    if not settings.DB_AUTO_MIGRATE:
+        logger.warning("Database schema is out of date (DB_AUTO_MIGRATE is off)")
+        return
+
     async with engine.begin() as conn:
-        await conn.run_sync(SQLModel.metadata.create_all)
+        # Serialize workers starting at the same time
+        await conn.execute(
+            text("SELECT pg_advisory_xact_lock(:key)"), {"key": _SCHEMA_LOCK_KEY}
+        )
+        await conn.execute(
+            text(
+                "CREATE TABLE IF NOT EXISTS app_schema_version ("
+                "id integer PRIMARY KEY, fingerprint text NOT NULL, "
+                "applied_at timestamptz NOT NULL DEFAULT now())"
+            )
+        )
+        await conn.run_sync(_create_schema)
+        for statement in SCHEMA_PATCHES:
+            await conn.execute(text(statement))
+        await conn.execute(
+            text(
+                "INSERT INTO app_schema_version (id, fingerprint) VALUES (1, :fp) "
+                "ON CONFLICT (id) DO UPDATE "
+                "SET fingerprint = EXCLUDED.fingerprint, applied_at = now()"
+            ),
+            {"fp": fingerprint},
+        )
+    logger.info("Database schema updated (fingerprint %s)", fingerprint[:12])
+
+
+async def warm_up_pool(connections: int | None = None) -> None:
+    """
+    Opens `connections` pooled connections concurrently so the first requests
+    after a deploy don't pay for TCP/TLS/auth setup.
+    """
+    count = settings.DB_POOL_WARMUP if connections is None else connections
+    count = min(count, settings.DB_POOL_SIZE)
+    if count <= 0:
+        return
+
+    async def _ping(target):
+        async with target.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(
+        *(_ping(target) for target in _engines() for _ in range(count))
+    )
+
+
+async def dispose_engine() -> None:
+    """
+    Closes every pooled connection. Called on app shutdown.
+    """
+    for target in _engines():
+        await target.dispose()
+
+
+def _engines():
+    return [engine] if read_engine is engine else [engine, read_engine]
+
+
+def _pool_snapshot(target) -> dict:
+    pool = target.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        **pool.wait_stats.snapshot(),
+    }
+
+
+def get_pool_stats() -> dict:
+    """
+    Snapshot of the connection pool, used to size workers against the
+    database's connection limit.
+    """
+    stats = _pool_snapshot(engine)
+    if read_engine is not engine:
+        stats["replica"] = _pool_snapshot(read_engine)
+    return stats
 
 
-async def get_session() -> AsyncGenerator[AsyncSession, None]:
+async def get_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
     """
     Yields a DB session.
     To be used inside FastAPI routes via `Depends`.
     """
     async with SessionLocal() as session:
         yield session
+        if session.info.get("has_writes"):
+            await mark_recent_write(request)
+
+
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Yields a session on the read replica for read-only (GET) handlers.
+    Uses the primary when no replica is configured, or when the same caller
+    wrote within the last READ_REPLICA_STICKY_SECONDS (read-your-writes).
+    """
+    async with read_session_factory(request)() as session:
+        yield session
+
+
+def read_session_factory(request: Request) -> async_sessionmaker:
+    """
+    Session factory `get_read_session` would use for this caller, for
+    handlers that open several sessions (e.g. concurrent queries).
+    """
+    if read_engine is engine or recent_writers.wrote_recently(_caller_key(request)):
+        return SessionLocal
+    return ReadSessionLocal
@@ -1,23 +1,146 @@
 # app/core/logging.py
 
+"""
+Non-blocking, structured logging.
+- Every logger writes to a bounded in-memory queue (`DroppingQueueHandler`);
+  a `QueueListener` thread does the actual stdout writes, so a slow log
+  driver can never stall the event loop
+- When the queue is full, records are dropped and counted instead of blocking
+- Records are JSON lines (LOG_FORMAT=json) carrying the request id and any
+  `extra={...}` fields; LOG_FORMAT=text keeps the classic one-line format
+- Levels: LOG_LEVEL for the root logger, LOG_LEVELS for per-logger overrides
+"""
+
+import json
 import logging
+import queue
 import sys
+from contextvars import ContextVar
+from datetime import UTC, datetime
+from logging.handlers import QueueHandler, QueueListener
+
+from app.core.config import get_settings
+from app.core.metrics import LOG_RECORDS_DROPPED
+
+# Request id of the request being handled (set by RequestIdMiddleware)
+request_id_var: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else came from `extra=`
+_RESERVED_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener: QueueListener | None = None
+_stream_handler: logging.Handler | None = None
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamps the current request id on the record (runs in the caller)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, UTC).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and value is not None:
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops (and counts) records instead of blocking."""
+
+    dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
+            LOG_RECORDS_DROPPED.inc()
+
+
+def parse_log_levels(spec: str | None) -> dict[str, str]:
+    """'sqlalchemy.engine=WARNING,uvicorn.access=INFO' -> {logger: level}"""
+    levels = {}
+    for item in (spec or "").split(","):
+        name, _, level = item.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
 
 
 def setup_logging():
     """
     Configures logging for the app.
-    - Console output
-    - Structured and timestamped
-    - Can be extended to file, external systems
+    - Console output through a background thread (QueueHandler/QueueListener)
+    - Structured (JSON) and timestamped, with request ids
+    - Can be extended to file, external systems by adding listener handlers
     """
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s [%(levelname)s] %(name)s - %(message)s",
-        handlers=[logging.StreamHandler(sys.stdout)],
-    )
+    global _listener, _stream_handler
+    settings = get_settings()
+
+    if _listener is not None:  # Already configured (e.g. app re-created in tests)
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if settings.LOG_FORMAT == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(
+            logging.Formatter(
+                "%(asctime)s [%(levelname)s] %(name)s [%(request_id)s] - %(message)s"
+            )
+        )
+
+    queue_handler = DroppingQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+    queue_handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    # Uvicorn installs its own (blocking) stream handlers; send them through the queue
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
 
-    # Control SQLAlchemy logging to avoid duplicates
+    # SQL statement logging is opt-in via DB_ECHO; an INFO level here would make
+    # SQLAlchemy build a log record for every statement.
     sa_logger = logging.getLogger("sqlalchemy.engine")
-    sa_logger.setLevel(logging.INFO)  # Or WARNING to reduce noise
-    sa_logger.propagate = False  # Avoid duplication if root also logs
+    sa_logger.setLevel(logging.INFO if settings.DB_ECHO else logging.WARNING)
+    logging.getLogger("sqlalchemy.pool").setLevel(logging.WARNING)
+
+    for name, level in parse_log_levels(settings.LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+
+    _stream_handler = stream_handler
+    _listener = QueueListener(
+        queue_handler.queue, stream_handler, respect_handler_level=True
+    )
+    _listener.start()
+
+
+def stop_logging():
+    """
+    Flushes queued records and stops the listener thread (on shutdown).
+    Anything logged afterwards is written directly.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+        _stream_handler.addFilter(RequestIdFilter())
+        logging.getLogger().handlers = [_stream_handler]
@@ -0,0 +1,201 @@
+# app/core/metrics.py
+
+"""
+Prometheus metrics (text exposition format, served at `/metrics`).
+- HTTP: per-route request count, latency histogram, in-flight requests
+- DB: connection pool gauges and checkout wait time
+- Caches: hit/miss counters (hit ratio = hits / (hits + misses))
+- Chat: upstream (Gemini) latency
+
+With several uvicorn workers, set METRICS_MULTIPROC_DIR to an empty
+directory that is wiped before the workers start. Each worker then writes its
+samples to mmap'ed files in that directory (no cross-process locking) and
+whichever worker serves `/metrics` aggregates all of them.
+"""
+
+import os
+
+from app.core.config import get_settings
+
+_settings = get_settings()
+
+# prometheus_client picks its storage backend at import time
+if _settings.METRICS_MULTIPROC_DIR:
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", _settings.METRICS_MULTIPROC_DIR)
+
+from prometheus_client import (  # noqa: E402
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+# Buckets tuned for API calls: 5ms .. 10s
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# ------------------------------
+# 🌐 HTTP
+# ------------------------------
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests handled, by route template and status code.",
+    ["method", "route", "status"],
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency, by route template.",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being handled.",
+    multiprocess_mode="livesum",
+)
+
+# ------------------------------
+# 🗄️ Database pool
+# ------------------------------
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of the pool.",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "Connections open above the configured pool size.",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_SIZE = Gauge(
+    "db_pool_size",
+    "Configured pool size.",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+
+# ------------------------------
+# 🧠 Caches
+# ------------------------------
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups, by cache name and result (hit/miss).",
+    ["cache", "result"],
+)
+
+# ------------------------------
+# 💬 Chat upstream
+# ------------------------------
+CHAT_UPSTREAM_LATENCY = Histogram(
+    "chat_upstream_duration_seconds",
+    "Latency of Gemini API calls, by outcome.",
+    ["outcome"],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60),
+)
+
+
+# ------------------------------
+# 📝 Logging
+# ------------------------------
+LOG_RECORDS_DROPPED = Counter(
+    "log_records_dropped_total",
+    "Log records dropped because the logging queue was full.",
+)
+
+
+# ------------------------------
+# 📜 Status log writer (write-behind mode)
+# ------------------------------
+STATUS_LOG_QUEUE_DEPTH = Gauge(
+    "status_log_queue_depth",
+    "Status log rows waiting to be written.",
+    multiprocess_mode="livesum",
+)
+STATUS_LOG_FLUSH_FAILURES = Counter(
+    "status_log_flush_failures_total",
+    "Failed status log batch inserts (retried, or split if a row is bad).",
+)
+STATUS_LOG_ROWS_DROPPED = Counter(
+    "status_log_rows_dropped_total",
+    "Queued status log rows the database rejected (logged and dropped).",
+)
+
+# ------------------------------
+# 📣 Notifications (outbox)
+# ------------------------------
+NOTIFICATIONS = Counter(
+    "notifications_total",
+    "Notification delivery attempts, by channel and result (sent/retry/dead).",
+    ["channel", "result"],
+)
+
+# ------------------------------
+# ⏰ Scheduled jobs
+# ------------------------------
+SCHEDULER_JOB_DURATION = Histogram(
+    "scheduler_job_duration_seconds",
+    "Scheduled job run time, by job and outcome (success/failure/timeout).",
+    ["job", "outcome"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 15, 60, 300, 900),
+)
+SCHEDULER_LEADER = Gauge(
+    "scheduler_leader",
+    "1 if this worker runs the leader-only jobs.",
+    multiprocess_mode="livesum",
+)
+
+
+# ------------------------------
+# 🚦 Admission control
+# ------------------------------
+REQUESTS_REJECTED = Counter(
+    "http_requests_rejected_total",
+    "Requests turned away before routing, by route class and reason (rate_limited/shed).",
+    ["route_class", "reason"],
+)
+
+
+# ------------------------------
+# 🔁 Idempotency keys
+# ------------------------------
+IDEMPOTENT_REQUESTS = Counter(
+    "idempotent_requests_total",
+    "Requests sent with an Idempotency-Key, by result "
+    "(executed/replayed/mismatch/in_progress).",
+    ["result"],
+)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """
+    Returns (body, content type) for the `/metrics` endpoint, aggregated
+    across workers in multiprocess mode.
+    """
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead() -> None:
+    """Drops this worker's live gauges from the multiprocess directory."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
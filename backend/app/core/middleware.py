@@ -0,0 +1,166 @@
+# app/core/middleware.py
+
+"""
+Custom ASGI middleware.
+- `QueryStatsMiddleware`: per-request SQL count/time as `Server-Timing` + log line
+- `MetricsMiddleware`: per-route request count, latency and in-flight gauge
+- `RequestIdMiddleware`: request id for log records and the `X-Request-ID` header
+"""
+
+import logging
+import time
+import uuid
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import metrics
+from app.core.config import get_settings
+from app.core.logging import request_id_var
+from app.core.query_stats import reset_request_stats, start_request_stats
+
+logger = logging.getLogger("app.sql")
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Route path template (e.g. `/patients/{patient_number}`) for the request,
+    so per-route figures don't explode into one entry per patient.
+    """
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class QueryStatsMiddleware:
+    """
+    Tracks the SQL statements issued while handling each HTTP request.
+    - Adds a `Server-Timing` header (`db`, `db-slowest`, `app`)
+    - Logs one line per request with the query count and DB time
+    - Warns when a route goes over the configured query / DB time budget
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        settings = get_settings()
+        self.query_budget = settings.SQL_QUERY_BUDGET
+        self.db_time_budget = settings.SQL_DB_TIME_BUDGET_MS / 1000
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats, token = start_request_stats()
+        started = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.total_time * 1000:.2f};desc="{stats.count} queries", '
+                    f"db-slowest;dur={stats.slowest_time * 1000:.2f}, "
+                    f"app;dur={elapsed_ms:.2f}",
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            reset_request_stats(token)
+            self._report(scope, stats)
+
+    def _report(self, scope: Scope, stats) -> None:
+        route = f"{scope['method']} {route_template(scope)}"
+        db_ms = stats.total_time * 1000
+        fields = {
+            "route": route,
+            "queries": stats.count,
+            "db_ms": round(db_ms, 2),
+            "slowest_ms": round(stats.slowest_time * 1000, 2),
+        }
+        over_budget = (
+            stats.count > self.query_budget or stats.total_time > self.db_time_budget
+        )
+        if over_budget:
+            logger.warning(
+                "SQL budget exceeded: %s ran %d queries in %.2fms (budget %d queries / %.0fms); slowest: %s",
+                route,
+                stats.count,
+                db_ms,
+                self.query_budget,
+                self.db_time_budget * 1000,
+                (stats.slowest_statement or "")[:200],
+                extra={**fields, "slowest_statement": stats.slowest_statement},
+            )
+        elif stats.count:
+            logger.info(
+                "SQL %s queries=%d db_ms=%.2f", route, stats.count, db_ms, extra=fields
+            )
+
+
+class MetricsMiddleware:
+    """
+    Records Prometheus request metrics, labelled by route template.
+    """
+
+    def __init__(self, app: ASGIApp, skip_paths: tuple[str, ...] = ("/metrics",)):
+        self.app = app
+        self.skip_paths = skip_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        metrics.HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            metrics.HTTP_IN_FLIGHT.dec()
+            method, route = scope["method"], route_template(scope)
+            metrics.HTTP_LATENCY.labels(method=method, route=route).observe(
+                time.perf_counter() - started
+            )
+            metrics.HTTP_REQUESTS.labels(
+                method=method, route=route, status=str(status_code)
+            ).inc()
+
+
+class RequestIdMiddleware:
+    """
+    Binds a request id (incoming `X-Request-ID`, or a new one) to the logging
+    context and echoes it back in the response headers.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = dict(scope["headers"]).get(b"x-request-id", b"").decode()
+        request_id = incoming[:64] or uuid.uuid4().hex
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Request-ID", request_id)
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
@@ -0,0 +1,240 @@
+# app/core/profiling.py
+
+"""
+On-demand request profiling (admin only, off by default).
+- `ProfilingMiddleware`: profiles a request when
+  - an admin sends `X-Profile: 1` (or `?__profile=1`) with their bearer token, or
+  - the route is listed in PROFILING_SAMPLE_ROUTES (every Nth request, rate limited)
+- `profile_store`: keeps the latest reports in memory for `/profiles`
+
+Uses pyinstrument (sampling, async aware) when installed, otherwise cProfile.
+When PROFILING_ENABLED is false the middleware isn't installed at all.
+"""
+
+import cProfile
+import io
+import logging
+import pstats
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException
+from starlette.datastructures import MutableHeaders
+from starlette.routing import Match, Router
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+from app.core.middleware import route_template
+from app.core.security import decode_access_token
+
+try:
+    from pyinstrument import Profiler
+except ImportError:  # pragma: no cover - optional dependency
+    Profiler = None
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProfileReport:
+    id: str
+    method: str
+    path: str
+    route: str
+    trigger: str  # "admin" | "sampled"
+    engine: str  # "pyinstrument" | "cprofile"
+    duration_ms: float
+    created_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+    _profiler: object = field(default=None, repr=False)
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "trigger": self.trigger,
+            "engine": self.engine,
+            "duration_ms": self.duration_ms,
+            "created_at": self.created_at,
+        }
+
+    def render(self, fmt: str = "text") -> str:
+        """Renders the report as text, or as an HTML flame view (pyinstrument)."""
+        if self.engine == "pyinstrument":
+            if fmt == "html":
+                return self._profiler.output_html()
+            return self._profiler.output_text(unicode=True, show_all=False)
+
+        buffer = io.StringIO()
+        stats = pstats.Stats(self._profiler, stream=buffer)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(60)
+        return buffer.getvalue()
+
+
+class ProfileStore:
+    """Bounded, insertion-ordered store of the most recent reports."""
+
+    def __init__(self, max_reports: int):
+        self.max_reports = max_reports
+        self._reports: OrderedDict[str, ProfileReport] = OrderedDict()
+
+    def add(self, report: ProfileReport) -> None:
+        self._reports[report.id] = report
+        while len(self._reports) > self.max_reports:
+            self._reports.popitem(last=False)
+
+    def get(self, report_id: str) -> ProfileReport | None:
+        return self._reports.get(report_id)
+
+    def list(self) -> list[ProfileReport]:
+        return list(reversed(self._reports.values()))
+
+
+profile_store = ProfileStore(get_settings().PROFILING_STORE_SIZE)
+
+
+class _RateLimiter:
+    """Allows at most `limit` events per rolling minute."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._events: deque[float] = deque()
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        while self._events and now - self._events[0] > 60:
+            self._events.popleft()
+        if len(self._events) >= self.limit:
+            return False
+        self._events.append(now)
+        return True
+
+
+def parse_sample_routes(spec: str | None) -> dict[tuple[str, str], int]:
+    """
+    Parses "GET /patients/{patient_number}=100,GET /analytics/overview/=20"
+    into {("GET", "/patients/{patient_number}"): 100, ...}.
+    """
+    rules: dict[tuple[str, str], int] = {}
+    for item in (spec or "").split(","):
+        if not item.strip():
+            continue
+        target, _, every = item.rpartition("=")
+        method, _, path = target.strip().partition(" ")
+        rules[(method.upper(), path.strip())] = max(int(every), 1)
+    return rules
+
+
+class ProfilingMiddleware:
+    def __init__(self, app: ASGIApp, router: Router):
+        self.app = app
+        self.router = router
+        settings = get_settings()
+        self.rules = parse_sample_routes(settings.PROFILING_SAMPLE_ROUTES)
+        self.interval = settings.PROFILING_INTERVAL
+        self.limiter = _RateLimiter(settings.PROFILING_MAX_PER_MINUTE)
+        self.counters: dict[tuple[str, str], int] = dict.fromkeys(self.rules, 0)
+        self._targets: list | None = None  # (route, rule key), resolved lazily
+        self._cprofile_active = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trigger = self._trigger(scope)
+        if trigger is None or (Profiler is None and self._cprofile_active):
+            await self.app(scope, receive, send)
+            return
+
+        report_id = uuid.uuid4().hex[:12]
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile-Id", report_id)
+            await send(message)
+
+        started = time.perf_counter()
+        if Profiler is not None:
+            engine = "pyinstrument"
+            profiler = Profiler(interval=self.interval, async_mode="enabled")
+            profiler.start()
+            try:
+                await self.app(scope, receive, send_with_id)
+            finally:
+                profiler.stop()
+        else:
+            # cProfile is per thread: concurrent requests on the loop show up too
+            engine = "cprofile"
+            profiler = cProfile.Profile()
+            self._cprofile_active = True
+            profiler.enable()
+            try:
+                await self.app(scope, receive, send_with_id)
+            finally:
+                profiler.disable()
+                self._cprofile_active = False
+
+        route = route_template(scope)
+        profile_store.add(
+            ProfileReport(
+                id=report_id,
+                method=scope["method"],
+                path=scope["path"],
+                route=route,
+                trigger=trigger,
+                engine=engine,
+                duration_ms=round((time.perf_counter() - started) * 1000, 2),
+                _profiler=profiler,
+            )
+        )
+        logger.info(
+            "Stored %s profile %s for %s %s", engine, report_id, scope["method"], route
+        )
+
+    def _trigger(self, scope: Scope) -> str | None:
+        if self._requested_by_admin(scope):
+            return "admin"
+        if self.rules and self._sampled(scope):
+            return "sampled"
+        return None
+
+    def _requested_by_admin(self, scope: Scope) -> bool:
+        headers = dict(scope["headers"])
+        flagged = headers.get(b"x-profile") in (b"1", b"true") or "1" in parse_qs(
+            scope.get("query_string", b"").decode()
+        ).get("__profile", [])
+        if not flagged:
+            return False
+
+        auth = headers.get(b"authorization", b"").decode()
+        scheme, _, token = auth.partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return False
+        try:
+            payload = decode_access_token(token)
+        except HTTPException:
+            return False
+        return payload.get("role") == "admin"
+
+    def _sampled(self, scope: Scope) -> bool:
+        if self._targets is None:
+            # Routes are all registered by the time the first request arrives
+            self._targets = [
+                (route, (method, route.path))
+                for route in self.router.routes
+                for method in getattr(route, "methods", None) or ()
+                if (method, getattr(route, "path", None)) in self.rules
+            ]
+
+        for route, key in self._targets:
+            if key[0] != scope["method"] or route.matches(scope)[0] != Match.FULL:
+                continue
+            self.counters[key] += 1
+            return self.counters[key] % self.rules[key] == 0 and self.limiter.allow()
+        return False
@@ -0,0 +1,78 @@
+# app/core/query_stats.py
+
+"""
+Per-request SQL instrumentation.
+- `QueryStats`: query count, total DB time and slowest statement
+- `start_request_stats` / `reset_request_stats`: bind stats to the current request
+- `instrument_engine`: hooks SQLAlchemy cursor events into the active stats
+"""
+
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    total_time: float = 0.0  # seconds
+    slowest_time: float = 0.0  # seconds
+    slowest_statement: str | None = None
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        if elapsed > self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_statement = statement
+
+
+# Stats for the request being handled; None outside of a request
+_current_stats: ContextVar[QueryStats | None] = ContextVar(
+    "current_query_stats", default=None
+)
+
+
+def start_request_stats():
+    """Binds a fresh QueryStats to the current context, returns (stats, token)."""
+    stats = QueryStats()
+    return stats, _current_stats.set(stats)
+
+
+def reset_request_stats(token) -> None:
+    _current_stats.reset(token)
+
+
+def current_request_stats() -> QueryStats | None:
+    return _current_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start_time"].pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+def _handle_error(exception_context):
+    # Failed statements never reach after_cursor_execute; drop their start time
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        conn.info["query_start_time"].pop()
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Attaches the cursor hooks to an async engine (idempotent)."""
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
@@ -0,0 +1,351 @@
+# app/core/rate_limit.py
+
+"""
+Admission control: per-user rate limits and load shedding.
+- Requests are sorted into route classes by method and path:
+  - "critical": admissions and status updates (`POST /patients/`,
+    `PUT /patients/{patient_number}`)
+  - "bulk": analytics, chat and patient search
+  - "standard": everything else
+  Health checks, `/metrics`, the docs and CORS preflights are never limited.
+- Token buckets per (route class, caller). The caller is the JWT `sub`, or the
+  client address for requests without a valid token. Rates and bursts are
+  configured per class; an empty bucket answers 429 with `Retry-After`.
+- Load shedding: when this worker's in-flight requests reach a class's share
+  of LOAD_SHED_MAX_IN_FLIGHT (bulk 50%, standard 80%, critical 100%), new
+  requests of that class get 503 with `Retry-After`, so dashboards and chat
+  are turned away long before status updates are.
+- Buckets live in memory per worker (RATE_LIMIT_BACKEND=memory) or in an
+  UNLOGGED Postgres table shared by every worker (=postgres). If the shared
+  backend is unavailable, requests are let through.
+
+`rate_limiter` is started / stopped in `lifespan`.
+"""
+
+import asyncio
+import logging
+import math
+import re
+import time
+from dataclasses import dataclass
+
+import asyncpg
+from jose import JWTError, jwt
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.core.database import ASYNC_DATABASE_URL, register_schema_patch
+from app.core.metrics import REQUESTS_REJECTED
+from app.core.scheduler import scheduler
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Paths that are never limited (probes, scraping, docs)
+_EXEMPT_PATHS = re.compile(r"^/(health|metrics|docs|redoc|openapi\.json)(/|$)")
+
+# (methods, path pattern, route class); first match wins
+_ROUTE_CLASSES = (
+    (("POST",), re.compile(r"^/patients/?$"), "critical"),
+    (("PUT",), re.compile(r"^/patients/[^/]+/?$"), "critical"),
+    (None, re.compile(r"^/(analytics|chat)(/|$)"), "bulk"),
+    (None, re.compile(r"^/patients/search/?$"), "bulk"),
+)
+
+# Share of LOAD_SHED_MAX_IN_FLIGHT at which each class starts being shed
+_SHED_AT = {"critical": 1.0, "standard": 0.8, "bulk": 0.5}
+
+# Shared backend: give up (and let the request through) after this long
+_BACKEND_TIMEOUT = 0.25
+
+_BUCKET_TABLE = "rate_limit_bucket"
+
+# Buckets are small and rebuilt on the fly; no need to WAL-log them
+register_schema_patch(
+    f"CREATE UNLOGGED TABLE IF NOT EXISTS {_BUCKET_TABLE} ("
+    "key text PRIMARY KEY, tokens double precision NOT NULL, "
+    "updated_at double precision NOT NULL, granted boolean NOT NULL)"
+)
+
+_NOW = "extract(epoch FROM clock_timestamp())"
+# Parameter types are spelled out, not left to inference from `$2 - 1`
+_REFILLED = f"LEAST($2::float8, b.tokens + ({_NOW} - b.updated_at) * $3::float8)"
+
+# One round trip: refill, then take a token if there is a whole one
+_TAKE_SQL = f"""
+INSERT INTO {_BUCKET_TABLE} AS b (key, tokens, updated_at, granted)
+VALUES ($1, $2::float8 - 1, {_NOW}, true)
+ON CONFLICT (key) DO UPDATE SET
+    tokens = CASE WHEN {_REFILLED} >= 1 THEN {_REFILLED} - 1 ELSE {_REFILLED} END,
+    updated_at = {_NOW},
+    granted = {_REFILLED} >= 1
+RETURNING tokens, granted
+"""
+
+
+@dataclass(frozen=True)
+class RouteClass:
+    name: str
+    rate: float  # tokens per second (0 = no rate limit)
+    burst: int
+    shed_at: float  # in-flight requests (this worker) at which it is shed
+
+
+def classify(method: str, path: str) -> str | None:
+    """Route class for a request, or None if it is exempt."""
+    if method == "OPTIONS" or _EXEMPT_PATHS.match(path):
+        return None
+    for methods, pattern, name in _ROUTE_CLASSES:
+        if (methods is None or method in methods) and pattern.match(path):
+            return name
+    return "standard"
+
+
+class MemoryBucketBackend:
+    """Token buckets in a dict; per worker, so limits apply per worker."""
+
+    # Prune idle buckets once there are this many
+    _PRUNE_AT = 10_000
+
+    def __init__(self):
+        # key -> (tokens, updated at, full again at)
+        self._buckets: dict[str, tuple[float, float, float]] = {}
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        self._buckets.clear()
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        """Takes a token. Returns 0 if granted, else seconds until one is due."""
+        now = time.monotonic()
+        tokens, updated_at, _ = self._buckets.get(key, (burst, now, now))
+        tokens = min(burst, tokens + (now - updated_at) * rate)
+        granted = tokens >= 1
+        if granted:
+            tokens -= 1
+        if len(self._buckets) >= self._PRUNE_AT and key not in self._buckets:
+            self._prune(now)
+        self._buckets[key] = (tokens, now, now + (burst - tokens) / rate)
+        return 0 if granted else (1 - tokens) / rate
+
+    def _prune(self, now: float) -> None:
+        # A bucket that has refilled is the same as no bucket
+        self._buckets = {
+            key: bucket for key, bucket in self._buckets.items() if bucket[2] > now
+        }
+
+
+class PostgresBucketBackend:
+    """
+    Token buckets in an UNLOGGED table, updated with one upsert per request
+    on a small dedicated connection pool, so all workers share the limits.
+    """
+
+    def __init__(self, dsn: str, pool_size: int = 4):
+        # asyncpg wants a plain postgresql:// DSN
+        self.dsn = re.sub(r"^postgresql\+asyncpg:", "postgresql:", dsn)
+        self.pool_size = pool_size
+        self._pool: asyncpg.Pool | None = None
+        self._failing = False
+
+    async def start(self) -> None:
+        self._pool = await asyncpg.create_pool(
+            self.dsn, min_size=1, max_size=self.pool_size
+        )
+
+    async def stop(self) -> None:
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            await pool.close()
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        if self._pool is None:
+            return 0
+        try:
+            async with asyncio.timeout(_BACKEND_TIMEOUT):
+                tokens, granted = await self._pool.fetchrow(
+                    _TAKE_SQL, key, float(burst), rate
+                )
+        except (TimeoutError, OSError, asyncpg.PostgresError, asyncpg.InterfaceError):
+            if not self._failing:
+                logger.warning(
+                    "Rate limit backend unavailable; not limiting", exc_info=True
+                )
+            self._failing = True
+            return 0
+        if self._failing:
+            logger.info("Rate limit backend available again")
+            self._failing = False
+        return 0 if granted else (1 - tokens) / rate
+
+    async def purge(self, idle_seconds: float) -> int:
+        if self._pool is None:
+            return 0
+        result = await self._pool.execute(
+            f"DELETE FROM {_BUCKET_TABLE} WHERE updated_at < {_NOW} - $1",
+            idle_seconds,
+        )
+        return int(result.split()[-1])
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        backend: MemoryBucketBackend | PostgresBucketBackend,
+        classes: dict[str, RouteClass],
+        retry_after: float,
+    ):
+        self.backend = backend
+        self.classes = classes
+        self.retry_after = retry_after
+        self.in_flight = 0
+        # Verifying a JWT costs more than the bucket check; remember the subject
+        # (at most until the token expires)
+        self._subjects = TTLCache("rate_limit_subjects", max_entries=10_000, ttl=60)
+
+    async def start(self) -> None:
+        await self.backend.start()
+
+    async def stop(self) -> None:
+        await self.backend.stop()
+
+    def caller(self, scope: Scope) -> str:
+        """JWT `sub` of the bearer token if valid, else the client address."""
+        authorization = dict(scope["headers"]).get(b"authorization", b"").decode()
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() == "bearer" and token:
+            subject = self._subjects.get(token)
+            if subject is None:
+                try:
+                    payload = jwt.decode(
+                        token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+                    )
+                except JWTError:
+                    payload = {}
+                subject = f"user:{payload['sub']}" if payload.get("sub") else ""
+                ttl = None
+                if isinstance(payload.get("exp"), int | float):
+                    ttl = min(payload["exp"] - time.time(), self._subjects.ttl)
+                self._subjects.set(token, subject, ttl=ttl)
+            if subject:
+                return subject
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
+
+    def shed(self, route_class: RouteClass) -> bool:
+        return self.in_flight >= route_class.shed_at
+
+    async def take(self, route_class: RouteClass, caller: str) -> float:
+        return await self.backend.take(
+            f"{route_class.name}:{caller}", route_class.rate, route_class.burst
+        )
+
+
+class RateLimitMiddleware:
+    """
+    Rejects requests over their caller's rate (429) or that arrive while the
+    worker is too busy for their route class (503), before any work is done.
+    """
+
+    def __init__(self, app: ASGIApp, limiter: "RateLimiter | None" = None):
+        self.app = app
+        self.limiter = limiter or rate_limiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiter
+        name = classify(scope["method"], scope["path"])
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        route_class = limiter.classes[name]
+        if limiter.shed(route_class):
+            REQUESTS_REJECTED.labels(route_class=name, reason="shed").inc()
+            response = _reject(503, "Server busy, retry later", limiter.retry_after)
+            await response(scope, receive, send)
+            return
+
+        wait = 0.0
+        if route_class.rate > 0:
+            wait = await limiter.take(route_class, limiter.caller(scope))
+        if wait > 0:
+            REQUESTS_REJECTED.labels(route_class=name, reason="rate_limited").inc()
+            response = _reject(429, "Too many requests", wait)
+            await response(scope, receive, send)
+            return
+
+        limiter.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.in_flight -= 1
+
+
+def _reject(status_code: int, detail: str, retry_after: float) -> JSONResponse:
+    return JSONResponse(
+        {"detail": detail},
+        status_code=status_code,
+        headers={"Retry-After": str(max(math.ceil(retry_after), 1))},
+    )
+
+
+def create_rate_limiter() -> RateLimiter:
+    max_in_flight = settings.LOAD_SHED_MAX_IN_FLIGHT
+    limits = {
+        "critical": (
+            settings.RATE_LIMIT_CRITICAL_PER_MINUTE,
+            settings.RATE_LIMIT_CRITICAL_BURST,
+        ),
+        "standard": (
+            settings.RATE_LIMIT_STANDARD_PER_MINUTE,
+            settings.RATE_LIMIT_STANDARD_BURST,
+        ),
+        "bulk": (settings.RATE_LIMIT_BULK_PER_MINUTE, settings.RATE_LIMIT_BULK_BURST),
+    }
+    classes = {
+        name: RouteClass(
+            name=name,
+            rate=per_minute / 60,
+            burst=max(burst, 1),
+            shed_at=(
+                max(math.floor(max_in_flight * _SHED_AT[name]), 1)
+                if max_in_flight > 0
+                else math.inf
+            ),
+        )
+        for name, (per_minute, burst) in limits.items()
+    }
+    if settings.RATE_LIMIT_BACKEND == "postgres":
+        backend = PostgresBucketBackend(ASYNC_DATABASE_URL)
+    else:
+        backend = MemoryBucketBackend()
+    return RateLimiter(backend, classes, settings.LOAD_SHED_RETRY_AFTER)
+
+
+rate_limiter = create_rate_limiter()
+
+
+async def purge_idle_buckets() -> None:
+    """Deletes shared buckets idle for an hour (they'd be full again anyway)."""
+    deleted = await rate_limiter.backend.purge(3600)
+    logger.info("Purged %d idle rate limit buckets", deleted)
+
+
+if isinstance(rate_limiter.backend, PostgresBucketBackend):
+    scheduler.add_job(
+        "rate_limit.purge",
+        purge_idle_buckets,
+        every=600,
+        jitter=60,
+        timeout=60,
+        leader_only=True,
+    )
@@ -0,0 +1,299 @@
+# app/core/scheduler.py
+
+"""
+In-process periodic jobs, started from `lifespan`.
+- `scheduler.add_job(name, func, every=... | cron=...)` (or the `@scheduler.job`
+  decorator) registers an async callable; jobs register at import time
+- `every`: seconds between runs; `cron`: 5-field expression
+  ("minute hour day-of-month month day-of-week") in SCHEDULER_TIMEZONE
+- `jitter` adds a random 0..jitter seconds to each wait, so workers and pods
+  don't stampede the database together; `timeout` cancels a run that
+  overruns
+- `leader_only=True` jobs (archival, rollups) run on a single instance:
+  the one holding a Postgres advisory lock (`pg_try_advisory_lock`) on a
+  dedicated connection. If that connection drops, the lock is released and
+  another instance takes over within SCHEDULER_LEADER_RETRY_SECONDS. Jobs
+  that refresh per-worker state (caches, counters) run in every worker.
+
+Runs of the same job never overlap within a process. Durations, failures,
+timeouts and leadership are exported as metrics.
+"""
+
+import asyncio
+import logging
+import random
+import re
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import asyncpg
+
+from app.core.config import get_settings
+from app.core.database import ASYNC_DATABASE_URL
+from app.core.metrics import SCHEDULER_JOB_DURATION, SCHEDULER_LEADER
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# First key of the leader advisory lock (second key: 0)
+_LEADER_LOCK_NAMESPACE = 720_048
+
+JobFunc = Callable[[], Awaitable[object]]
+
+
+class CronSchedule:
+    """
+    Minimal cron matcher: `*`, `*/n`, `a-b`, `a-b/n` and comma lists in each
+    of minute, hour, day of month, month, day of week (0 or 7 = Sunday).
+    As in cron, if both day fields are restricted either one may match.
+    """
+
+    _RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+        self.expression = expression
+        minutes, hours, days, months, weekdays = (
+            self._parse(value, low, high)
+            for value, (low, high) in zip(fields, self._RANGES, strict=True)
+        )
+        self.minutes = sorted(minutes)
+        self.hours = sorted(hours)
+        self.days, self.months = days, months
+        self.weekdays = {day % 7 for day in weekdays}
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    @staticmethod
+    def _parse(value: str, low: int, high: int) -> set[int]:
+        values: set[int] = set()
+        for part in value.split(","):
+            match = re.fullmatch(r"(\*|\d+(?:-\d+)?)(?:/(\d+))?", part)
+            if match is None:
+                raise ValueError(f"Invalid cron field {value!r}")
+            span, step = match.group(1), int(match.group(2) or 1)
+            if span == "*":
+                start, end = low, high
+            else:
+                start, _, end = span.partition("-")
+                start, end = int(start), int(end or start)
+            if not low <= start <= end <= high or step < 1:
+                raise ValueError(f"Cron field {value!r} out of range {low}-{high}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, day: datetime) -> bool:
+        in_month = day.day in self.days
+        in_week = (day.isoweekday() % 7) in self.weekdays
+        if self._any_day:
+            return in_week
+        if self._any_weekday:
+            return in_month
+        return in_month or in_week
+
+    def next_after(self, after: datetime) -> datetime:
+        """
+        First matching minute strictly after `after` (same tzinfo). Around DST
+        changes, a wall time that repeats matches once (its first occurrence)
+        and one that is skipped fires an hour later (02:30 -> 03:30).
+        """
+        start = _instant(after).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        if after.tzinfo is not None:
+            start = start.astimezone(after.tzinfo)
+        day = start.replace(hour=0, minute=0, fold=0)
+        for _ in range(366 * 8):  # covers Feb 29 + weekday combinations
+            if day.month in self.months and self._day_matches(day):
+                for hour in self.hours:
+                    for minute in self.minutes:
+                        candidate = day.replace(hour=hour, minute=minute)
+                        if _instant(candidate) >= _instant(start):
+                            return candidate
+            day += timedelta(days=1)
+        raise ValueError(f"Cron expression never matches: {self.expression!r}")
+
+
+def _instant(value: datetime) -> datetime:
+    # Aware datetimes in the same zone compare by wall time, even across DST
+    return value.astimezone(UTC) if value.tzinfo is not None else value
+
+
+@dataclass
+class Job:
+    name: str
+    func: JobFunc
+    every: float | None = None
+    cron: CronSchedule | None = None
+    jitter: float = 0
+    timeout: float | None = None
+    leader_only: bool = False
+    last_run: datetime | None = field(default=None, repr=False)
+    last_error: str | None = field(default=None, repr=False)
+
+    def seconds_until_next(self) -> float:
+        if self.cron is not None:
+            zone = ZoneInfo(settings.SCHEDULER_TIMEZONE)
+            now = datetime.now(zone)
+            next_run = self.cron.next_after(now)
+            # Subtract in UTC so DST changes are accounted for
+            wait = (next_run.astimezone(UTC) - now.astimezone(UTC)).total_seconds()
+        else:
+            wait = self.every or 0
+        return max(wait, 0) + random.uniform(0, self.jitter)
+
+
+class Scheduler:
+    def __init__(self):
+        self.jobs: dict[str, Job] = {}
+        self.is_leader = False
+        self._tasks: list[asyncio.Task] = []
+        self._conn = None  # leader lock connection
+        # asyncpg wants a plain postgresql:// DSN
+        self.dsn = re.sub(r"^postgresql\+asyncpg:", "postgresql:", ASYNC_DATABASE_URL)
+
+    def add_job(
+        self,
+        name: str,
+        func: JobFunc,
+        every: float | None = None,
+        cron: str | None = None,
+        jitter: float = 0,
+        timeout: float | None = None,
+        leader_only: bool = False,
+    ) -> Job:
+        if (every is None) == (cron is None):
+            raise ValueError(f"Job {name!r} needs exactly one of every= or cron=")
+        if every is not None and every <= 0:
+            raise ValueError(f"Job {name!r}: every= must be positive")
+        job = Job(
+            name=name,
+            func=func,
+            every=every,
+            cron=CronSchedule(cron) if cron else None,
+            jitter=jitter,
+            timeout=timeout,
+            leader_only=leader_only,
+        )
+        self.jobs[name] = job
+        return job
+
+    def job(self, name: str, **options) -> Callable[[JobFunc], JobFunc]:
+        """Decorator form of `add_job`."""
+
+        def register(func: JobFunc) -> JobFunc:
+            self.add_job(name, func, **options)
+            return func
+
+        return register
+
+    async def start(self) -> None:
+        if not settings.SCHEDULER_ENABLED or self._tasks:
+            return
+        if any(job.leader_only for job in self.jobs.values()):
+            self._tasks.append(asyncio.create_task(self._hold_leadership()))
+        self._tasks.extend(
+            asyncio.create_task(self._loop(job), name=f"job:{job.name}")
+            for job in self.jobs.values()
+        )
+        logger.info("Scheduler started (%d jobs)", len(self.jobs))
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._resign()
+
+    async def run_job(self, name: str) -> None:
+        """Runs a job now (tests, admin tooling), regardless of leadership."""
+        await self._execute(self.jobs[name])
+
+    async def _loop(self, job: Job) -> None:
+        while True:
+            await asyncio.sleep(job.seconds_until_next())
+            if job.leader_only and not self.is_leader:
+                continue
+            await self._execute(job)
+
+    async def _execute(self, job: Job) -> None:
+        started = time.perf_counter()
+        outcome = "success"
+        try:
+            async with asyncio.timeout(job.timeout):
+                await job.func()
+            job.last_error = None
+        except TimeoutError:
+            outcome = "timeout"
+            job.last_error = f"timed out after {job.timeout}s"
+            logger.error("Job %s timed out after %ss", job.name, job.timeout)
+        except Exception as e:
+            outcome = "failure"
+            job.last_error = str(e) or type(e).__name__
+            logger.exception("Job %s failed", job.name)
+        job.last_run = datetime.now(UTC)
+        SCHEDULER_JOB_DURATION.labels(job=job.name, outcome=outcome).observe(
+            time.perf_counter() - started
+        )
+
+    async def _hold_leadership(self) -> None:
+        while True:
+            try:
+                if self._conn is None or self._conn.is_closed():
+                    self._set_leader(False)
+                    self._conn = await asyncpg.connect(self.dsn)
+                if self.is_leader:
+                    await self._conn.fetchval("SELECT 1")  # still connected?
+                else:
+                    self._set_leader(
+                        await self._conn.fetchval(
+                            "SELECT pg_try_advisory_lock($1, 0)",
+                            _LEADER_LOCK_NAMESPACE,
+                        )
+                    )
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError):
+                logger.warning("Scheduler leader connection lost", exc_info=True)
+                self._set_leader(False)
+                await self._close_conn()
+            await asyncio.sleep(settings.SCHEDULER_LEADER_RETRY_SECONDS)
+
+    def _set_leader(self, leader: bool) -> None:
+        if leader != self.is_leader:
+            logger.info("Scheduler %s leadership", "acquired" if leader else "lost")
+        self.is_leader = leader
+        SCHEDULER_LEADER.set(1 if leader else 0)
+
+    async def _resign(self) -> None:
+        if self.is_leader and self._conn is not None and not self._conn.is_closed():
+            try:
+                await self._conn.fetchval(
+                    "SELECT pg_advisory_unlock($1, 0)", _LEADER_LOCK_NAMESPACE
+                )
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError):
+                pass  # closing the connection releases it anyway
+        self._set_leader(False)
+        await self._close_conn()
+
+    async def _close_conn(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None and not conn.is_closed():
+            await conn.close()
+
+    def status(self) -> list[dict]:
+        return [
+            {
+                "name": job.name,
+                "schedule": job.cron.expression if job.cron else f"every {job.every}s",
+                "leader_only": job.leader_only,
+                "last_run": job.last_run,
+                "last_error": job.last_error,
+            }
+            for job in self.jobs.values()
+        ]
+
+
+scheduler = Scheduler()
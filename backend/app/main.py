@@ -8,33 +8,72 @@ App entrypoint.
 - Includes routers from each module
 """
 
-import socket
+import asyncio
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.core.cache import invalidation_bus
 from app.core.config import get_settings
-from app.core.database import init_db
+from app.core.database import dispose_engine, init_db, warm_up_pool
 from app.core.exception_handlers import register_exception_handlers
-from app.core.logging import setup_logging
+from app.core.logging import setup_logging, stop_logging
+from app.core.metrics import mark_worker_dead, render_metrics
+from app.core.middleware import (
+    MetricsMiddleware,
+    QueryStatsMiddleware,
+    RequestIdMiddleware,
+)
+from app.core.rate_limit import RateLimitMiddleware, rate_limiter
+from app.core.scheduler import scheduler
+from app.modules.health.service import get_host_info
+from app.modules.notifications.service import outbox_worker
+from app.modules.status.counters import status_counters
+from app.modules.status_logs.service import status_log_writer
+from app.modules.user.directory import surgeon_directory
+from app.shared.utils.serialization import FastJSONResponse
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # ✅ Called on application startup
+    setup_logging()  # no-op unless a previous shutdown stopped the log listener
     await init_db()
+    await warm_up_pool()
+    await rate_limiter.start()  # token buckets (shared ones need a DB pool)
+    await invalidation_bus.start()  # cross-worker cache invalidation
+    await surgeon_directory.load()  # surgeon name <-> id map
+    await status_counters.load()  # live patients-per-status counts
+    await status_log_writer.start()  # no-op unless STATUS_LOG_WRITE_MODE=write_behind
+    await outbox_worker.start()  # sends queued notifications
+    await scheduler.start()  # periodic jobs (leader-only ones on one worker)
+    await asyncio.to_thread(get_host_info)  # resolve host/IP once, off the loop
 
     # ⬅️ Runs the app
     yield
 
+    # ✅ Called on application shutdown
+    await scheduler.stop()
+    await outbox_worker.stop()
+    await status_log_writer.stop()  # flushes queued status logs
+    await invalidation_bus.stop()
+    await rate_limiter.stop()
+    await dispose_engine()
+    mark_worker_dead()
+    stop_logging()
+
 
 def create_app() -> FastAPI:
     # Initialize logging early
     setup_logging()
 
     settings = get_settings()
-    app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
+    app = FastAPI(
+        title=settings.PROJECT_NAME,
+        lifespan=lifespan,
+        default_response_class=FastJSONResponse,  # orjson encoding for every route
+    )
 
     # ✅ ADD CORS MIDDLEWARE
     origins = [
@@ -47,6 +86,10 @@ def create_app() -> FastAPI:
     if settings.FRONTEND_URL:
         origins.append(settings.FRONTEND_URL)
 
+    # ✅ Rate limits + load shedding (inside CORS, so rejections carry CORS headers)
+    if settings.RATE_LIMIT_ENABLED:
+        app.add_middleware(RateLimitMiddleware)
+
     app.add_middleware(
         CORSMiddleware,
         allow_origins=origins,
@@ -55,30 +98,68 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # ✅ Per-request SQL count / DB time (Server-Timing header + log line)
+    if settings.SQL_INSTRUMENTATION:
+        app.add_middleware(QueryStatsMiddleware)
+
+    # ✅ On-demand profiling; not installed at all unless enabled
+    if settings.PROFILING_ENABLED:
+        from app.core.profiling import ProfilingMiddleware
+
+        app.add_middleware(ProfilingMiddleware, router=app.router)
+
+    # ✅ Prometheus request metrics (outermost, so it times everything)
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware)
+
+    # ✅ Request ids for log records (outermost)
+    app.add_middleware(RequestIdMiddleware)
+
     # ✅ Register all exception handlers
     register_exception_handlers(app)
 
     # ✅ Health check at root
     @app.get("/", tags=["health"])
     async def health_check():
-        ip = socket.gethostbyname(socket.gethostname())
+        ip = get_host_info()["ip"]
         return {"message": f"Server is running at {ip} and healthy"}
 
+    # ✅ Prometheus scrape endpoint
+    if settings.METRICS_ENABLED:
+
+        @app.get("/metrics", include_in_schema=False)
+        async def metrics():
+            body, content_type = render_metrics()
+            return Response(content=body, media_type=content_type)
+
     # ✅ Modular routers
+    from app.modules.analytics.api import router as analytics_router
     from app.modules.auth.api import router as auth_router
-    from app.modules.chat_inference.api import router as chat_router
+    from app.modules.health.api import router as health_router
+    from app.modules.notifications.api import router as notifications_router
     from app.modules.patient.api import router as patient_router
+    from app.modules.schedule.api import router as schedule_router
     from app.modules.status.api import router as status_router
     from app.modules.user.api import router as user_router
-    from app.modules.analytics.api import router as analytics_router
 
     app.include_router(auth_router, prefix="/auth", tags=["auth"])
     app.include_router(status_router, prefix="/status", tags=["status"])
     app.include_router(patient_router, prefix="/patients", tags=["patients"])
 
     app.include_router(user_router)
-    app.include_router(chat_router)
+    if settings.CHAT_ENABLED:
+        from app.modules.chat_inference.api import router as chat_router
+
+        app.include_router(chat_router)
     app.include_router(analytics_router)
+    app.include_router(schedule_router)
+    app.include_router(notifications_router)
+    app.include_router(health_router)
+
+    if settings.PROFILING_ENABLED:
+        from app.modules.profiling.api import router as profiling_router
+
+        app.include_router(profiling_router)
 
     return app
 
@@ -1,12 +1,46 @@
-from fastapi import APIRouter, Depends, Query
-from datetime import date
-from typing import Optional
+from datetime import date, datetime, timedelta
+from typing import List, Literal, Optional
 
-from .service import AnalyticsService, get_analytics_service
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.modules.user.schemas import UserRead
+from app.shared.role_checker import require_admin_user
+
+from .cache import analytics_cache, invalidate_analytics
+from .schemas import RecentActivity, StatusDwellTime, StatusTransitions, Timeseries
+from .service import (
+    AnalyticsService,
+    get_analytics_service,
+    get_dashboard,
+    get_session_factory,
+)
 
 router = APIRouter(prefix="/analytics", tags=["Analytics"])
 
 
+@router.get("/dashboard/")
+async def dashboard(
+    start_date: Optional[date] = Query(default=None),
+    end_date: Optional[date] = Query(default=None),
+    since: Optional[datetime] = Query(default=None),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
+):
+    """
+    Overview, recent activity and status breakdown in one call.
+    Sections run concurrently; any that fail or time out come back as null
+    and are listed in `errors`. Pass the previous `recent_activity.latest`
+    as `since` to only receive new status changes.
+    """
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(
+            status_code=400, detail="Start date cannot be after end date"
+        )
+    return await get_dashboard(
+        session_factory, start=start_date, end=end_date, since=since
+    )
+
+
 @router.get("/overview/")
 async def overview(
     start_date: Optional[date] = Query(default=None),
@@ -19,14 +53,61 @@ async def overview(
     return await service.get_overview(start=start_date, end=end_date)
 
 
-@router.get("/recent-activity/")
+@router.get("/recent-activity/", response_model=RecentActivity)
 async def recent_activity(
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: Optional[str] = Query(default=None),
+    since: Optional[datetime] = Query(default=None),
+    service: AnalyticsService = Depends(get_analytics_service),
+):
+    """
+    Latest status changes (newest first, paged with `cursor`, or only those
+    after `since`), today's completed surgeries and the active case count.
+    """
+    return await service.get_recent_activity(limit=limit, cursor=cursor, since=since)
+
+
+@router.get("/dwell-times/", response_model=List[StatusDwellTime])
+async def dwell_times(
+    start_date: Optional[date] = Query(default=None),
+    end_date: Optional[date] = Query(default=None),
+    service: AnalyticsService = Depends(get_analytics_service),
+):
+    """
+    Time spent in each status (p50/p90/p99, mean, max, histogram) for
+    status changes in the date range (or today by default).
+    """
+    return await service.get_dwell_times(start=start_date, end=end_date)
+
+
+@router.get("/transitions/", response_model=StatusTransitions)
+async def transitions(
+    start_date: Optional[date] = Query(default=None),
+    end_date: Optional[date] = Query(default=None),
     service: AnalyticsService = Depends(get_analytics_service),
 ):
     """
-    Get recent activity for today (status changes, completed surgeries, active cases).
+    From -> to status transition counts (forward, skipped steps, backward
+    moves) and the stage funnel for the date range (or today by default).
     """
-    return await service.get_recent_activity()
+    return await service.get_transitions(start=start_date, end=end_date)
+
+
+@router.get("/timeseries/", response_model=Timeseries)
+async def timeseries(
+    metric: Literal["admissions", "completions", "status_changes"] = Query(...),
+    bucket: Literal["15m", "1h", "1d"] = Query(default="1h"),
+    start_date: Optional[date] = Query(default=None),
+    end_date: Optional[date] = Query(default=None),
+    service: AnalyticsService = Depends(get_analytics_service),
+):
+    """
+    Admissions, completions or status changes per time bucket (zero-filled)
+    for the date range (or today by default). Long ranges get wider buckets.
+    """
+    return await service.get_timeseries(
+        metric, bucket=bucket, start=start_date, end=end_date
+    )
 
 
 @router.get("/status-breakdown/")
@@ -37,3 +118,33 @@ async def status_breakdown(
     Get a breakdown of patients by their current status.
     """
     return await service.get_status_breakdown()
+
+
+@router.get("/cache/")
+async def cache_stats(_: UserRead = Depends(require_admin_user)):
+    """
+    Analytics cache stats for this worker (entries, hits, misses, hit ratio). Admins only.
+    """
+    return analytics_cache.stats()
+
+
+@router.delete("/cache/")
+async def invalidate_cache(
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    _: UserRead = Depends(require_admin_user),
+):
+    """
+    Drops cached results covering any day in the range, in every worker
+    (e.g. after backfilling historical data). Admins only.
+    """
+    if start_date > end_date:
+        raise HTTPException(
+            status_code=400, detail="Start date cannot be after end date"
+        )
+    if (end_date - start_date).days > 3660:
+        raise HTTPException(status_code=400, detail="Range is limited to 10 years")
+    span = (end_date - start_date).days + 1
+    days = [start_date + timedelta(days=i) for i in range(span)]
+    await invalidate_analytics(days)
+    return {"invalidated_days": len(days)}
@@ -0,0 +1,92 @@
+# app/modules/analytics/cache.py
+
+"""
+Analytics result cache (per worker), keyed by (endpoint, start, end).
+- Ranges that ended before today can't change on their own: cached until a
+  write (or a backfill) touching one of their days evicts them, with
+  ANALYTICS_CACHE_HISTORICAL_TTL as a backstop for writes that bypass the app
+- Ranges that include today (and range-less results) expire after
+  ANALYTICS_CACHE_LIVE_TTL, and are evicted by any patient write for today
+- LRU-bounded by ANALYTICS_CACHE_SIZE
+
+Evictions go through the invalidation bus with the affected days as the key,
+so every worker drops the same entries.
+"""
+
+from collections.abc import Iterable
+from datetime import date
+from typing import Any
+
+from app.core.cache import TTLCache, invalidation_bus
+from app.core.config import get_settings
+
+settings = get_settings()
+
+CacheKey = tuple[str, date | None, date | None]
+
+
+class AnalyticsCache:
+    name = "analytics"  # invalidation bus channel
+
+    def __init__(self, max_entries: int, live_ttl: float, historical_ttl: float):
+        self.live_ttl = live_ttl
+        self.historical_ttl = historical_ttl
+        self._cache = TTLCache(self.name, max_entries, live_ttl)
+
+    def get(self, endpoint: str, start: date | None = None, end: date | None = None):
+        return self._cache.get((endpoint, start, end))
+
+    def put(
+        self,
+        endpoint: str,
+        start: date | None,
+        end: date | None,
+        value: Any,
+    ) -> Any:
+        historical = end is not None and end < date.today()
+        ttl = self.historical_ttl if historical else self.live_ttl
+        self._cache.set((endpoint, start, end), value, ttl=ttl)
+        return value
+
+    def evict_days(self, days: Iterable[date]) -> int:
+        """Evicts entries whose range covers any of `days` (range-less ones too)."""
+        days = set(days)
+        evicted = 0
+        for key in self._cache.keys():
+            _, start, end = key
+            if start is None or end is None or any(start <= d <= end for d in days):
+                self._cache.delete(key)
+                evicted += 1
+        return evicted
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+    # Invalidation bus interface; keys are comma-separated ISO days
+    def set(self, key, value) -> None:
+        self.delete(key)
+
+    def delete(self, key) -> None:
+        self.evict_days(date.fromisoformat(day) for day in str(key).split(","))
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+analytics_cache = invalidation_bus.register(
+    AnalyticsCache(
+        settings.ANALYTICS_CACHE_SIZE,
+        settings.ANALYTICS_CACHE_LIVE_TTL,
+        settings.ANALYTICS_CACHE_HISTORICAL_TTL,
+    )
+)
+
+
+async def invalidate_analytics(days: Iterable[date | None]) -> None:
+    """
+    Drops cached analytics covering `days` in every worker. Call after writes
+    that change patients / status logs on those days, or after a backfill.
+    """
+    key = ",".join(sorted({day.isoformat() for day in days if day is not None}))
+    if key:
+        await invalidation_bus.invalidate(AnalyticsCache.name, key)
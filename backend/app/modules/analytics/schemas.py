@@ -1,5 +1,7 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional
+from uuid import UUID
+
 from pydantic import BaseModel
 
 
@@ -18,6 +20,7 @@ class StatusCount(BaseModel):
 
 
 class PatientActivityItem(BaseModel):
+    id: UUID
     patient_number: str
     name: str
     previous_status: str | None
@@ -26,6 +29,72 @@ class PatientActivityItem(BaseModel):
 
 
 class RecentActivity(BaseModel):
-    status_changes: List[PatientActivityItem]
-    completed_today: List[str]  # list of patient numbers or names
-    active_cases: List[str]     # list of patient numbers or names
+    status_changes: List[PatientActivityItem]  # newest first
+    next_cursor: Optional[str]  # pass as `cursor` for older changes
+    latest: Optional[datetime]  # pass as `since` for newer changes only
+    status_change_count: int    # status changes today
+    completed_today: List[str]  # patient numbers
+    active_case_count: int
+
+
+class DwellTimeBucket(BaseModel):
+    from_minutes: int
+    to_minutes: Optional[int]  # None for the open-ended last bucket
+    count: int
+
+
+class StatusDwellTime(BaseModel):
+    status: str
+    count: int  # completed stays (the patient moved on)
+    mean_minutes: float
+    p50_minutes: float
+    p90_minutes: float
+    p99_minutes: float
+    max_minutes: float
+    histogram: List[DwellTimeBucket]
+
+
+class StatusTransition(BaseModel):
+    from_status: Optional[str]  # None for the first status of a case
+    to_status: str
+    count: int
+    kind: str  # initial | forward | skipped | backward | repeated
+
+
+class FunnelStage(BaseModel):
+    status: str
+    order_index: int
+    patients: int  # distinct patients that entered the status
+    entries: int
+    conversion: Optional[float]  # patients / previous stage's patients
+
+
+class TransitionTotals(BaseModel):
+    transitions: int
+    initial: int
+    forward: int
+    skipped: int
+    skipped_steps: int
+    backward: int
+    repeated: int
+
+
+class StatusTransitions(BaseModel):
+    statuses: List[str]  # in stage order
+    matrix: List[StatusTransition]
+    funnel: List[FunnelStage]
+    totals: TransitionTotals
+
+
+class TimeseriesPoint(BaseModel):
+    t: datetime  # bucket start (UTC)
+    count: int
+
+
+class Timeseries(BaseModel):
+    metric: str
+    bucket: str  # bucket actually used (may be wider than requested)
+    requested_bucket: str
+    bucket_seconds: int
+    total: int
+    points: List[TimeseriesPoint]
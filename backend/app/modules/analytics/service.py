@@ -1,12 +1,169 @@
-from datetime import datetime, timedelta, date
+import asyncio
+import base64
+import logging
+import math
+import time
+import uuid
+from datetime import UTC, date, datetime, timedelta
 from typing import Optional
-from sqlmodel import select, func
+
+from fastapi import Depends, HTTPException, Request
+from sqlalchemy import text, tuple_
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.sql.functions import concat
+from sqlmodel import func, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core.config import get_settings
+from app.core.database import ReadSessionLocal, get_read_session, read_session_factory
+from app.core.scheduler import scheduler
+from app.modules.analytics.cache import analytics_cache
 from app.modules.patient.models import Patient
-from app.modules.status_logs.models import StatusLog
+from app.modules.status.counters import status_counters
 from app.modules.status.models import Status
-import uuid
+from app.modules.status_logs.models import StatusLog
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+
+def resolve_date_range(
+    start: Optional[date] = None, end: Optional[date] = None
+) -> tuple[date, date]:
+    """
+    Fills in a missing start/end the way every analytics endpoint does.
+    """
+    # Case: neither start nor end is provided → today only
+    if not start and not end:
+        start = end = date.today()
+
+    # Case: only end is provided → from a very early date to end
+    if not start and end:
+        # Optional: you can query earliest Patient.created_at here dynamically
+        # or hardcode a sensible default
+        start = date(2000, 1, 1)  # assuming safe lower bound
+
+    # Case: only start is provided → from start to till today
+    if start and not end:
+        end = date.today()
+
+    # Sanity check: start must not be after end
+    if start > end:
+        raise HTTPException(
+            status_code=400, detail="Start date cannot be after end date"
+        )
+
+    return start, end
+
+
+# Histogram bucket edges (minutes) for dwell times; the last bucket is open-ended
+DWELL_BUCKETS_MINUTES = (0, 5, 10, 15, 30, 45, 60, 90, 120, 180, 240, 360, 480, 720, 1440)
+
+DWELL_TIMES_SQL = """
+WITH dwell AS (
+    SELECT
+        new_status AS status,
+        changed_at,
+        EXTRACT(EPOCH FROM lead(changed_at) OVER (
+            PARTITION BY patient_id ORDER BY changed_at, id
+        ) - changed_at) / 60 AS minutes
+    FROM statuslog
+    WHERE changed_at >= :start
+),
+in_range AS (
+    SELECT status, minutes FROM dwell
+    WHERE changed_at <= :end AND minutes IS NOT NULL
+),
+stats AS (
+    SELECT
+        status,
+        count(*) AS count,
+        avg(minutes) AS mean_minutes,
+        max(minutes) AS max_minutes,
+        percentile_cont(ARRAY[0.5, 0.9, 0.99]) WITHIN GROUP (ORDER BY minutes)
+            AS percentiles
+    FROM in_range
+    GROUP BY status
+),
+buckets AS (
+    SELECT status, json_object_agg(bucket, n) AS histogram
+    FROM (
+        SELECT status, width_bucket(minutes, CAST(:edges AS float8[])) AS bucket,
+               count(*) AS n
+        FROM in_range
+        GROUP BY 1, 2
+    ) counted
+    GROUP BY status
+)
+SELECT stats.*, buckets.histogram
+FROM stats
+JOIN buckets USING (status)
+LEFT JOIN status ON status.status = stats.status
+ORDER BY status.order_index NULLS LAST, stats.status
+"""
+
+
+def _dwell_bucket_bounds() -> list[tuple[int, int | None]]:
+    edges = DWELL_BUCKETS_MINUTES
+    return [(edges[i], edges[i + 1] if i + 1 < len(edges) else None) for i in range(len(edges))]
+
+
+# Bucket widths for /analytics/timeseries; the requested one is widened along
+# this ladder until the range fits in ANALYTICS_TIMESERIES_MAX_POINTS
+TIMESERIES_BUCKETS = {
+    "15m": timedelta(minutes=15),
+    "30m": timedelta(minutes=30),
+    "1h": timedelta(hours=1),
+    "2h": timedelta(hours=2),
+    "6h": timedelta(hours=6),
+    "12h": timedelta(hours=12),
+    "1d": timedelta(days=1),
+    "7d": timedelta(days=7),
+    "30d": timedelta(days=30),
+}
+
+# Buckets are aligned to this instant (a Monday midnight, so 7d buckets are weeks)
+_TIMESERIES_ORIGIN = datetime(2000, 1, 3)
+
+# metric -> (table, timestamp column, extra condition); fixed strings only
+_TIMESERIES_SOURCES = {
+    "admissions": ("patient", "created_at", ""),
+    "completions": ("statuslog", "changed_at", "AND new_status = 'Complete'"),
+    "status_changes": ("statuslog", "changed_at", ""),
+}
+
+
+def _timeseries_bucket(bucket: str, span: timedelta) -> tuple[str, timedelta]:
+    """
+    Widens `bucket` until `span` fits in ANALYTICS_TIMESERIES_MAX_POINTS
+    buckets; past the ladder, uses a whole number of days.
+    """
+    max_points = max(settings.ANALYTICS_TIMESERIES_MAX_POINTS, 1)
+    labels = list(TIMESERIES_BUCKETS)
+    for label in labels[labels.index(bucket):]:
+        if span / TIMESERIES_BUCKETS[label] <= max_points:
+            return label, TIMESERIES_BUCKETS[label]
+    days = math.ceil(span / timedelta(days=max_points))
+    return f"{days}d", timedelta(days=days)
+
+
+def _transition_kind(
+    from_index: Optional[int], to_index: Optional[int], initial: bool
+) -> tuple[str, int]:
+    """Classifies a transition by stage order; returns (kind, steps skipped)."""
+    if initial:
+        return "initial", 0
+    if from_index is None or to_index is None:  # status no longer seeded
+        return "forward", 0
+    step = to_index - from_index
+    if step == 1:
+        return "forward", 0
+    if step > 1:
+        return "skipped", step - 1
+    if step == 0:
+        return "repeated", 0
+    return "backward", 0
 
 
 class AnalyticsService:
@@ -21,23 +178,11 @@ class AnalyticsService:
         """
         Return summary analytics data for a given date range.
         """
-        # Case: neither start nor end is provided → today only
-        if not start and not end:
-            start = end = date.today()
-
-        # Case: only end is provided → from a very early date to end
-        if not start and end:
-            # Optional: you can query earliest Patient.created_at here dynamically
-            # or hardcode a sensible default
-            start = date(2000, 1, 1)  # assuming safe lower bound
-
-        # Case: only start is provided → from start to till today
-        if start and not end:
-            end = date.today()
+        start, end = resolve_date_range(start, end)
 
-        # Sanity check: start must not be after end
-        if start > end:
-            raise ValueError("Start date cannot be after end date")
+        cached = analytics_cache.get("overview", start, end)
+        if cached is not None:
+            return cached
 
         # Normalize to datetime range
         start_dt = datetime.combine(start, datetime.min.time())
@@ -53,45 +198,37 @@ class AnalyticsService:
 
         # Surgeries scheduled in that range
         surgeries_query = await self.session.exec(
-            select(Patient)
+            select(
+                func.count(),
+                func.count().filter(Patient.status == "Complete"),
+            )
+            .select_from(Patient)
             .where(Patient.scheduled_time.between(start_dt, end_dt))
         )
-        surgeries = surgeries_query.all()
-        surgeries_total = len(surgeries)
-        surgeries_completed = len([s for s in surgeries if s.status == "Complete"])
+        surgeries_total, surgeries_completed = surgeries_query.one()
         surgeries_remaining = surgeries_total - surgeries_completed
 
-        # Average waiting time (from first status to second status)
-        logs_query = await self.session.exec(
-            select(StatusLog)
-            .where(StatusLog.changed_at.between(start_dt, end_dt))
+        # Average waiting time (from first status to second status), for
+        # patients whose first status change is in the range
+        wait_query = await self.session.exec(
+            text(
+                "SELECT CAST(avg(EXTRACT(EPOCH FROM next_at - changed_at)) / 60 AS float8) "
+                "FROM ("
+                "  SELECT changed_at, lead(changed_at) OVER w AS next_at,"
+                "    row_number() OVER w AS position"
+                "  FROM statuslog WHERE patient_id IN ("
+                "    SELECT patient_id FROM statuslog"
+                "    WHERE changed_at BETWEEN :start AND :end)"
+                "  WINDOW w AS (PARTITION BY patient_id ORDER BY changed_at)"
+                ") logs "
+                "WHERE position = 1 AND next_at IS NOT NULL"
+                "  AND changed_at BETWEEN :start AND :end"
+            ),
+            params={"start": start_dt, "end": end_dt},
         )
-        logs = logs_query.all()
-
-        # Fetch ALL status logs (not just filtered by date)
-        logs_query = await self.session.exec(
-            select(StatusLog)
-        )
-        logs = logs_query.all()
-
-        # Map: patient_id -> sorted status logs
-        log_map: dict[UUID, list[StatusLog]] = {}
-        for log in logs:
-            log_map.setdefault(log.patient_id, []).append(log)
+        avg_wait = wait_query.one()[0]
 
-        wait_times = []
-        for logs in log_map.values():
-            # Sort logs chronologically
-            sorted_logs = sorted(logs, key=lambda l: l.changed_at)
-
-            # Ensure at least 2 transitions
-            if len(sorted_logs) >= 2:
-                # Use only if the FIRST transition is within the date range
-                if start_dt <= sorted_logs[0].changed_at <= end_dt:
-                    delta = sorted_logs[1].changed_at - sorted_logs[0].changed_at
-                    wait_times.append(delta.total_seconds() / 60)  # minutes
-
-        avg_wait_time_minute = round(sum(wait_times) / len(wait_times), 2) if wait_times else 0.0
+        avg_wait_time_minute = round(avg_wait, 2) if avg_wait is not None else 0.0
 
         # Active cases (not completed)
         active_query = await self.session.exec(
@@ -102,89 +239,417 @@ class AnalyticsService:
         )
         active_cases = active_query.one()
 
-        return {
+        return analytics_cache.put("overview", start, end, {
             "new_patients": new_patients,
             "surgeries_total": surgeries_total,
             "surgeries_completed": surgeries_completed,
             "surgeries_remaining": surgeries_remaining,
             "avg_wait_time_minutes": avg_wait_time_minute,
             "active_cases": active_cases
-        }
+        })
 
-    async def get_recent_activity(self) -> dict:
+    async def get_recent_activity(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        since: Optional[datetime] = None,
+    ) -> dict:
         """
-        Return today's status changes, completed surgeries, and active cases.
+        Return the latest status changes (newest first, at most `limit`) with
+        today's completed surgeries and active case count.
+        - `cursor`: `next_cursor` of a previous page, for older events
+        - `since`: `latest` of a previous response, for only newer events
         """
+        counts = await self._get_activity_counts()
+
+        statement = (
+            select(
+                StatusLog.id,
+                Patient.patient_number,
+                concat(Patient.first_name, " ", Patient.last_name).label("name"),
+                StatusLog.previous_status,
+                StatusLog.new_status,
+                StatusLog.changed_at,
+            )
+            .join(Patient, Patient.id == StatusLog.patient_id)
+            .order_by(StatusLog.changed_at.desc(), StatusLog.id.desc())
+            .limit(limit + 1)
+        )
+        if since is not None:
+            since = _naive_utc(since)
+            statement = statement.where(StatusLog.changed_at > since)
+        if cursor is not None:
+            changed_at, log_id = _decode_cursor(cursor)
+            statement = statement.where(
+                tuple_(StatusLog.changed_at, StatusLog.id) < (changed_at, log_id)
+            )
+
+        rows = (await self.session.exec(statement)).mappings().all()
+        page = [dict(row) for row in rows[:limit]]
+        has_more = len(rows) > limit
+
+        return {
+            "status_changes": page,
+            "next_cursor": _encode_cursor(page[-1]) if has_more else None,
+            "latest": page[0]["changed_at"] if page else since,
+            **counts,
+        }
+
+    async def _get_activity_counts(self) -> dict:
+        """Today's change count, completed patients and active case count."""
         today = date.today()
+        cached = analytics_cache.get("activity_counts", today, today)
+        if cached is not None:
+            return cached
+
         start_dt = datetime.combine(today, datetime.min.time())
         end_dt = datetime.combine(today, datetime.max.time())
 
         # Status changes today
-        status_log_query = await self.session.exec(
-            select(StatusLog).where(StatusLog.changed_at.between(start_dt, end_dt))
-        )
-        status_changes = status_log_query.all()
+        change_count = (
+            await self.session.exec(
+                select(func.count())
+                .select_from(StatusLog)
+                .where(StatusLog.changed_at.between(start_dt, end_dt))
+            )
+        ).one()
 
-        # Completed surgeries today
+        # Completed surgeries today (distinct patients)
         completed_query = await self.session.exec(
-            select(StatusLog)
+            select(Patient.patient_number)
+            .join(StatusLog, StatusLog.patient_id == Patient.id)
             .where(StatusLog.new_status == "Complete")
             .where(StatusLog.changed_at.between(start_dt, end_dt))
+            .distinct()
         )
-        completed_logs  = completed_query.all()
-        completed_today = list({log.patient_id for log in completed_logs})
+        completed_today = completed_query.all()
 
-        # Active cases today
-        active_query = await self.session.exec(
-            select(Patient)
-            .where(Patient.status != "Complete")
-            .where(Patient.created_at <= end_dt)
+        # Active cases (not completed)
+        active_count = (
+            await self.session.exec(
+                select(func.count())
+                .select_from(Patient)
+                .where(Patient.status != "Complete")
+            )
+        ).one()
+
+        return analytics_cache.put("activity_counts", today, today, {
+            "status_change_count": change_count,
+            "completed_today": list(completed_today),
+            "active_case_count": active_count,
+        })
+
+    async def get_dwell_times(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> list[dict]:
+        """
+        Time spent in each status: p50/p90/p99, mean, max and a histogram.
+        A dwell is the gap between a status log and the patient's next one;
+        it counts for the range when the patient entered the status in it.
+        Computed in one SQL statement (window function + percentile_cont).
+        """
+        start, end = resolve_date_range(start, end)
+        cached = analytics_cache.get("dwell_times", start, end)
+        if cached is not None:
+            return cached
+
+        result = await self.session.exec(
+            text(DWELL_TIMES_SQL),
+            params={
+                "start": datetime.combine(start, datetime.min.time()),
+                "end": datetime.combine(end, datetime.max.time()),
+                "edges": list(DWELL_BUCKETS_MINUTES),
+            },
         )
-        active_cases = active_query.all()
 
-        return {
-            "status_changes": [log.dict() for log in status_changes],
-            "completed_today": [p.patient_number for p in completed_today],
-            "active_cases": [p.patient_number for p in active_cases],
-        }
+        dwell_times = []
+        for row in result.mappings():
+            p50, p90, p99 = row["percentiles"]
+            counts = row["histogram"] or {}
+            dwell_times.append(
+                {
+                    "status": row["status"],
+                    "count": row["count"],
+                    "mean_minutes": round(row["mean_minutes"], 2),
+                    "p50_minutes": round(p50, 2),
+                    "p90_minutes": round(p90, 2),
+                    "p99_minutes": round(p99, 2),
+                    "max_minutes": round(row["max_minutes"], 2),
+                    "histogram": [
+                        {"from_minutes": low, "to_minutes": high, "count": counts.get(str(i), 0)}
+                        for i, (low, high) in enumerate(_dwell_bucket_bounds(), start=1)
+                    ],
+                }
+            )
+        return analytics_cache.put("dwell_times", start, end, dwell_times)
 
-    async def get_status_breakdown(self) -> list[dict]:
+    async def get_transitions(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> dict:
         """
-        Aggregate patient statuses, their count, and include status metadata.
+        How patients moved between statuses in the date range: a from -> to
+        count matrix (each pair classified against `Status.order_index`) and
+        a stage funnel (distinct patients entering each status).
+        Both come from one grouped query over the status logs.
         """
-        # Join Patient.status -> Status.status and group by
-        stmt = (
+        start, end = resolve_date_range(start, end)
+        cached = analytics_cache.get("transitions", start, end)
+        if cached is not None:
+            return cached
+
+        statuses = (
+            await self.session.exec(
+                select(Status.status, Status.order_index).order_by(Status.order_index)
+            )
+        ).all()
+        order = {row.status: row.order_index for row in statuses}
+
+        # (previous, new) pairs for the matrix, plus per-new-status rows
+        # (previous_status rolled up) for the funnel
+        per_status = func.grouping(StatusLog.previous_status).label("per_status")
+        result = await self.session.exec(
             select(
-                Patient.status,
-                func.count(Patient.id).label("count"),
-                Status.message,
-                Status.color,
-                Status.order_index
+                StatusLog.previous_status,
+                StatusLog.new_status,
+                per_status,
+                func.count().label("transitions"),
+                func.count(func.distinct(StatusLog.patient_id)).label("patients"),
+            )
+            .where(
+                StatusLog.changed_at.between(
+                    datetime.combine(start, datetime.min.time()),
+                    datetime.combine(end, datetime.max.time()),
+                )
+            )
+            .group_by(
+                func.grouping_sets(
+                    tuple_(StatusLog.previous_status, StatusLog.new_status),
+                    tuple_(StatusLog.new_status),
+                )
             )
-            .join(Status, Patient.status == Status.status)
-            .group_by(Patient.status, Status.message, Status.color, Status.order_index)
         )
 
-        result = await self.session.exec(stmt)
-        breakdown = result.all()
+        matrix, entered = [], {}
+        totals = {"transitions": 0, "initial": 0, "forward": 0, "skipped": 0,
+                  "skipped_steps": 0, "backward": 0, "repeated": 0}
+        for row in result.all():
+            if row.per_status:
+                entered[row.new_status] = (row.patients, row.transitions)
+                continue
+            kind, skipped_steps = _transition_kind(
+                order.get(row.previous_status), order.get(row.new_status),
+                row.previous_status is None,
+            )
+            matrix.append({
+                "from_status": row.previous_status,
+                "to_status": row.new_status,
+                "count": row.transitions,
+                "kind": kind,
+            })
+            totals["transitions"] += row.transitions
+            totals[kind] += row.transitions
+            totals["skipped_steps"] += skipped_steps * row.transitions
+
+        matrix.sort(key=lambda item: (
+            order.get(item["from_status"], -1), order.get(item["to_status"], len(order))
+        ))
 
-        return [
-            {
+        funnel, previous_patients = [], None
+        for row in statuses:
+            patients, entries = entered.get(row.status, (0, 0))
+            funnel.append({
                 "status": row.status,
-                "count": row.count,
-                "message": row.message,
-                "color": row.color,
                 "order_index": row.order_index,
-            }
-            for row in breakdown
-        ]
+                "patients": patients,
+                "entries": entries,
+                # Share of the previous stage's patients that reached this one
+                "conversion": (
+                    round(patients / previous_patients, 3) if previous_patients else None
+                ),
+            })
+            previous_patients = patients
 
-# Dependency shortcut
-from fastapi import Depends
-from app.core.database import get_session
+        return analytics_cache.put("transitions", start, end, {
+            "statuses": list(order),
+            "matrix": matrix,
+            "funnel": funnel,
+            "totals": totals,
+        })
 
-SESSION_DEPENDENCY = Depends(get_session)
+    async def get_timeseries(
+        self,
+        metric: str,
+        bucket: str = "1h",
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> dict:
+        """
+        Counts of `metric` per time bucket over the date range, zero-filled.
+        The bucket is widened (see TIMESERIES_BUCKETS) so a long range never
+        returns more than ANALYTICS_TIMESERIES_MAX_POINTS points.
+        """
+        start, end = resolve_date_range(start, end)
+        cache_key = f"timeseries:{metric}:{bucket}"
+        cached = analytics_cache.get(cache_key, start, end)
+        if cached is not None:
+            return cached
+
+        start_dt = datetime.combine(start, datetime.min.time())
+        end_dt = datetime.combine(end + timedelta(days=1), datetime.min.time())
+        effective_bucket, step = _timeseries_bucket(bucket, end_dt - start_dt)
+
+        table, column, condition = _TIMESERIES_SOURCES[metric]
+        result = await self.session.exec(
+            text(
+                "WITH counts AS ("
+                f"  SELECT date_bin(:step, {column}, :origin) AS bucket, count(*) AS n"
+                f"  FROM {table}"
+                f"  WHERE {column} >= :start AND {column} < :end {condition}"
+                "   GROUP BY 1"
+                ") "
+                "SELECT series.bucket, coalesce(counts.n, 0) AS count "
+                "FROM generate_series("
+                "  date_bin(:step, CAST(:start AS timestamp), :origin),"
+                "  CAST(:end AS timestamp) - interval '1 microsecond', :step"
+                ") AS series(bucket) "
+                "LEFT JOIN counts USING (bucket) "
+                "ORDER BY series.bucket"
+            ),
+            params={
+                "step": step,
+                "origin": _TIMESERIES_ORIGIN,
+                "start": start_dt,
+                "end": end_dt,
+            },
+        )
+        points = [{"t": row.bucket, "count": row.count} for row in result.all()]
+
+        return analytics_cache.put(cache_key, start, end, {
+            "metric": metric,
+            "bucket": effective_bucket,
+            "requested_bucket": bucket,
+            "bucket_seconds": int(step.total_seconds()),
+            "total": sum(point["count"] for point in points),
+            "points": points,
+        })
+
+    async def get_status_breakdown(self) -> list[dict]:
+        """
+        Patients per status with the status metadata, every status included
+        (zeros too) in `order_index` order. Served from the live counters.
+        """
+        return status_counters.breakdown()
+
+def _encode_cursor(row: dict) -> str:
+    raw = f"{row['changed_at'].isoformat()}|{row['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        changed_at, _, log_id = base64.urlsafe_b64decode(cursor).decode().partition("|")
+        return _naive_utc(datetime.fromisoformat(changed_at)), uuid.UUID(log_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+
+
+def _naive_utc(value: datetime) -> datetime:
+    """`changed_at` is stored as naive UTC; aware datetimes are converted to it."""
+    if value.tzinfo is not None:
+        value = value.astimezone(UTC).replace(tzinfo=None)
+    return value
+
+
+async def _run_section(
+    session_factory: async_sessionmaker, method: str, *args
+) -> tuple[object, str | None, float]:
+    """
+    Runs one AnalyticsService method on its own pooled session.
+    Returns (result, error, elapsed ms); the result is None on error/timeout.
+    """
+    started = time.perf_counter()
+    try:
+        async with asyncio.timeout(settings.ANALYTICS_SECTION_TIMEOUT):
+            async with session_factory() as session:
+                result = await getattr(AnalyticsService(session), method)(*args)
+        error = None
+    except TimeoutError:
+        result, error = None, f"timed out after {settings.ANALYTICS_SECTION_TIMEOUT}s"
+    except Exception as e:
+        logger.exception("Dashboard section %s failed", method)
+        result, error = None, str(e) or type(e).__name__
+    return result, error, round((time.perf_counter() - started) * 1000, 2)
+
+
+async def get_dashboard(
+    session_factory: async_sessionmaker,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    since: Optional[datetime] = None,
+) -> dict:
+    """
+    Overview, recent activity and status breakdown in one response.
+    Sections run concurrently on separate connections, so the response takes
+    as long as the slowest one; a section that fails or times out is `null`
+    and listed in `errors`, the others are still returned.
+    """
+    sections = {
+        "overview": ("get_overview", start, end),
+        "recent_activity": ("get_recent_activity", 50, None, since),
+        "status_breakdown": ("get_status_breakdown",),
+    }
+    results = await asyncio.gather(
+        *(_run_section(session_factory, *call) for call in sections.values())
+    )
+
+    dashboard = {"errors": {}, "timings_ms": {}}
+    for name, (result, error, elapsed_ms) in zip(sections, results, strict=True):
+        dashboard[name] = result
+        dashboard["timings_ms"][name] = elapsed_ms
+        if error is not None:
+            dashboard["errors"][name] = error
+    return dashboard
+
+
+async def warm_analytics_cache() -> None:
+    """
+    Computes the past ranges the dashboard asks for most (yesterday, last 7
+    and last 30 days) so the first users of the shift hit the cache. Past
+    ranges stay until a write touches one of their days, or for
+    ANALYTICS_CACHE_HISTORICAL_TTL.
+    """
+    yesterday = date.today() - timedelta(days=1)
+    async with ReadSessionLocal() as session:
+        service = AnalyticsService(session)
+        for days in (1, 7, 30):
+            start = yesterday - timedelta(days=days - 1)
+            await service.get_overview(start, yesterday)
+            await service.get_transitions(start, yesterday)
+            await service.get_dwell_times(start, yesterday)
+
+
+if settings.ANALYTICS_WARMUP_CRON:
+    # Every worker: the analytics cache is per process
+    scheduler.add_job(
+        "analytics.warmup",
+        warm_analytics_cache,
+        cron=settings.ANALYTICS_WARMUP_CRON,
+        jitter=60,
+        timeout=300,
+    )
+
+
+# Dependency shortcut
+SESSION_DEPENDENCY = Depends(get_read_session)
 
 
 def get_analytics_service(session: AsyncSession = SESSION_DEPENDENCY) -> AnalyticsService:
     return AnalyticsService(session)
+
+
+def get_session_factory(request: Request) -> async_sessionmaker:
+    return read_session_factory(request)
@@ -1,12 +1,25 @@
+import asyncio
 import json
-
-import google.generativeai as genai
+import time
+from functools import lru_cache
 
 from app.core.config import get_settings
+from app.core.metrics import CHAT_UPSTREAM_LATENCY
 
-# Configure Gemini
 settings = get_settings()
-genai.configure(api_key=settings.GEMINI_API_KEY)
+
+
+@lru_cache
+def get_genai():
+    """
+    Imports and configures the Gemini SDK on first use.
+    The SDK (grpc, protobuf, google-api-core) takes a large share of worker
+    start-up time, so workers and tests that never chat don't pay for it.
+    """
+    import google.generativeai as genai
+
+    genai.configure(api_key=settings.GEMINI_API_KEY)
+    return genai
 
 
 async def sse_chat_generator(
@@ -31,6 +44,7 @@ async def sse_chat_generator(
         yield f"data: {json.dumps({'status': 'waiting', 'message': 'Waiting for Gemini API response...'})}\n\n"
 
         # Configure model with temperature
+        genai = await asyncio.to_thread(get_genai)  # first call imports the SDK
         model = genai.GenerativeModel(
             "gemini-2.0-flash",
             generation_config={
@@ -53,7 +67,17 @@ async def sse_chat_generator(
         ]
 
         # Generate response
-        response = await model.generate_content_async(conversation)
+        started = time.perf_counter()
+        try:
+            response = await model.generate_content_async(conversation)
+        except Exception:
+            CHAT_UPSTREAM_LATENCY.labels(outcome="error").observe(
+                time.perf_counter() - started
+            )
+            raise
+        CHAT_UPSTREAM_LATENCY.labels(outcome="success").observe(
+            time.perf_counter() - started
+        )
 
         # Successful response
         success_data = json.dumps({"status": "success", "message": response.text})
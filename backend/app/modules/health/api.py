@@ -0,0 +1,55 @@
+# app/modules/health/api.py
+
+# Routes: liveness, readiness (orchestrator probes), pool and job stats (admins)
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Response, status
+
+from app.core.database import get_pool_stats
+from app.core.scheduler import scheduler
+from app.modules.health.service import get_host_info, readiness_checker
+from app.modules.user.schemas import RoleEnum, UserRead
+from app.shared.role_checker import require_roles
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@router.get("/live")
+async def liveness():
+    """
+    The worker is up and its event loop is responsive. No I/O.
+    """
+    return {"status": "alive", **get_host_info()}
+
+
+@router.get("/ready")
+async def readiness(response: Response):
+    """
+    The worker can serve traffic: database reachable within a strict timeout
+    and pool headroom left. Cached briefly so probe storms don't hit the DB.
+    """
+    result = await readiness_checker.check()
+    if result["status"] != "ready":
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return result
+
+
+@router.get("/pool")
+async def pool_stats(
+    _: Annotated[UserRead, Depends(require_roles([RoleEnum.admin]))],
+):
+    """
+    Connection pool usage for this worker. Admins only.
+    """
+    return get_pool_stats()
+
+
+@router.get("/jobs")
+async def job_stats(
+    _: Annotated[UserRead, Depends(require_roles([RoleEnum.admin]))],
+):
+    """
+    Scheduled jobs in this worker: schedule, last run and last error, and
+    whether this worker currently runs the leader-only ones. Admins only.
+    """
+    return {"leader": scheduler.is_leader, "jobs": scheduler.status()}
@@ -0,0 +1,121 @@
+# app/modules/health/service.py
+# Liveness / readiness logic
+
+import asyncio
+import os
+import socket
+import time
+from datetime import UTC, datetime
+from functools import lru_cache
+
+from sqlalchemy import text
+
+from app.core.config import get_settings
+from app.core.database import engine, get_pool_stats
+
+settings = get_settings()
+
+CHAT_UPSTREAM_HOST = "generativelanguage.googleapis.com"
+
+
+@lru_cache
+def get_host_info() -> dict:
+    """
+    Host details, resolved once per worker (the DNS lookup blocks, so it must
+    never run inside a probe).
+    """
+    hostname = socket.gethostname()
+    try:
+        ip = socket.gethostbyname(hostname)
+    except OSError:
+        ip = "unknown"
+    return {
+        "hostname": hostname,
+        "ip": ip,
+        "pid": os.getpid(),
+        "started_at": datetime.now(UTC).isoformat(),
+    }
+
+
+async def _check_database() -> dict:
+    started = time.perf_counter()
+    try:
+        async with asyncio.timeout(settings.HEALTH_DB_TIMEOUT):
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+    except TimeoutError:
+        return {"ok": False, "error": f"timed out after {settings.HEALTH_DB_TIMEOUT}s"}
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
+    return {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+
+def _check_pool() -> dict:
+    stats = get_pool_stats()
+    headroom = (stats["size"] - stats["checked_out"]) + (
+        stats["max_overflow"] - stats["overflow"]
+    )
+    headroom = max(headroom, 0)
+    return {
+        "ok": headroom >= settings.HEALTH_MIN_POOL_HEADROOM,
+        "headroom": headroom,
+        "checked_out": stats["checked_out"],
+        "overflow": stats["overflow"],
+    }
+
+
+async def _check_chat_upstream() -> dict:
+    # A TCP connect is enough to tell the upstream is reachable, and costs no quota
+    if not settings.GEMINI_API_KEY:
+        return {"ok": False, "error": "GEMINI_API_KEY not configured"}
+    started = time.perf_counter()
+    try:
+        async with asyncio.timeout(settings.HEALTH_DB_TIMEOUT):
+            _, writer = await asyncio.open_connection(CHAT_UPSTREAM_HOST, 443)
+            writer.close()
+            await writer.wait_closed()
+    except (TimeoutError, OSError) as e:
+        return {"ok": False, "error": str(e) or type(e).__name__}
+    return {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+
+class ReadinessChecker:
+    """
+    Runs the readiness checks at most once per HEALTH_CACHE_SECONDS; concurrent
+    probes wait for the in-flight check instead of starting their own.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = asyncio.Lock()
+        self._result: dict | None = None
+        self._checked_at = 0.0
+
+    def _fresh(self) -> bool:
+        return (
+            self._result is not None and time.monotonic() - self._checked_at < self.ttl
+        )
+
+    async def check(self) -> dict:
+        if self._fresh():
+            return self._result
+        async with self._lock:
+            if not self._fresh():
+                self._result = await self._run_checks()
+                self._checked_at = time.monotonic()
+        return self._result
+
+    async def _run_checks(self) -> dict:
+        checks = {"database": await _check_database(), "pool": _check_pool()}
+        if settings.HEALTH_CHECK_CHAT:
+            # Reported only: a chat outage shouldn't take the API out of rotation
+            checks["chat"] = await _check_chat_upstream()
+        ready = checks["database"]["ok"] and checks["pool"]["ok"]
+        return {
+            "status": "ready" if ready else "unavailable",
+            "checks": checks,
+            "checked_at": datetime.now(UTC).isoformat(),
+        }
+
+
+readiness_checker = ReadinessChecker(settings.HEALTH_CACHE_SECONDS)
@@ -0,0 +1,22 @@
+from datetime import datetime
+from uuid import UUID
+
+from sqlmodel import Field, SQLModel
+
+
+class IdempotencyRecord(SQLModel, table=True):  # type: ignore
+    """
+    First outcome of a request sent with an `Idempotency-Key`, per user.
+    `state` is running (claimed, `locked_until` is the lease) -> done (the
+    response is stored and replayed until `expires_at`).
+    """
+
+    user_id: UUID = Field(foreign_key="user.id", primary_key=True)
+    key: str = Field(primary_key=True, max_length=255)
+    request_hash: str  # method, path and body
+    state: str = Field(default="running")
+    status_code: int | None = Field(default=None)
+    body: bytes | None = Field(default=None)
+    locked_until: datetime | None = Field(default=None)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime = Field(index=True)
@@ -0,0 +1,286 @@
+# app/modules/idempotency/service.py
+
+"""
+`Idempotency-Key` support for unsafe requests (patient admission / updates).
+- Keys are scoped to the authenticated user. The first request with a key
+  claims it (a `running` row, committed on its own) and runs; its 2xx JSON
+  response is stored for IDEMPOTENCY_TTL_HOURS and replayed, without running
+  anything, to retries with the same method, path and body (marked with
+  `Idempotent-Replayed: true`)
+- A retry that arrives while the first request is still running waits for
+  its outcome, up to IDEMPOTENCY_WAIT_SECONDS (then 409): on the event of
+  the running request in the same worker, by polling the row otherwise
+- Reusing a key for a different request is a 422
+- Failures (exceptions, non-2xx responses) release the key, so a retry runs
+  again. A claim left by a worker that died is re-run once its lease
+  (IDEMPOTENCY_LEASE_SECONDS) lapses.
+
+Stored responses are also kept in a per-worker LRU, so most replays don't
+touch the database.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Annotated
+from uuid import UUID
+
+from fastapi import Header, HTTPException, Request, Response, status
+from sqlalchemy import text
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.core.database import SessionLocal
+from app.core.metrics import IDEMPOTENT_REQUESTS
+from app.core.scheduler import scheduler
+from app.shared.utils.serialization import raw_json_response
+
+from .models import IdempotencyRecord
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+IdempotencyKey = Annotated[
+    str | None, Header(alias="Idempotency-Key", min_length=1, max_length=255)
+]
+
+_TABLE = IdempotencyRecord.__tablename__
+
+# Timestamps are naive UTC
+_NOW = "timezone('utc', now())"
+
+# Takes the key unless another request holds it: a stored response that
+# expired, or a claim for the same request whose lease lapsed, is taken over
+_CLAIM_SQL = f"""
+INSERT INTO {_TABLE} AS r
+    (user_id, key, request_hash, state, locked_until, created_at, expires_at)
+VALUES (
+    :user_id, :key, :request_hash, 'running',
+    {_NOW} + make_interval(secs => :lease), {_NOW},
+    {_NOW} + make_interval(secs => :ttl)
+)
+ON CONFLICT (user_id, key) DO UPDATE SET
+    request_hash = EXCLUDED.request_hash,
+    state = 'running',
+    status_code = NULL,
+    body = NULL,
+    locked_until = EXCLUDED.locked_until,
+    created_at = EXCLUDED.created_at,
+    expires_at = EXCLUDED.expires_at
+WHERE r.expires_at <= {_NOW}
+   OR (r.state = 'running' AND r.locked_until <= {_NOW}
+       AND r.request_hash = EXCLUDED.request_hash)
+RETURNING r.key
+"""
+
+# How often a retry checks on a request running in another worker
+_POLL_INTERVAL = 0.1
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    request_hash: str
+    state: str
+    status_code: int | None = None
+    body: bytes | None = None
+
+
+class IdempotencyStore:
+    def __init__(
+        self,
+        ttl_hours: float,
+        lease_seconds: float,
+        wait_seconds: float,
+        cache_size: int,
+    ):
+        self.ttl = ttl_hours * 3600
+        self.lease = lease_seconds
+        self.wait = wait_seconds
+        # Completed responses by (user id, key); they never change
+        self.responses = TTLCache("idempotency", cache_size, self.ttl)
+        self._running: dict[tuple[UUID, str], asyncio.Event] = {}
+
+    async def run(
+        self,
+        request: Request,
+        key: str | None,
+        user_id: UUID,
+        handler: Callable[[], Awaitable[Response]],
+    ) -> Response:
+        """
+        Runs `handler` once per (user, key) and returns its response, or the
+        stored response of the request that ran first. No key: just runs it.
+        """
+        if key is None:
+            return await handler()
+
+        request_hash = hashlib.sha256(
+            f"{request.method} {request.url.path}\n".encode() + await request.body()
+        ).hexdigest()
+        cache_key = (user_id, key)
+        deadline = time.monotonic() + self.wait
+
+        while True:
+            stored = self.responses.get(cache_key)
+            if stored is None:
+                if await self._claim(user_id, key, request_hash):
+                    IDEMPOTENT_REQUESTS.labels(result="executed").inc()
+                    return await self._execute(cache_key, request_hash, handler)
+                stored = await self._fetch(user_id, key)
+                if stored is None:  # released in the meantime: claim it
+                    continue
+                if stored.state == "done":
+                    self.responses.set(cache_key, stored)
+
+            if stored.request_hash != request_hash:
+                IDEMPOTENT_REQUESTS.labels(result="mismatch").inc()
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail="Idempotency-Key was already used for a different request",
+                )
+            if stored.state == "done":
+                IDEMPOTENT_REQUESTS.labels(result="replayed").inc()
+                response = raw_json_response(stored.body or b"", stored.status_code)
+                response.headers["Idempotent-Replayed"] = "true"
+                return response
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                IDEMPOTENT_REQUESTS.labels(result="in_progress").inc()
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="A request with this Idempotency-Key is still in progress",
+                    headers={"Retry-After": "1"},
+                )
+            await self._wait_for(cache_key, remaining)
+
+    async def _execute(
+        self,
+        cache_key: tuple[UUID, str],
+        request_hash: str,
+        handler: Callable[[], Awaitable[Response]],
+    ) -> Response:
+        done = self._running[cache_key] = asyncio.Event()
+        stored = False
+        try:
+            response = await handler()
+            if 200 <= response.status_code < 300:
+                await self._complete(cache_key, request_hash, response)
+                stored = True
+            return response
+        finally:
+            if not stored:
+                await self._release(cache_key)
+            del self._running[cache_key]
+            done.set()
+
+    async def _wait_for(self, cache_key: tuple[UUID, str], timeout: float) -> None:
+        done = self._running.get(cache_key)
+        if done is None:  # running in another worker: poll its row
+            await asyncio.sleep(min(timeout, _POLL_INTERVAL))
+            return
+        try:
+            async with asyncio.timeout(timeout):
+                await done.wait()
+        except TimeoutError:
+            pass
+
+    async def _claim(self, user_id: UUID, key: str, request_hash: str) -> bool:
+        async with SessionLocal() as session:
+            result = await session.exec(
+                text(_CLAIM_SQL),
+                params={
+                    "user_id": user_id,
+                    "key": key,
+                    "request_hash": request_hash,
+                    "lease": float(self.lease),
+                    "ttl": float(self.ttl),
+                },
+            )
+            claimed = result.first() is not None
+            await session.commit()
+        return claimed
+
+    async def _fetch(self, user_id: UUID, key: str) -> StoredResponse | None:
+        async with SessionLocal() as session:
+            result = await session.exec(
+                text(
+                    f"SELECT request_hash, state, status_code, body FROM {_TABLE} "
+                    f"WHERE user_id = :user_id AND key = :key AND expires_at > {_NOW}"
+                ),
+                params={"user_id": user_id, "key": key},
+            )
+            row = result.mappings().first()
+        return StoredResponse(**row) if row is not None else None
+
+    async def _complete(
+        self, cache_key: tuple[UUID, str], request_hash: str, response: Response
+    ) -> None:
+        user_id, key = cache_key
+        try:
+            async with SessionLocal() as session:
+                await session.exec(
+                    text(
+                        f"UPDATE {_TABLE} SET state = 'done', status_code = :status_code, "
+                        "body = :body, locked_until = NULL "
+                        "WHERE user_id = :user_id AND key = :key"
+                    ),
+                    params={
+                        "user_id": user_id,
+                        "key": key,
+                        "status_code": response.status_code,
+                        "body": bytes(response.body),
+                    },
+                )
+                await session.commit()
+        except Exception:
+            # The work is done and the client gets its response; the claim
+            # runs out with its lease
+            logger.exception("Could not store the response for idempotency key")
+            return
+        self.responses.set(
+            cache_key,
+            StoredResponse(
+                request_hash, "done", response.status_code, bytes(response.body)
+            ),
+        )
+
+    async def _release(self, cache_key: tuple[UUID, str]) -> None:
+        user_id, key = cache_key
+        try:
+            async with SessionLocal() as session:
+                await session.exec(
+                    text(
+                        f"DELETE FROM {_TABLE} WHERE user_id = :user_id "
+                        "AND key = :key AND state = 'running'"
+                    ),
+                    params={"user_id": user_id, "key": key},
+                )
+                await session.commit()
+        except Exception:
+            logger.warning("Could not release idempotency key", exc_info=True)
+
+
+idempotency_store = IdempotencyStore(
+    settings.IDEMPOTENCY_TTL_HOURS,
+    settings.IDEMPOTENCY_LEASE_SECONDS,
+    settings.IDEMPOTENCY_WAIT_SECONDS,
+    settings.IDEMPOTENCY_CACHE_SIZE,
+)
+
+
+@scheduler.job(
+    "idempotency.purge", every=3600, jitter=300, timeout=300, leader_only=True
+)
+async def purge_expired_keys() -> None:
+    """Deletes idempotency keys whose stored response has expired."""
+    async with SessionLocal() as session:
+        result = await session.exec(
+            text(f"DELETE FROM {_TABLE} WHERE expires_at <= {_NOW}")
+        )
+        await session.commit()
+    logger.info("Purged %d expired idempotency keys", result.rowcount)
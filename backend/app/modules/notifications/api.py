@@ -0,0 +1,51 @@
+# app/modules/notifications/api.py
+
+from typing import Annotated
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query
+
+from app.modules.notifications.schemas import NotificationRead, OutboxStats
+from app.modules.notifications.service import (
+    NotificationService,
+    get_notification_service,
+)
+from app.modules.user.schemas import UserRead
+from app.shared.role_checker import require_admin_user
+
+router = APIRouter(prefix="/notifications", tags=["Notifications"])
+
+
+@router.get("/", response_model=OutboxStats)
+async def outbox_stats(
+    current_user: Annotated[UserRead, Depends(require_admin_user)],
+    service: Annotated[NotificationService, Depends(get_notification_service)],
+):
+    """
+    Notifications per outbox state and the configured channels. Admins only.
+    """
+    return await service.stats()
+
+
+@router.get("/dead", response_model=list[NotificationRead])
+async def dead_letters(
+    current_user: Annotated[UserRead, Depends(require_admin_user)],
+    service: Annotated[NotificationService, Depends(get_notification_service)],
+    limit: Annotated[int, Query(ge=1, le=200)] = 50,
+):
+    """
+    Notifications that gave up (newest first), with their last error. Admins only.
+    """
+    return await service.dead_letters(limit=limit)
+
+
+@router.post("/{notification_id}/retry", response_model=NotificationRead)
+async def retry_dead_letter(
+    notification_id: UUID,
+    current_user: Annotated[UserRead, Depends(require_admin_user)],
+    service: Annotated[NotificationService, Depends(get_notification_service)],
+):
+    """
+    Re-queues a dead notification with a fresh attempt budget. Admins only.
+    """
+    return await service.retry(notification_id)
@@ -0,0 +1,36 @@
+from datetime import datetime
+from uuid import UUID, uuid4
+
+from sqlmodel import Field, SQLModel
+
+from app.core.database import register_schema_patch
+
+
+class Notification(SQLModel, table=True):  # type: ignore
+    """
+    Outbox row: written in the transaction that changes the patient, sent
+    later by the outbox workers. `state` is pending -> sending -> sent, or
+    dead after NOTIFY_MAX_ATTEMPTS failures.
+    """
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    patient_id: UUID = Field(foreign_key="patient.id", index=True)
+    event: str  # e.g. "status:Recovery"
+    channel: str  # sender name: email | sms | webhook
+    recipient: str
+    subject: str
+    body: str
+    state: str = Field(default="pending")
+    attempts: int = Field(default=0)
+    available_at: datetime = Field(default_factory=datetime.utcnow)  # next try
+    locked_until: datetime | None = Field(default=None)  # lease while sending
+    last_error: str | None = Field(default=None)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    sent_at: datetime | None = Field(default=None)
+
+
+# Workers only ever look for due rows; keep that scan off sent/dead history
+register_schema_patch(
+    "CREATE INDEX IF NOT EXISTS ix_notification_due ON notification "
+    "(available_at) WHERE state IN ('pending', 'sending')"
+)
@@ -0,0 +1,26 @@
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class OutboxStats(BaseModel):
+    channels: list[str]  # channels with a configured sender
+    states: dict[str, int]  # pending / sending / sent / dead -> count
+
+
+class NotificationRead(BaseModel):
+    id: UUID
+    patient_id: UUID
+    event: str
+    channel: str
+    recipient: str
+    subject: str
+    state: str
+    attempts: int
+    available_at: datetime
+    last_error: str | None
+    created_at: datetime
+    sent_at: datetime | None
+
+    model_config = {"from_attributes": True}
@@ -0,0 +1,126 @@
+# app/modules/notifications/senders.py
+
+"""
+Notification senders, one per channel.
+- `SmtpSender` ("email"): plain SMTP (stdlib `smtplib`, run in a thread)
+- `HttpSender` ("sms", "webhook"): POSTs JSON to an SMS gateway / staff hook
+
+A sender raises on failure; `PermanentSendError` means retrying can't help
+(bad address, 4xx), so the notification is dead-lettered straight away.
+Channels without configuration have no sender and get no notifications.
+Other senders can be added with `register_sender`.
+"""
+
+import asyncio
+import smtplib
+from email.message import EmailMessage
+from typing import Protocol
+
+import httpx
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+class PermanentSendError(Exception):
+    """The notification can never be delivered as is; don't retry it."""
+
+
+class Sender(Protocol):
+    channel: str
+
+    async def send(self, recipient: str, subject: str, body: str) -> None: ...
+
+
+class SmtpSender:
+    channel = "email"
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        sender: str,
+        username: str | None = None,
+        password: str | None = None,
+        starttls: bool = False,
+        timeout: float = 10,
+    ):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+
+    async def send(self, recipient: str, subject: str, body: str) -> None:
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = recipient
+        message["Subject"] = subject
+        message.set_content(body)
+        await asyncio.to_thread(self._send, message)
+
+    def _send(self, message: EmailMessage) -> None:
+        try:
+            with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+                if self.starttls:
+                    smtp.starttls()
+                if self.username:
+                    smtp.login(self.username, self.password or "")
+                smtp.send_message(message)
+        except smtplib.SMTPRecipientsRefused as e:
+            raise PermanentSendError(str(e)) from e
+
+
+class HttpSender:
+    """POSTs {"recipient", "subject", "body"} as JSON to `url`."""
+
+    def __init__(self, channel: str, url: str, timeout: float = 10):
+        self.channel = channel
+        self.url = url
+        self.timeout = timeout
+
+    async def send(self, recipient: str, subject: str, body: str) -> None:
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            response = await client.post(
+                self.url,
+                json={"recipient": recipient, "subject": subject, "body": body},
+            )
+        if 400 <= response.status_code < 500 and response.status_code != 429:
+            raise PermanentSendError(
+                f"{self.url} answered {response.status_code}: {response.text[:200]}"
+            )
+        response.raise_for_status()
+
+
+SENDERS: dict[str, Sender] = {}
+
+
+def register_sender(sender: Sender) -> None:
+    SENDERS[sender.channel] = sender
+
+
+if settings.SMTP_HOST:
+    register_sender(
+        SmtpSender(
+            settings.SMTP_HOST,
+            settings.SMTP_PORT,
+            settings.SMTP_FROM,
+            username=settings.SMTP_USERNAME,
+            password=settings.SMTP_PASSWORD,
+            starttls=settings.SMTP_STARTTLS,
+            timeout=settings.NOTIFY_SEND_TIMEOUT,
+        )
+    )
+if settings.SMS_GATEWAY_URL:
+    register_sender(
+        HttpSender("sms", settings.SMS_GATEWAY_URL, settings.NOTIFY_SEND_TIMEOUT)
+    )
+if settings.NOTIFY_STAFF_WEBHOOK_URL:
+    register_sender(
+        HttpSender(
+            "webhook", settings.NOTIFY_STAFF_WEBHOOK_URL, settings.NOTIFY_SEND_TIMEOUT
+        )
+    )
@@ -0,0 +1,298 @@
+# app/modules/notifications/service.py
+
+"""
+Status-change notifications through a transactional outbox.
+- `enqueue_status_notifications`: adds `Notification` rows to the caller's
+  session, so they commit (or roll back) with the status change itself;
+  nothing is sent in the request
+- `OutboxWorker`: NOTIFY_WORKERS tasks per API worker claim due rows in
+  batches (`FOR UPDATE SKIP LOCKED`, so workers in every process share the
+  table without double-claiming), send them, then mark them sent, schedule
+  a retry with exponential backoff, or dead-letter them after
+  NOTIFY_MAX_ATTEMPTS
+- `NotificationService`: outbox stats and dead-letter retries (admin API)
+
+Claims are leases (NOTIFY_LEASE_SECONDS): rows held by a worker that died
+become due again, so delivery is at least once.
+"""
+
+import asyncio
+import logging
+import random
+from datetime import UTC, datetime
+from uuid import UUID
+
+from fastapi import Depends, HTTPException, status
+from sqlalchemy import text
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import get_settings
+from app.core.database import SessionLocal, get_session
+from app.core.metrics import NOTIFICATIONS
+from app.core.scheduler import scheduler
+from app.modules.patient.models import Patient
+
+from .models import Notification
+from .senders import SENDERS, PermanentSendError
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Timestamps are naive UTC
+_NOW = "timezone('utc', now())"
+
+_CLAIM_SQL = f"""
+UPDATE notification SET
+    state = 'sending',
+    attempts = attempts + 1,
+    locked_until = {_NOW} + make_interval(secs => :lease)
+WHERE id IN (
+    SELECT id FROM notification
+    WHERE (state = 'pending' AND available_at <= {_NOW})
+       OR (state = 'sending' AND locked_until <= {_NOW})  -- lapsed lease
+    ORDER BY available_at
+    LIMIT :batch_size
+    FOR UPDATE SKIP LOCKED
+)
+RETURNING id, channel, recipient, subject, body, attempts
+"""
+
+_MAX_ERROR_LENGTH = 1000
+
+
+def _notify_statuses() -> set[str]:
+    return {s.strip() for s in settings.NOTIFY_STATUSES.split(",") if s.strip()}
+
+
+def enqueue_status_notifications(
+    session: AsyncSession, patient: Patient, new_status: str
+) -> int:
+    """
+    Queues notifications for `patient` entering `new_status` (if it's one of
+    NOTIFY_STATUSES) on every configured channel. Call before the commit
+    that changes the status. Returns the number of rows added.
+    """
+    if new_status not in _notify_statuses():
+        return 0
+
+    name = f"{patient.first_name} {patient.last_name}"
+    subject = f"Patient update: {new_status}"
+    body = f"{name} (patient {patient.patient_number}) is now in '{new_status}'."
+    recipients = {
+        "email": patient.email,  # family contact
+        "sms": patient.phone,
+        "webhook": "ward-staff",
+    }
+
+    added = 0
+    for channel, recipient in recipients.items():
+        if channel not in SENDERS or not recipient:
+            continue
+        session.add(
+            Notification(
+                patient_id=patient.id,
+                event=f"status:{new_status}",
+                channel=channel,
+                recipient=recipient,
+                subject=subject,
+                body=body,
+            )
+        )
+        added += 1
+    return added
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter, capped at an hour."""
+    delay = min(settings.NOTIFY_RETRY_BASE_SECONDS * 2 ** (attempts - 1), 3600)
+    return delay * random.uniform(0.8, 1.2)
+
+
+class OutboxWorker:
+    def __init__(self, workers: int, batch_size: int, poll_interval: float):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        if self._tasks or self.workers <= 0 or not SENDERS:
+            return
+        self._tasks = [
+            asyncio.create_task(self._run(), name=f"outbox-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Stops the workers; rows being sent are released when their lease ends."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def wake(self) -> None:
+        """Checks the outbox now instead of at the next poll."""
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                claimed = await self.run_once()
+            except Exception:
+                logger.warning("Outbox worker iteration failed", exc_info=True)
+                claimed = 0
+            if claimed < self.batch_size:  # caught up: wait for work
+                self._wakeup.clear()
+                try:
+                    async with asyncio.timeout(self.poll_interval):
+                        await self._wakeup.wait()
+                except TimeoutError:
+                    pass
+
+    async def run_once(self) -> int:
+        """Claims one batch of due notifications and sends it. Returns its size."""
+        async with SessionLocal() as session:
+            result = await session.exec(
+                text(_CLAIM_SQL),
+                params={
+                    "lease": float(settings.NOTIFY_LEASE_SECONDS),
+                    "batch_size": self.batch_size,
+                },
+            )
+            batch = result.mappings().all()
+            await session.commit()
+
+        if batch:
+            await asyncio.gather(*(self._deliver(dict(row)) for row in batch))
+        return len(batch)
+
+    async def _deliver(self, row: dict) -> None:
+        sender = SENDERS.get(row["channel"])
+        try:
+            if sender is None:
+                raise PermanentSendError(f"No sender for channel {row['channel']!r}")
+            async with asyncio.timeout(settings.NOTIFY_SEND_TIMEOUT):
+                await sender.send(row["recipient"], row["subject"], row["body"])
+        except Exception as e:
+            permanent = isinstance(e, PermanentSendError)
+            await self._failed(row, f"{type(e).__name__}: {e}", permanent)
+            return
+        await self._finish(
+            row["id"],
+            f"state = 'sent', sent_at = {_NOW}, locked_until = NULL, last_error = NULL",
+        )
+        NOTIFICATIONS.labels(channel=row["channel"], result="sent").inc()
+
+    async def _failed(self, row: dict, error: str, permanent: bool) -> None:
+        error = error[:_MAX_ERROR_LENGTH]
+        if permanent or row["attempts"] >= settings.NOTIFY_MAX_ATTEMPTS:
+            logger.error(
+                "Notification %s dead after %d attempts: %s",
+                row["id"],
+                row["attempts"],
+                error,
+            )
+            await self._finish(
+                row["id"],
+                "state = 'dead', locked_until = NULL, last_error = :error",
+                error=error,
+            )
+            NOTIFICATIONS.labels(channel=row["channel"], result="dead").inc()
+            return
+
+        await self._finish(
+            row["id"],
+            "state = 'pending', locked_until = NULL, last_error = :error, "
+            f"available_at = {_NOW} + make_interval(secs => :delay)",
+            error=error,
+            delay=retry_delay(row["attempts"]),
+        )
+        NOTIFICATIONS.labels(channel=row["channel"], result="retry").inc()
+
+    @staticmethod
+    async def _finish(notification_id: UUID, assignments: str, **params) -> None:
+        # Only while still ours: a lapsed lease may have been re-claimed
+        async with SessionLocal() as session:
+            await session.exec(
+                text(
+                    f"UPDATE notification SET {assignments} "
+                    "WHERE id = :id AND state = 'sending'"
+                ),
+                params={"id": notification_id, **params},
+            )
+            await session.commit()
+
+
+@scheduler.job(
+    "notifications.purge", cron="15 3 * * *", jitter=300, timeout=600, leader_only=True
+)
+async def purge_sent_notifications() -> None:
+    """Deletes notifications sent more than NOTIFY_RETENTION_DAYS ago."""
+    async with SessionLocal() as session:
+        result = await session.exec(
+            text(
+                "DELETE FROM notification WHERE state = 'sent' "
+                f"AND sent_at < {_NOW} - make_interval(days => :days)"
+            ),
+            params={"days": settings.NOTIFY_RETENTION_DAYS},
+        )
+        await session.commit()
+    logger.info("Purged %d sent notifications", result.rowcount)
+
+
+outbox_worker = OutboxWorker(
+    settings.NOTIFY_WORKERS, settings.NOTIFY_BATCH_SIZE, settings.NOTIFY_POLL_SECONDS
+)
+
+
+class NotificationService:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def stats(self) -> dict:
+        """Notifications per state, plus the channels that have a sender."""
+        result = await self.session.exec(
+            select(Notification.state, func.count()).group_by(Notification.state)
+        )
+        return {
+            "channels": sorted(SENDERS),
+            "states": dict(result.all()),
+        }
+
+    async def dead_letters(self, limit: int = 50) -> list[Notification]:
+        result = await self.session.exec(
+            select(Notification)
+            .where(Notification.state == "dead")
+            .order_by(Notification.created_at.desc())
+            .limit(limit)
+        )
+        return list(result.all())
+
+    async def retry(self, notification_id: UUID) -> Notification:
+        """Puts a dead notification back in the queue with a fresh attempt budget."""
+        notification = await self.session.get(Notification, notification_id)
+        if notification is None or notification.state != "dead":
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Dead notification not found",
+            )
+        notification.state = "pending"
+        notification.attempts = 0
+        notification.available_at = datetime.now(UTC).replace(tzinfo=None)
+        self.session.add(notification)
+        await self.session.commit()
+        await self.session.refresh(notification)
+        outbox_worker.wake()
+        return notification
+
+
+SESSION_DEPENDENCY = Depends(get_session)
+
+
+def get_notification_service(
+    session: AsyncSession = SESSION_DEPENDENCY,
+) -> NotificationService:
+    return NotificationService(session)
@@ -3,8 +3,9 @@
 from datetime import date
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Query, Request, status
 
+from app.modules.idempotency.service import IdempotencyKey, idempotency_store
 from app.modules.patient.schemas import (
     PatientCreate,
     PatientCreateResponse,
@@ -12,9 +13,14 @@ from app.modules.patient.schemas import (
     PatientSummary,
     PatientUpdate,
 )
-from app.modules.patient.service import PatientService, get_patient_service
+from app.modules.patient.service import (
+    PatientService,
+    get_patient_read_service,
+    get_patient_service,
+)
 from app.modules.user.schemas import RoleEnum, UserRead
 from app.shared.role_checker import require_admin_user, require_roles
+from app.shared.utils.serialization import json_response, raw_json_response
 
 router = APIRouter()
 
@@ -23,26 +29,45 @@ router = APIRouter()
     "/", response_model=PatientCreateResponse, status_code=status.HTTP_201_CREATED
 )
 async def add_patient(
+    request: Request,
     patient_data: PatientCreate,
     current_user: Annotated[UserRead, Depends(require_admin_user)],
     patient_service: Annotated[PatientService, Depends(get_patient_service)],
+    idempotency_key: IdempotencyKey = None,
 ):
-    return await patient_service.create_patient(
-        patient_data=patient_data, created_by_user_id=current_user.id
+    async def create():
+        return json_response(
+            await patient_service.create_patient(
+                patient_data=patient_data, created_by_user_id=current_user.id
+            ),
+            status_code=status.HTTP_201_CREATED,
+        )
+
+    return await idempotency_store.run(
+        request, idempotency_key, current_user.id, create
     )
 
 
 @router.put("/{patient_number}", response_model=PatientRead)
 async def update_patient_info(
+    request: Request,
     patient_number: str,
     patient_update: PatientUpdate,
     current_user: Annotated[UserRead, Depends(require_admin_user)],
     patient_service: Annotated[PatientService, Depends(get_patient_service)],
+    idempotency_key: IdempotencyKey = None,
 ):
-    return await patient_service.update_patient(
-        patient_number=patient_number,
-        patient_update=patient_update,
-        changed_by_user_id=current_user.id,
+    async def update():
+        return json_response(
+            await patient_service.update_patient(
+                patient_number=patient_number,
+                patient_update=patient_update,
+                changed_by_user_id=current_user.id,
+            )
+        )
+
+    return await idempotency_store.run(
+        request, idempotency_key, current_user.id, update
     )
 
 
@@ -52,9 +77,11 @@ async def get_patient_by_number(
     current_user: Annotated[
         UserRead, Depends(require_roles([RoleEnum.admin, RoleEnum.surgical_team]))
     ],
-    patient_service: Annotated[PatientService, Depends(get_patient_service)],
+    patient_service: Annotated[PatientService, Depends(get_patient_read_service)],
 ):
-    return await patient_service.retrieve_patient(patient_number)
+    return raw_json_response(
+        await patient_service.retrieve_patient_json(patient_number)
+    )
 
 
 @router.get("/", response_model=dict)
@@ -62,11 +89,13 @@ async def get_all_patients(
     current_user: Annotated[
         UserRead, Depends(require_roles([RoleEnum.admin, RoleEnum.surgical_team]))
     ],
-    patient_service: Annotated[PatientService, Depends(get_patient_service)],
+    patient_service: Annotated[PatientService, Depends(get_patient_read_service)],
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
 ) -> Any:
-    return await patient_service.retrieve_all_patients(page=page, limit=limit)
+    return json_response(
+        await patient_service.retrieve_all_patients(page=page, limit=limit)
+    )
 
 
 @router.get("/search/", response_model=list[PatientRead])
@@ -74,27 +103,29 @@ async def search_patients(
     current_user: Annotated[
         UserRead, Depends(require_roles([RoleEnum.admin, RoleEnum.surgical_team]))
     ],
-    patient_service: Annotated[PatientService, Depends(get_patient_service)],
+    patient_service: Annotated[PatientService, Depends(get_patient_read_service)],
     name: str | None = None,
     status: str | None = None,
     scheduled_date: date | None = None,
     surgeon: str | None = None,
 ):
-    return await patient_service.find_patients(
-        name=name, status=status, scheduled_date=scheduled_date, surgeon=surgeon
+    return json_response(
+        await patient_service.find_patients(
+            name=name, status=status, scheduled_date=scheduled_date, surgeon=surgeon
+        )
     )
 
 
 @router.get("/stats/", response_model=dict)
 async def get_patient_stats(
     current_user: Annotated[UserRead, Depends(require_admin_user)],
-    patient_service: Annotated[PatientService, Depends(get_patient_service)],
+    patient_service: Annotated[PatientService, Depends(get_patient_read_service)],
 ):
     return await patient_service.fetch_patient_stats()
 
 
 @router.get("/today-status-board/", response_model=list[PatientSummary])
 async def get_today_patients(
-    patient_service: Annotated[PatientService, Depends(get_patient_service)],
+    patient_service: Annotated[PatientService, Depends(get_patient_read_service)],
 ):
-    return await patient_service.get_today_patients_summary()
+    return json_response(await patient_service.get_today_patients_summary())
@@ -4,6 +4,8 @@ from uuid import UUID, uuid4
 
 from sqlmodel import Field, Relationship, SQLModel
 
+from app.core.database import register_schema_patch
+
 if TYPE_CHECKING:
     from app.modules.status.models import Status
     from app.modules.status_logs.models import StatusLog
@@ -23,11 +25,12 @@ class Patient(SQLModel, table=True):  # type: ignore
     email: str
     procedure: str
     scheduled_time: datetime
+    duration_minutes: int = Field(default=60, sa_column_kwargs={"server_default": "60"})
     surgeon_id: UUID | None = Field(default=None, foreign_key="user.id")
     room_no: str | None = Field(default=None)
     note: str | None = Field(default=None)
     status: str = Field(foreign_key="status.status")
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
     # Relationships
@@ -37,3 +40,9 @@ class Patient(SQLModel, table=True):  # type: ignore
         back_populates="patient",
         sa_relationship_kwargs={"cascade": "all, delete-orphan"},
     )
+
+
+# Added after the table shipped; create_all doesn't alter existing tables
+register_schema_patch(
+    "ALTER TABLE patient ADD COLUMN IF NOT EXISTS duration_minutes integer NOT NULL DEFAULT 60"
+)
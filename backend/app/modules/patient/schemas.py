@@ -15,6 +15,7 @@ class PatientCreate(BaseModel):
     email: str
     procedure: str
     scheduled_time: datetime
+    duration_minutes: int = Field(60, gt=0, le=24 * 60)
     surgeon_name: str | None = Field(None)
     room_no: str | None = Field(None)
     note: str | None = Field(None)
@@ -39,6 +40,7 @@ class PatientRead(BaseModel):
     email: str
     procedure: str
     scheduled_time: datetime
+    duration_minutes: int = 60
     surgeon_name: str | None = None
     room_no: str | None
     note: str | None
@@ -60,6 +62,7 @@ class PatientUpdate(BaseModel):
     email: str | None = None
     procedure: str | None = None
     scheduled_time: datetime | None = None
+    duration_minutes: int | None = Field(None, gt=0, le=24 * 60)
     surgeon_id: UUID | None = None
     room_no: str | None = None
     note: str | None = None
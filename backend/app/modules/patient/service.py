@@ -11,11 +11,55 @@ from sqlalchemy.sql.functions import concat
 from sqlmodel import and_, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.database import get_session
+from app.core.cache import TTLCache, invalidation_bus
+from app.core.config import get_settings
+from app.core.database import get_read_session, get_session
+from app.modules.analytics.cache import invalidate_analytics
+from app.modules.notifications.service import (
+    enqueue_status_notifications,
+    outbox_worker,
+)
 from app.modules.patient.models import Patient
 from app.modules.patient.schemas import PatientRead, PatientSummary
+from app.modules.schedule.service import ScheduleService
+from app.modules.status.counters import current_transaction_id, status_counters
 from app.modules.status_logs.models import StatusLog
-from app.modules.user.models import User
+from app.modules.status_logs.service import status_log_writer
+from app.modules.user.directory import surgeon_directory
+from app.shared.utils.serialization import dumps, row_dicts
+
+settings = get_settings()
+
+# Columns selected for PatientRead / PatientSummary rows; `surgeon_id` is
+# swapped for `surgeon_name` from the surgeon directory (no join on `user`)
+PATIENT_READ_COLUMNS = [
+    getattr(Patient, field)
+    for field in PatientRead.model_fields
+    if field != "surgeon_name"
+] + [Patient.surgeon_id]
+PATIENT_SUMMARY_COLUMNS = [
+    getattr(Patient, field)
+    for field in PatientSummary.model_fields
+    if field != "surgeon_name"
+] + [Patient.surgeon_id]
+
+
+# Updating any of these re-checks the room / surgeon for double booking
+SCHEDULE_FIELDS = {"scheduled_time", "duration_minutes", "room_no", "surgeon_id"}
+
+
+async def with_surgeon_names(rows: list[dict]) -> list[dict]:
+    """Replaces each row's `surgeon_id` with the surgeon's name."""
+    await surgeon_directory.resolve(row["surgeon_id"] for row in rows)
+    for row in rows:
+        row["surgeon_name"] = surgeon_directory.name_for(row.pop("surgeon_id"))
+    return rows
+
+
+# Serialized PatientRead bytes by patient number (kept fresh by update_patient)
+patient_cache = invalidation_bus.register(
+    TTLCache("patient", settings.PATIENT_CACHE_SIZE, settings.PATIENT_CACHE_TTL)
+)
 
 if TYPE_CHECKING:
     from app.modules.patient.schemas import (
@@ -50,22 +94,31 @@ class PatientService:
 
         surgeon_id = None
         if patient_data.surgeon_name:
-            surgeon_result = await self.session.exec(
-                select(User).where(User.name == patient_data.surgeon_name)
-            )
-            surgeon = surgeon_result.first()
+            surgeon_ids = await surgeon_directory.surgeon_ids(patient_data.surgeon_name)
 
-            if not surgeon:
+            if not surgeon_ids:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail=f"Surgeon with name '{patient_data.surgeon_name}' not found.",
                 )
-            surgeon_id = surgeon.id
+            if len(surgeon_ids) > 1:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"Several surgeons are named '{patient_data.surgeon_name}'.",
+                )
+            surgeon_id = surgeon_ids[0]
 
         scheduled_time = patient_data.scheduled_time
         if scheduled_time.tzinfo is not None:
             scheduled_time = scheduled_time.astimezone(UTC).replace(tzinfo=None)
 
+        await ScheduleService(self.session).assert_available(
+            scheduled_time,
+            patient_data.duration_minutes,
+            room_no=patient_data.room_no,
+            surgeon_id=surgeon_id,
+        )
+
         patient = Patient(
             patient_number=patient_number,
             first_name=patient_data.first_name,
@@ -78,6 +131,7 @@ class PatientService:
             email=patient_data.email,
             procedure=patient_data.procedure,
             scheduled_time=scheduled_time,
+            duration_minutes=patient_data.duration_minutes,
             surgeon_id=surgeon_id,
             room_no=patient_data.room_no,
             note=patient_data.note,
@@ -87,20 +141,25 @@ class PatientService:
         )
 
         self.session.add(patient)
-        await self.session.commit()
-        await self.session.refresh(patient)
 
-        # Create initial status log entry
-        status_log = StatusLog(
+        # Initial status log entry (same transaction, or queued: see StatusLogWriter)
+        await status_log_writer.write(
+            self.session,
             patient_id=patient.id,
             previous_status=None,  # No previous status for new patient
-            new_status="Checked In",
+            new_status=patient.status,
             changed_by=created_by_user_id,
-            changed_at=datetime.utcnow(),
         )
 
-        self.session.add(status_log)
+        xid = await current_transaction_id(self.session)
         await self.session.commit()
+        await status_log_writer.committed(self.session)
+        await self.session.refresh(patient)
+        await status_counters.record(None, patient.status, xid)
+
+        await invalidate_analytics(
+            {date.today(), patient.created_at.date(), scheduled_time.date()}
+        )
 
         return {
             "patient_number": patient.patient_number,
@@ -113,7 +172,7 @@ class PatientService:
         patient_number: str,
         patient_update: "PatientUpdate",
         changed_by_user_id: UUID,
-    ) -> "PatientRead":
+    ) -> dict:
         """
         Update patient info (except patient_number).
         If status changes, log it in StatusLog.
@@ -128,64 +187,112 @@ class PatientService:
             )
 
         previous_status = patient.status
+        previous_day = patient.scheduled_time.date()
 
         update_data = patient_update.model_dump(exclude_unset=True)
 
         for field, value in update_data.items():
             setattr(patient, field, value)
 
+        if update_data.keys() & SCHEDULE_FIELDS:
+            await ScheduleService(self.session).assert_available(
+                patient.scheduled_time,
+                patient.duration_minutes,
+                room_no=patient.room_no,
+                surgeon_id=patient.surgeon_id,
+                exclude_patient_id=patient.id,
+            )
+
         patient.updated_at = datetime.utcnow()
 
         self.session.add(patient)
-        await self.session.commit()
-        await self.session.refresh(patient)
 
-        if "status" in update_data and update_data["status"] != previous_status:
-            status_log = StatusLog(
+        status_changed = (
+            "status" in update_data and update_data["status"] != previous_status
+        )
+        notifications = 0
+        xid = None
+        previous_change = None
+        if status_changed:
+            # This change ends the previous status' dwell (and the first wait)
+            previous_change = (
+                await self.session.exec(
+                    select(func.max(StatusLog.changed_at)).where(
+                        StatusLog.patient_id == patient.id
+                    )
+                )
+            ).one()
+            await status_log_writer.write(
+                self.session,
                 patient_id=patient.id,
                 previous_status=previous_status,
                 new_status=update_data["status"],
                 changed_by=changed_by_user_id,
-                changed_at=datetime.utcnow(),
             )
-            self.session.add(status_log)
-            await self.session.commit()
+            # Outbox rows commit with the status change; sent in the background
+            notifications = enqueue_status_notifications(
+                self.session, patient, update_data["status"]
+            )
+            xid = await current_transaction_id(self.session)
+
+        await self.session.commit()
+        await status_log_writer.committed(self.session)
+        await self.session.refresh(patient)
 
-        final_result = await self.session.exec(
-            select(Patient, User.name.label("surgeon_name"))  # type: ignore
-            .join(User, User.id == Patient.surgeon_id, isouter=True)
-            .where(Patient.patient_number == patient_number)
+        if status_changed:
+            await status_counters.record(previous_status, update_data["status"], xid)
+        if notifications:
+            outbox_worker.wake()
+
+        await invalidate_analytics(
+            {
+                date.today(),
+                datetime.utcnow().date(),
+                previous_day,
+                patient.scheduled_time.date(),
+                patient.created_at.date(),
+                previous_change.date() if previous_change else None,
+            }
         )
 
-        final_patient_data = final_result.first()
-        updated_patient, surgeon_name = final_patient_data
+        updated = await self.retrieve_patient(patient_number)
 
-        patient_dict = updated_patient.model_dump()
-        patient_dict["surgeon_name"] = surgeon_name
+        # Write through: this worker and (via the bus) the others serve the new row
+        body = dumps(updated)
+        patient_cache.set(patient_number, body)
+        await invalidation_bus.broadcast(patient_cache.name, patient_number, body)
 
-        return PatientRead.model_validate(patient_dict)
+        return updated
 
-    async def retrieve_patient(self, patient_number: str) -> "PatientRead":
+    async def retrieve_patient_json(self, patient_number: str) -> bytes:
+        """
+        Serialized PatientRead for `patient_number`, from `patient_cache` when
+        possible (no database round trip).
+        """
+        body = patient_cache.get(patient_number)
+        if body is None:
+            body = dumps(await self.retrieve_patient(patient_number))
+            patient_cache.add(patient_number, body)
+        return body
+
+    async def retrieve_patient(self, patient_number: str) -> dict:
         """
         Get a patient by patient_number (Admin only).
+        Returns a PatientRead-shaped dict.
         """
         result = await self.session.exec(
-            select(Patient, User.name.label("surgeon_name"))  # type: ignore
-            .join(User, User.id == Patient.surgeon_id, isouter=True)
-            .where(Patient.patient_number == patient_number)
+            select(*PATIENT_READ_COLUMNS).where(  # type: ignore
+                Patient.patient_number == patient_number
+            )
         )
-        patient_data = result.first()
+        rows = await with_surgeon_names(row_dicts(result))
 
-        if not patient_data:
+        if not rows:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Patient not found"
             )
 
-        patient, surgeon_name = patient_data
-        patient_dict = patient.model_dump()
-        patient_dict["surgeon_name"] = surgeon_name
-
-        return PatientRead.model_validate(patient_dict)
+        return rows[0]
 
     async def retrieve_all_patients(self, page: int = 1, limit: int = 10):
         """
@@ -197,40 +304,10 @@ class PatientService:
 
         offset = (page - 1) * limit
 
-        statement = (
-            select(
-                Patient.first_name,
-                Patient.last_name,
-                Patient.patient_number,
-                Patient.status,
-                Patient.phone,
-                Patient.room_no,
-                Patient.procedure,
-                Patient.scheduled_time,
-                User.name.label("surgeon_name"),  # type: ignore
-            )
-            .join(User, User.id == Patient.surgeon_id, isouter=True)
-            .offset(offset)
-            .limit(limit)
-        )
+        statement = select(*PATIENT_SUMMARY_COLUMNS).offset(offset).limit(limit)  # type: ignore
 
         result = await self.session.exec(statement)
-        rows = result.all()
-
-        items = [
-            PatientSummary(
-                first_name=row.first_name,
-                last_name=row.last_name,
-                patient_number=row.patient_number,
-                status=row.status,
-                phone=row.phone,
-                room_no=row.room_no,
-                procedure=row.procedure,
-                scheduled_time=row.scheduled_time,
-                surgeon_name=row.surgeon_name,
-            )
-            for row in rows
-        ]
+        items = await with_surgeon_names(row_dicts(result))
 
         return {
             "items": items,
@@ -245,14 +322,13 @@ class PatientService:
         status: str | None = None,
         scheduled_date: date | None = None,
         surgeon: str | None = None,
-    ) -> list["PatientRead"]:
+    ) -> list[dict]:
         """
         Search patients by multiple optional filters.
+        Returns PatientRead-shaped dicts.
         """
 
-        query = select(Patient, User.name.label("surgeon_name")).join(  # type: ignore
-            User, User.id == Patient.surgeon_id, isouter=True
-        )
+        query = select(*PATIENT_READ_COLUMNS)  # type: ignore
 
         conditions = []
 
@@ -271,18 +347,16 @@ class PatientService:
             conditions.append(func.date(Patient.scheduled_time) == scheduled_date)
 
         if surgeon:
-            conditions.append(User.name.ilike(f"%{surgeon}%"))  # type: ignore
+            surgeon_ids = surgeon_directory.ids_matching(surgeon)
+            if not surgeon_ids:
+                return []
+            conditions.append(Patient.surgeon_id.in_(surgeon_ids))  # type: ignore
 
         if conditions:
             query = query.where(and_(*conditions))
 
         result = await self.session.exec(query)
-        patients = result.all()
-
-        return [
-            PatientRead(**patient.dict(), surgeon_name=surgeon_name)
-            for patient, surgeon_name in patients
-        ]
+        return await with_surgeon_names(row_dicts(result))
 
     async def fetch_patient_stats(self):
         """
@@ -315,51 +389,31 @@ class PatientService:
             "scheduled_today": today_count,
         }
 
-    async def get_today_patients_summary(self) -> list[PatientSummary]:
+    async def get_today_patients_summary(self) -> list[dict]:
         """
         Retrieves a summary of all patients scheduled for today.
+        Returns PatientSummary-shaped dicts.
         """
         today = date.today()
 
-        statement = (
-            select(
-                Patient.first_name,
-                Patient.last_name,
-                Patient.patient_number,
-                Patient.status,
-                Patient.phone,
-                Patient.room_no,
-                Patient.procedure,
-                Patient.scheduled_time,
-                User.name.label("surgeon_name"),  # type: ignore
-            )
-            .join(User, User.id == Patient.surgeon_id, isouter=True)
-            .where(func.date(Patient.scheduled_time) == today)
+        statement = select(*PATIENT_SUMMARY_COLUMNS).where(  # type: ignore
+            func.date(Patient.scheduled_time) == today
         )
 
         result = await self.session.exec(statement)
-        rows = result.all()
-
-        items = [
-            PatientSummary(
-                first_name=row.first_name,
-                last_name=row.last_name,
-                patient_number=row.patient_number,
-                status=row.status,
-                phone=row.phone,
-                room_no=row.room_no,
-                procedure=row.procedure,
-                scheduled_time=row.scheduled_time,
-                surgeon_name=row.surgeon_name,
-            )
-            for row in rows
-        ]
-
-        return items
+        return await with_surgeon_names(row_dicts(result))
 
 
 SESSION_DEPENDENCY = Depends(get_session)
+READ_SESSION_DEPENDENCY = Depends(get_read_session)
 
 
 def get_patient_service(session: AsyncSession = SESSION_DEPENDENCY) -> PatientService:
     return PatientService(session)
+
+
+def get_patient_read_service(
+    session: AsyncSession = READ_SESSION_DEPENDENCY,
+) -> PatientService:
+    """PatientService bound to the read replica, for GET handlers."""
+    return PatientService(session)
@@ -0,0 +1,41 @@
+# app/modules/profiling/api.py
+
+# Routes: list and fetch stored request profiles (admin only)
+from typing import Annotated, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import HTMLResponse, PlainTextResponse
+
+from app.core.profiling import profile_store
+from app.modules.user.schemas import UserRead
+from app.shared.role_checker import require_admin_user
+
+router = APIRouter(prefix="/profiles", tags=["Profiling"])
+
+
+@router.get("/")
+async def list_profiles(_: Annotated[UserRead, Depends(require_admin_user)]):
+    """
+    Most recent request profiles captured by this worker.
+    """
+    return [report.summary() for report in profile_store.list()]
+
+
+@router.get("/{report_id}")
+async def get_profile(
+    report_id: str,
+    _: Annotated[UserRead, Depends(require_admin_user)],
+    format: Literal["text", "html"] = "text",
+):
+    """
+    Rendered profile: call tree as text, or an interactive HTML view
+    (pyinstrument only). The id comes from the `X-Profile-Id` response header.
+    """
+    report = profile_store.get(report_id)
+    if report is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found"
+        )
+    if format == "html" and report.engine == "pyinstrument":
+        return HTMLResponse(report.render("html"))
+    return PlainTextResponse(report.render("text"))
@@ -0,0 +1,47 @@
+# app/modules/schedule/api.py
+
+from datetime import date
+from typing import Annotated
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query
+
+from app.modules.schedule.schemas import RoomDaySchedule, SurgeonDaySchedule
+from app.modules.schedule.service import ScheduleService, get_schedule_read_service
+from app.modules.user.schemas import RoleEnum, UserRead
+from app.shared.role_checker import require_roles
+from app.shared.utils.serialization import json_response
+
+router = APIRouter(prefix="/schedule", tags=["Schedule"])
+
+
+@router.get("/rooms", response_model=RoomDaySchedule)
+async def room_schedule(
+    current_user: Annotated[
+        UserRead, Depends(require_roles([RoleEnum.admin, RoleEnum.surgical_team]))
+    ],
+    service: Annotated[ScheduleService, Depends(get_schedule_read_service)],
+    day: Annotated[date | None, Query()] = None,
+    room_no: Annotated[str | None, Query()] = None,
+):
+    """
+    Day view per OR room (today by default); overlapping cases are flagged.
+    """
+    return json_response(await service.rooms_day(day or date.today(), room_no=room_no))
+
+
+@router.get("/surgeons", response_model=SurgeonDaySchedule)
+async def surgeon_schedule(
+    current_user: Annotated[
+        UserRead, Depends(require_roles([RoleEnum.admin, RoleEnum.surgical_team]))
+    ],
+    service: Annotated[ScheduleService, Depends(get_schedule_read_service)],
+    day: Annotated[date | None, Query()] = None,
+    surgeon_id: Annotated[UUID | None, Query()] = None,
+):
+    """
+    Day view per surgeon (today by default); overlapping cases are flagged.
+    """
+    return json_response(
+        await service.surgeons_day(day or date.today(), surgeon_id=surgeon_id)
+    )
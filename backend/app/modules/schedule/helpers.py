@@ -0,0 +1,44 @@
+# app/modules/schedule/helpers.py
+# Interval helpers for OR room / surgeon schedules
+
+import heapq
+from collections.abc import Hashable, Iterable
+from datetime import datetime
+
+
+def find_overlaps(
+    intervals: Iterable[tuple[datetime, datetime, Hashable]],
+) -> dict[Hashable, list[Hashable]]:
+    """
+    Sweep line over half-open [start, end) intervals.
+    Returns {key: [keys of the intervals it overlaps]} for every interval
+    that overlaps at least one other. O(n log n + number of overlaps).
+    """
+    overlaps: dict[Hashable, list[Hashable]] = {}
+    active: list[tuple[datetime, int, Hashable]] = []  # min-heap by end
+
+    ordered = sorted(intervals, key=lambda interval: interval[0])
+    for position, (start, end, key) in enumerate(ordered):
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+        for _, _, other in active:
+            overlaps.setdefault(key, []).append(other)
+            overlaps.setdefault(other, []).append(key)
+        heapq.heappush(active, (end, position, key))
+    return overlaps
+
+
+def busy_minutes(intervals: Iterable[tuple[datetime, datetime]]) -> int:
+    """Minutes covered by the union of the intervals (overlaps counted once)."""
+    total = 0.0
+    current_start = current_end = None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += (current_end - current_start).total_seconds()
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += (current_end - current_start).total_seconds()
+    return round(total / 60)
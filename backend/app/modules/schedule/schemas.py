@@ -0,0 +1,43 @@
+from datetime import date, datetime
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class ScheduledCase(BaseModel):
+    patient_number: str
+    first_name: str
+    last_name: str
+    procedure: str
+    status: str
+    room_no: str | None
+    surgeon_name: str | None
+    start: datetime
+    end: datetime
+    duration_minutes: int
+    conflicts_with: list[str] = []  # patient numbers of overlapping cases
+
+
+class RoomSchedule(BaseModel):
+    room_no: str
+    booked_minutes: int
+    conflict_count: int
+    cases: list[ScheduledCase]
+
+
+class SurgeonSchedule(BaseModel):
+    surgeon_id: UUID
+    surgeon_name: str | None
+    booked_minutes: int
+    conflict_count: int
+    cases: list[ScheduledCase]
+
+
+class RoomDaySchedule(BaseModel):
+    day: date
+    rooms: list[RoomSchedule]
+
+
+class SurgeonDaySchedule(BaseModel):
+    day: date
+    surgeons: list[SurgeonSchedule]
@@ -0,0 +1,238 @@
+# app/modules/schedule/service.py
+
+"""
+OR room and surgeon scheduling.
+- `ScheduleService.assert_available`: rejects double-booked rooms / surgeons
+  (409) when a case is admitted or rescheduled
+- `ScheduleService.rooms_day` / `surgeons_day`: day views, overlaps flagged
+
+A case occupies [scheduled_time, scheduled_time + duration_minutes). Times are
+naive UTC, so the range type is `tsrange`. A GiST index on that expression
+answers "what overlaps this slot" without scanning the day.
+"""
+
+from datetime import UTC, date, datetime, time, timedelta
+from uuid import UUID
+
+from fastapi import Depends, HTTPException, status
+from sqlalchemy import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import get_settings
+from app.core.database import get_read_session, register_schema_patch
+from app.modules.schedule.helpers import busy_minutes, find_overlaps
+from app.modules.user.directory import surgeon_directory
+
+settings = get_settings()
+
+# Must match the indexed expression exactly for the planner to use the index
+SCHEDULE_RANGE = (
+    "tsrange(scheduled_time, scheduled_time + duration_minutes * interval '1 minute')"
+)
+
+register_schema_patch(
+    "CREATE INDEX IF NOT EXISTS ix_patient_schedule_range "
+    f"ON patient USING gist (({SCHEDULE_RANGE}))"
+)
+
+# First key of the two-key advisory locks taken while booking
+_SCHEDULE_LOCK_NAMESPACE = 720_037
+
+_CASE_COLUMNS = (
+    "id, patient_number, first_name, last_name, procedure, status, room_no, "
+    "surgeon_id, scheduled_time, duration_minutes"
+)
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        return value.astimezone(UTC).replace(tzinfo=None)
+    return value
+
+
+def _days(start: datetime, end: datetime) -> list[date]:
+    days, day = [], start.date()
+    while True:
+        days.append(day)
+        day += timedelta(days=1)
+        if datetime.combine(day, time.min) >= end:
+            return days
+
+
+class ScheduleService:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def assert_available(
+        self,
+        scheduled_time: datetime,
+        duration_minutes: int,
+        room_no: str | None = None,
+        surgeon_id: UUID | None = None,
+        exclude_patient_id: UUID | None = None,
+    ) -> None:
+        """
+        Raises 409 if the room or the surgeon already has a case overlapping
+        the slot. Takes per room/day and surgeon/day advisory locks for the
+        rest of the caller's transaction, so two concurrent bookings of the
+        same slot can't both pass; commit the write in that transaction.
+        """
+        if not settings.SCHEDULE_CONFLICT_CHECK or (
+            room_no is None and surgeon_id is None
+        ):
+            return
+
+        start = _naive_utc(scheduled_time)
+        end = start + timedelta(minutes=duration_minutes)
+
+        lock_keys = sorted(
+            {f"room:{room_no}:{day}" for day in _days(start, end) if room_no}
+            | {f"surgeon:{surgeon_id}:{day}" for day in _days(start, end) if surgeon_id}
+        )
+        await self.session.exec(
+            text(
+                "SELECT count(pg_advisory_xact_lock(:namespace, hashtext(key))) "
+                "FROM unnest(CAST(:keys AS text[])) AS key"
+            ),
+            params={"namespace": _SCHEDULE_LOCK_NAMESPACE, "keys": lock_keys},
+        )
+
+        result = await self.session.exec(
+            text(
+                f"SELECT {_CASE_COLUMNS} FROM patient "
+                f"WHERE {SCHEDULE_RANGE} && tsrange(:start, :end) "
+                "AND (room_no = :room_no OR surgeon_id = :surgeon_id) "
+                "AND id IS DISTINCT FROM :exclude_id "
+                "ORDER BY scheduled_time"
+            ),
+            params={
+                "start": start,
+                "end": end,
+                "room_no": room_no,
+                "surgeon_id": surgeon_id,
+                "exclude_id": exclude_patient_id,
+            },
+        )
+        rows = result.mappings().all()
+        if not rows:
+            return
+
+        await surgeon_directory.resolve(row["surgeon_id"] for row in rows)
+        conflicts = []
+        for row in rows:
+            case_end = row["scheduled_time"] + timedelta(
+                minutes=row["duration_minutes"]
+            )
+            conflicts.append(
+                {
+                    "patient_number": row["patient_number"],
+                    "reason": (
+                        "room" if room_no and row["room_no"] == room_no else "surgeon"
+                    ),
+                    "room_no": row["room_no"],
+                    "surgeon_name": surgeon_directory.name_for(row["surgeon_id"]),
+                    "start": row["scheduled_time"].isoformat(),
+                    "end": case_end.isoformat(),
+                }
+            )
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "message": "The room or surgeon is already booked for this time slot.",
+                "conflicts": conflicts,
+            },
+        )
+
+    async def _day_cases(self, day: date) -> list[dict]:
+        day_start = datetime.combine(day, time.min)
+        result = await self.session.exec(
+            text(
+                f"SELECT {_CASE_COLUMNS} FROM patient "
+                f"WHERE {SCHEDULE_RANGE} && tsrange(:start, :end) "
+                "ORDER BY scheduled_time"
+            ),
+            params={"start": day_start, "end": day_start + timedelta(days=1)},
+        )
+        rows = result.mappings().all()
+        await surgeon_directory.resolve(row["surgeon_id"] for row in rows)
+        cases = []
+        for row in rows:
+            start = row["scheduled_time"]
+            cases.append(
+                {
+                    "patient_number": row["patient_number"],
+                    "first_name": row["first_name"],
+                    "last_name": row["last_name"],
+                    "procedure": row["procedure"],
+                    "status": row["status"],
+                    "room_no": row["room_no"],
+                    "surgeon_id": row["surgeon_id"],
+                    "surgeon_name": surgeon_directory.name_for(row["surgeon_id"]),
+                    "start": start,
+                    "end": start + timedelta(minutes=row["duration_minutes"]),
+                    "duration_minutes": row["duration_minutes"],
+                    "conflicts_with": [],
+                }
+            )
+        return cases
+
+    @staticmethod
+    def _summarize(cases: list[dict]) -> dict:
+        overlaps = find_overlaps(
+            (case["start"], case["end"], case["patient_number"]) for case in cases
+        )
+        for case in cases:
+            case["conflicts_with"] = overlaps.get(case["patient_number"], [])
+        return {
+            "booked_minutes": busy_minutes(
+                (case["start"], case["end"]) for case in cases
+            ),
+            "conflict_count": len(overlaps),
+            "cases": cases,
+        }
+
+    async def rooms_day(self, day: date, room_no: str | None = None) -> dict:
+        """Cases per OR room for `day`, with overlapping bookings flagged."""
+        by_room: dict[str, list[dict]] = {}
+        for case in await self._day_cases(day):
+            case.pop("surgeon_id")
+            if case["room_no"] and (room_no is None or case["room_no"] == room_no):
+                by_room.setdefault(case["room_no"], []).append(case)
+        return {
+            "day": day,
+            "rooms": [
+                {"room_no": room, **self._summarize(cases)}
+                for room, cases in sorted(by_room.items())
+            ],
+        }
+
+    async def surgeons_day(self, day: date, surgeon_id: UUID | None = None) -> dict:
+        """Cases per surgeon for `day`, with overlapping bookings flagged."""
+        by_surgeon: dict[UUID, list[dict]] = {}
+        for case in await self._day_cases(day):
+            case_surgeon = case.pop("surgeon_id")
+            if case_surgeon and (surgeon_id is None or case_surgeon == surgeon_id):
+                by_surgeon.setdefault(case_surgeon, []).append(case)
+        return {
+            "day": day,
+            "surgeons": [
+                {
+                    "surgeon_id": surgeon,
+                    "surgeon_name": surgeon_directory.name_for(surgeon),
+                    **self._summarize(cases),
+                }
+                for surgeon, cases in sorted(
+                    by_surgeon.items(),
+                    key=lambda item: surgeon_directory.name_for(item[0]) or "",
+                )
+            ],
+        }
+
+
+READ_SESSION_DEPENDENCY = Depends(get_read_session)
+
+
+def get_schedule_read_service(
+    session: AsyncSession = READ_SESSION_DEPENDENCY,
+) -> ScheduleService:
+    return ScheduleService(session)
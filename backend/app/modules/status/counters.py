@@ -0,0 +1,223 @@
+# app/modules/status/counters.py
+
+"""
+Live patient counts per status (one set per worker), so the status breakdown
+is served from memory instead of a GROUP BY over `patient`.
+- Loaded in `lifespan` from one aggregate, together with the status metadata
+- `record(previous, new, xid)`: called after a committed admission
+  (previous=None) or status change; adjusts this worker and, via the
+  invalidation bus, the others
+- Reconciled against the database every STATUS_COUNTS_RECONCILE_SECONDS by a
+  scheduled job (or on a read, if that's overdue), which also catches writes
+  made outside the API; drift found there is logged
+
+A load and a change recorded around the same time must not count the change
+twice (or not at all): the load keeps the snapshot its counts were read in,
+and a change whose transaction (`xid`, from `current_transaction_id` before
+the commit) is visible in it is already counted.
+
+With CACHE_BUS=memory, changes made in other workers only show up here at the
+next reconciliation, so with several workers the counts can lag by up to
+STATUS_COUNTS_RECONCILE_SECONDS; use CACHE_BUS=postgres there.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import text
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.cache import invalidation_bus
+from app.core.config import get_settings
+from app.core.database import SessionLocal
+from app.core.scheduler import scheduler
+
+from .models import Status
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Bus keys are "<xid>\x1f<previous>\x1f<new>" (previous is empty for an
+# admission, xid when unknown)
+_KEY_SEPARATOR = "\x1f"
+
+# One statement, so the counts are exactly what its snapshot sees
+_COUNTS_SQL = """
+SELECT pg_current_snapshot()::text, array_agg(status), array_agg(patients)
+FROM (SELECT status, count(*) AS patients FROM patient GROUP BY status) counts
+"""
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Transactions visible to a query (`pg_current_snapshot()`)."""
+
+    xmin: int
+    xmax: int
+    in_progress: frozenset[int]
+
+    @classmethod
+    def parse(cls, value: str) -> "Snapshot":
+        xmin, xmax, in_progress = value.split(":")
+        return cls(
+            int(xmin),
+            int(xmax),
+            frozenset(int(xid) for xid in in_progress.split(",") if xid),
+        )
+
+    def includes(self, xid: int) -> bool:
+        """Whether the changes of committed transaction `xid` were visible."""
+        return xid < self.xmin or (xid < self.xmax and xid not in self.in_progress)
+
+
+async def current_transaction_id(session: AsyncSession) -> int:
+    """Id of the session's transaction; pass it to `record` after the commit."""
+    result = await session.exec(text("SELECT pg_current_xact_id()::text::bigint"))
+    return result.one()[0]
+
+
+class StatusCounters:
+    name = "status_counters"  # invalidation bus channel
+
+    def __init__(self, reconcile_interval: float):
+        self.reconcile_interval = reconcile_interval
+        self._statuses: list[dict] = []  # Status rows, in order_index order
+        self._counts: dict[str, int] = {}
+        self._snapshot: Snapshot | None = None  # the counts' snapshot
+        # Changes recorded while a load is running, as (xid, previous, new)
+        self._during_load: list[tuple[int | None, str, str]] | None = None
+        self._load_lock = asyncio.Lock()
+        self.loaded_at: float | None = None
+        self._reload_task: asyncio.Task | None = None
+
+    async def load(self) -> None:
+        """Reads the statuses and the patient count per status (primary)."""
+        async with self._load_lock:
+            self._during_load = []
+            try:
+                async with SessionLocal() as session:
+                    statuses = (
+                        await session.exec(select(Status).order_by(Status.order_index))
+                    ).all()
+                    snapshot, names, patients = (
+                        await session.exec(text(_COUNTS_SQL))
+                    ).one()
+            finally:
+                during_load, self._during_load = self._during_load, None
+
+        counts = dict(zip(names or [], patients or [], strict=True))
+        self._snapshot = Snapshot.parse(snapshot)
+        # Changes that arrived meanwhile but committed after the snapshot
+        for xid, previous, new in during_load:
+            if xid is None or not self._snapshot.includes(xid):
+                _count(counts, previous, new)
+
+        if self.loaded_at is not None and counts != self._nonzero_counts():
+            logger.info(
+                "Status counters drifted; reconciled %s -> %s",
+                self._nonzero_counts(),
+                counts,
+            )
+        self._statuses = [
+            {
+                "status": row.status,
+                "message": row.message,
+                "color": row.color,
+                "order_index": row.order_index,
+            }
+            for row in statuses
+        ]
+        self._counts = counts
+        self.loaded_at = time.monotonic()
+
+    def breakdown(self) -> list[dict]:
+        """Every status in `order_index` order with its patient count (zeros included)."""
+        self._reconcile_if_due()
+        return [
+            {**status, "count": self._counts.get(status["status"], 0)}
+            for status in self._statuses
+        ]
+
+    async def record(
+        self, previous: str | None, new: str, xid: int | None = None
+    ) -> None:
+        """
+        Counts a committed admission / status change here and in other
+        workers. `xid`: its transaction id (see `current_transaction_id`).
+        """
+        key = _KEY_SEPARATOR.join(
+            ("" if xid is None else str(xid), previous or "", new)
+        )
+        self._apply(key)
+        await invalidation_bus.broadcast(self.name, key)
+
+    def _apply(self, key: str) -> None:
+        xid, previous, new = key.split(_KEY_SEPARATOR)
+        xid = int(xid) if xid else None
+        if self._during_load is not None:
+            self._during_load.append((xid, previous, new))
+        if xid is not None and self._snapshot and self._snapshot.includes(xid):
+            return  # already in the loaded counts
+        _count(self._counts, previous, new)
+
+    def _nonzero_counts(self) -> dict[str, int]:
+        return {status: count for status, count in self._counts.items() if count}
+
+    def schedule_reload(self) -> None:
+        """Reconciles in the background (no-op if one is already running)."""
+        if self._reload_task is not None and not self._reload_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._reload_task = loop.create_task(self._reload())
+
+    async def _reload(self) -> None:
+        try:
+            await self.load()
+        except Exception:
+            logger.warning("Status counters reconciliation failed", exc_info=True)
+
+    def _reconcile_if_due(self) -> None:
+        # The scheduled job normally gets there first
+        if (
+            self.loaded_at is None
+            or time.monotonic() - self.loaded_at > 2 * self.reconcile_interval
+        ):
+            self.schedule_reload()
+
+    # Invalidation bus interface: keys are transitions from other workers
+    def set(self, key, value) -> None:
+        self._apply(str(key))
+
+    def delete(self, key) -> None:
+        self._apply(str(key))
+
+    def clear(self) -> None:
+        # Transitions may have been missed (bus reconnect)
+        self.schedule_reload()
+
+
+def _count(counts: dict[str, int], previous: str, new: str) -> None:
+    if previous:
+        counts[previous] = max(counts.get(previous, 0) - 1, 0)
+    counts[new] = counts.get(new, 0) + 1
+
+
+status_counters = invalidation_bus.register(
+    StatusCounters(settings.STATUS_COUNTS_RECONCILE_SECONDS)
+)
+
+# Every worker keeps its own counters
+scheduler.add_job(
+    "status_counters.reconcile",
+    status_counters.load,
+    every=settings.STATUS_COUNTS_RECONCILE_SECONDS,
+    jitter=settings.STATUS_COUNTS_RECONCILE_SECONDS / 10,
+    timeout=30,
+)
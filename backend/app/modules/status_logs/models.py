@@ -16,7 +16,7 @@ class StatusLog(SQLModel, table=True):  # type: ignore
     previous_status: str | None = Field(default=None, foreign_key="status.status")
     new_status: str = Field(foreign_key="status.status")
     changed_by: UUID = Field(foreign_key="user.id")  # User who made the change
-    changed_at: datetime = Field(default_factory=datetime.utcnow)
+    changed_at: datetime = Field(default_factory=datetime.utcnow, index=True)
 
     # Relationships
     patient: "Patient" = Relationship(back_populates="status_logs")
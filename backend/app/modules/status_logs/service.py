@@ -0,0 +1,222 @@
+# app/modules/status_logs/service.py
+
+"""
+Status log writes.
+- STATUS_LOG_WRITE_MODE=sync (default): the log row is added to the caller's
+  session and committed in the same transaction as the status change
+- STATUS_LOG_WRITE_MODE=write_behind: rows are held on the session until
+  the caller has committed the status change and calls `committed(session)`
+  (a rollback discards them), then go into a bounded in-process queue and
+  are inserted in batches (multi-row INSERT) every STATUS_LOG_FLUSH_MS or
+  STATUS_LOG_BATCH_SIZE rows, off the request path. A full queue makes
+  writers wait (backpressure). The queue is flushed on shutdown, but rows
+  still queued when a worker crashes are lost: choose this mode only when
+  the audit trail may trail (or, rarely, miss) status changes.
+- A batch that fails on a connection problem is retried; one the database
+  rejects (constraint / data errors) is split until the bad rows are found,
+  and those are logged and dropped so they can't block the queue.
+
+Started / stopped in `lifespan`.
+"""
+
+import asyncio
+import logging
+from datetime import UTC, datetime
+from uuid import UUID, uuid4
+
+from sqlalchemy import event, insert
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import get_settings
+from app.core.database import engine
+from app.core.metrics import (
+    STATUS_LOG_FLUSH_FAILURES,
+    STATUS_LOG_QUEUE_DEPTH,
+    STATUS_LOG_ROWS_DROPPED,
+)
+from app.modules.analytics.cache import invalidate_analytics
+
+from .models import StatusLog
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Seconds to wait for the final flush on shutdown
+_SHUTDOWN_FLUSH_TIMEOUT = 10
+
+# session.info key of the rows waiting for the session's commit
+_PENDING = "pending_status_logs"
+
+# Errors that retrying the same rows can't fix
+_REJECTED = (IntegrityError, DataError)
+
+
+class StatusLogWriter:
+    def __init__(
+        self, mode: str, batch_size: int, flush_interval_ms: int, queue_size: int
+    ):
+        self.write_behind = mode == "write_behind"
+        self.batch_size = max(batch_size, 1)
+        self.flush_interval = flush_interval_ms / 1000
+        self._queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=queue_size)
+        self._in_flight: list[dict] = []  # batch taken off the queue, not yet written
+        self._task: asyncio.Task | None = None
+
+    async def write(
+        self,
+        session: AsyncSession,
+        patient_id: UUID,
+        previous_status: str | None,
+        new_status: str,
+        changed_by: UUID,
+    ) -> None:
+        """
+        Records a status change. In sync mode the row joins `session`'s
+        transaction (the caller commits); in write-behind mode it's held
+        until `committed(session)` queues it.
+        """
+        row = {
+            "id": uuid4(),
+            "patient_id": patient_id,
+            "previous_status": previous_status,
+            "new_status": new_status,
+            "changed_by": changed_by,
+            "changed_at": datetime.now(UTC).replace(tzinfo=None),  # naive UTC column
+        }
+        if not self.write_behind or self._task is None:
+            session.add(StatusLog(**row))
+            return
+
+        # A plain dict: building the model costs more than the batched insert
+        if _PENDING not in session.info:
+            session.info[_PENDING] = []
+            event.listen(session.sync_session, "after_soft_rollback", _discard_pending)
+        session.info[_PENDING].append(row)
+
+    async def committed(self, session: AsyncSession) -> None:
+        """
+        Queues the write-behind rows of `session`'s transaction. Call right
+        after `session.commit()` succeeded (no-op in sync mode).
+        """
+        rows = session.info.pop(_PENDING, None)
+        if not rows:
+            return
+        if self._task is None:  # stopped meanwhile: write them now
+            STATUS_LOG_QUEUE_DEPTH.inc(len(rows))
+            await self._flush_with_retry(rows)
+            return
+        for row in rows:
+            await self._queue.put(row)  # waits while the queue is full
+            STATUS_LOG_QUEUE_DEPTH.inc()
+
+    async def start(self) -> None:
+        if self.write_behind and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stops the flusher after writing everything still queued."""
+        if self._task is None:
+            return
+        task, self._task = self._task, None  # new writes go synchronous
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        # Same retry / split handling as the flusher, bounded by the timeout
+        try:
+            async with asyncio.timeout(_SHUTDOWN_FLUSH_TIMEOUT):
+                if self._in_flight:
+                    await self._flush_with_retry(self._in_flight)
+                while not self._queue.empty():
+                    self._in_flight = self._take_batch()
+                    await self._flush_with_retry(self._in_flight)
+        except TimeoutError:
+            logger.error(
+                "Dropped %d status log rows on shutdown",
+                len(self._in_flight) + self._queue.qsize(),
+            )
+
+    async def _run(self) -> None:
+        while True:
+            batch = self._in_flight = [await self._queue.get()]
+            # Gather more rows for up to flush_interval, or until the batch is full
+            try:
+                async with asyncio.timeout(self.flush_interval):
+                    while len(batch) < self.batch_size:
+                        batch.append(await self._queue.get())
+            except TimeoutError:
+                pass
+            await self._flush_with_retry(batch)
+
+    def _take_batch(self) -> list[dict]:
+        batch = []
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _flush_with_retry(self, batch: list[dict]) -> None:
+        delay = 0.5
+        while True:
+            try:
+                await self._flush(batch)
+                return
+            except _REJECTED:
+                STATUS_LOG_FLUSH_FAILURES.inc()
+                await self._split(batch)
+                return
+            except Exception:
+                STATUS_LOG_FLUSH_FAILURES.inc()
+                logger.warning(
+                    "Status log flush of %d rows failed; retrying in %.1fs",
+                    len(batch),
+                    delay,
+                    exc_info=True,
+                )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+
+    async def _split(self, batch: list[dict]) -> None:
+        """Writes the good rows of a rejected batch; logs and drops the bad ones."""
+        if len(batch) == 1:
+            self._done(batch)
+            STATUS_LOG_QUEUE_DEPTH.dec()
+            STATUS_LOG_ROWS_DROPPED.inc()
+            logger.error(
+                "Dropped status log row rejected by the database: %r", batch[0]
+            )
+            return
+        middle = len(batch) // 2
+        await self._flush_with_retry(batch[:middle])
+        await self._flush_with_retry(batch[middle:])
+
+    async def _flush(self, batch: list[dict]) -> None:
+        if not batch:
+            return
+        async with engine.begin() as conn:
+            await conn.execute(insert(StatusLog), batch)
+        # Written: a stop() cancelling what follows mustn't insert them again
+        self._done(batch)
+        STATUS_LOG_QUEUE_DEPTH.dec(len(batch))
+        # Cached analytics were evicted at write time, before these rows existed
+        await invalidate_analytics({row["changed_at"].date() for row in batch})
+
+    def _done(self, rows: list[dict]) -> None:
+        """Takes written (or dropped) rows off the in-flight batch."""
+        ids = {row["id"] for row in rows}
+        self._in_flight = [row for row in self._in_flight if row["id"] not in ids]
+
+
+def _discard_pending(session, previous_transaction) -> None:
+    if not previous_transaction.nested:  # rolling back to a savepoint keeps them
+        session.info.pop(_PENDING, None)
+
+
+status_log_writer = StatusLogWriter(
+    settings.STATUS_LOG_WRITE_MODE,
+    settings.STATUS_LOG_BATCH_SIZE,
+    settings.STATUS_LOG_FLUSH_MS,
+    settings.STATUS_LOG_QUEUE_SIZE,
+)
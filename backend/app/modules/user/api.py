@@ -3,7 +3,7 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, Query
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.database import get_session
+from app.core.database import get_read_session
 from app.shared.role_checker import require_admin_user
 
 from .schemas import RoleEnum, UserRead
@@ -15,7 +15,7 @@ router = APIRouter(prefix="/users", tags=["Users"])
 @router.get("/", response_model=list[UserRead])
 async def read_users(
     _: Annotated[UserRead, Depends(require_admin_user)],  # Enforce admin access
-    session: Annotated[AsyncSession, Depends(get_session)],
+    session: Annotated[AsyncSession, Depends(get_read_session)],
     email: Annotated[str | None, Query()] = None,
     role: Annotated[RoleEnum | None, Query()] = None,
 ):
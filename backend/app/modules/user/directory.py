@@ -0,0 +1,175 @@
+# app/modules/user/directory.py
+
+"""
+In-memory surgeon directory (one per worker).
+- name -> ids of `surgical_team` users, for admissions (`surgeon_name`)
+- id -> name of every user, to label patient rows without joining `user`
+
+Loaded in `lifespan`, reloaded after a commit that touched a `User` (here, or
+in another worker via the invalidation bus), when older than
+SURGEON_DIRECTORY_TTL, or on a lookup miss (users seeded out of band).
+Rows about to be labelled go through `resolve` first, so a surgeon added
+since the last load gets a name rather than None.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Iterable
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from app.core.cache import invalidation_bus
+from app.core.config import get_settings
+from app.core.database import SessionLocal
+
+from .models import User
+from .schemas import RoleEnum
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Reload at most this often when lookups miss
+_MIN_MISS_RELOAD_SECONDS = 5
+
+# Keeps fire-and-forget broadcasts referenced until they finish
+_background_tasks: set[asyncio.Task] = set()
+
+
+class SurgeonDirectory:
+    name = "surgeon_directory"  # invalidation bus channel
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._ids_by_name: dict[str, list[UUID]] = {}
+        self._names_by_id: dict[UUID, str] = {}
+        self.loaded_at: float | None = None
+        self._lock = asyncio.Lock()
+        self._reload_task: asyncio.Task | None = None
+
+    async def load(self) -> None:
+        """Reads every user (id, name, role) from the primary."""
+        async with self._lock:
+            async with SessionLocal() as session:
+                result = await session.exec(select(User.id, User.name, User.role))
+                rows = result.all()
+
+            ids_by_name: dict[str, list[UUID]] = {}
+            for user_id, name, role in rows:
+                if role == RoleEnum.surgical_team:
+                    ids_by_name.setdefault(name, []).append(user_id)
+            self._ids_by_name = ids_by_name
+            self._names_by_id = {user_id: name for user_id, name, _ in rows}
+            self.loaded_at = time.monotonic()
+        logger.debug("Surgeon directory loaded (%d users)", len(rows))
+
+    async def surgeon_ids(self, name: str) -> list[UUID]:
+        """
+        Ids of surgical team members called `name` (names aren't unique).
+        Reloads once on a miss in case the user was added out of band.
+        """
+        ids = self._ids_by_name.get(name)
+        if ids is None and self._age() > _MIN_MISS_RELOAD_SECONDS:
+            await self.load()
+            ids = self._ids_by_name.get(name)
+        self._reload_if_expired()
+        return list(ids or [])
+
+    async def resolve(self, user_ids: Iterable[UUID | None]) -> None:
+        """
+        Makes sure `name_for` knows every id in `user_ids`. Surgeons are
+        foreign keys, so an unknown id means the directory is stale: waits for
+        the running reload, or starts one and waits for it.
+        """
+        missing = {user_id for user_id in user_ids if user_id is not None}
+        if not missing - self._names_by_id.keys():
+            self._reload_if_expired()
+            return
+        self.schedule_reload()
+        if self._reload_task is not None:
+            # Shared by every waiting request; one being cancelled mustn't stop it
+            await asyncio.shield(self._reload_task)
+
+    def name_for(self, user_id: UUID | None) -> str | None:
+        if user_id is None:
+            return None
+        name = self._names_by_id.get(user_id)
+        if name is None and self._age() > _MIN_MISS_RELOAD_SECONDS:
+            self.schedule_reload()
+        else:
+            self._reload_if_expired()
+        return name
+
+    def ids_matching(self, fragment: str) -> list[UUID]:
+        """Ids of users whose name contains `fragment` (case-insensitive)."""
+        self._reload_if_expired()
+        needle = fragment.casefold()
+        return [
+            user_id
+            for user_id, name in self._names_by_id.items()
+            if needle in name.casefold()
+        ]
+
+    def schedule_reload(self) -> None:
+        """Reloads in the background (no-op if one is already running)."""
+        if self._reload_task is not None and not self._reload_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:  # e.g. a sync script committing users
+            return
+        self._reload_task = loop.create_task(self._reload())
+
+    async def _reload(self) -> None:
+        try:
+            await self.load()
+        except Exception:
+            logger.warning("Surgeon directory reload failed", exc_info=True)
+
+    def _age(self) -> float:
+        if self.loaded_at is None:
+            return float("inf")
+        return time.monotonic() - self.loaded_at
+
+    def _reload_if_expired(self) -> None:
+        if self._age() > self.ttl:
+            self.schedule_reload()
+
+    # Invalidation bus interface: any message means "reload"
+    def set(self, key, value) -> None:
+        self.schedule_reload()
+
+    def delete(self, key) -> None:
+        self.schedule_reload()
+
+    def clear(self) -> None:
+        self.schedule_reload()
+
+
+surgeon_directory = invalidation_bus.register(
+    SurgeonDirectory(settings.SURGEON_DIRECTORY_TTL)
+)
+
+
+@event.listens_for(User, "after_insert")
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _flag_user_change(mapper, connection, target):
+    Session.object_session(target).info["users_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _reload_after_user_commit(session):
+    if not session.info.pop("users_changed", False):
+        return
+    surgeon_directory.schedule_reload()
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    task = loop.create_task(invalidation_bus.broadcast(SurgeonDirectory.name, None))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
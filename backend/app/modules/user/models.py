@@ -11,7 +11,7 @@ if TYPE_CHECKING:
 
 class User(SQLModel, table=True):  # type: ignore
     id: UUID = Field(default_factory=uuid4, primary_key=True, index=True)
-    name: str
+    name: str = Field(index=True)
     email: str = Field(unique=True, index=True)
     hashed_password: str
     role: RoleEnum
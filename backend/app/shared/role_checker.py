@@ -2,11 +2,10 @@
 
 from typing import Annotated
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.database import get_session
+from app.core.database import read_session_factory
 from app.core.security import decode_access_token
 from app.modules.user.schemas import RoleEnum, UserRead
 from app.modules.user.service import get_user_by_id
@@ -18,14 +17,17 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 async def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)],
-    session: Annotated[AsyncSession, Depends(get_session)],
+    request: Request,
 ) -> UserRead:
     payload = decode_access_token(token)
     id = payload.get("sub")
     if id is None:
         raise HTTPException(status_code=401, detail="Invalid token payload")
 
-    user = await get_user_by_id(id=id, session=session)
+    # Own short-lived read session: the connection goes back to the pool
+    # before the route runs, and write routes don't pin a second primary one
+    async with read_session_factory(request)() as session:
+        user = await get_user_by_id(id=id, session=session)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -0,0 +1,50 @@
+# app/shared/utils/serialization.py
+
+"""
+Fast JSON path for list/detail endpoints.
+Rows are turned into plain dicts straight from the DB result and encoded once
+with orjson, skipping per-row Pydantic instances and FastAPI's second
+`response_model` validation pass. Keep `response_model` on the route for the
+OpenAPI schema; returning a Response bypasses it at runtime.
+"""
+
+from typing import Any
+from uuid import UUID
+
+import orjson
+from fastapi.responses import JSONResponse, Response
+
+
+def _default(obj: Any) -> Any:
+    # asyncpg returns its own UUID subclass, which orjson doesn't recognise
+    if isinstance(obj, UUID):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """orjson-encoded JSON response (also the app's default response class)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def row_dicts(result) -> list[dict[str, Any]]:
+    """Plain dicts (column label -> value) for every row of a result."""
+    return [dict(row) for row in result.mappings()]
+
+
+def json_response(content: Any, status_code: int = 200) -> FastJSONResponse:
+    """Encodes already JSON-shaped content (dicts, lists, datetimes, UUIDs)."""
+    return FastJSONResponse(content=content, status_code=status_code)
+
+
+def raw_json_response(body: bytes, status_code: int = 200) -> Response:
+    """Response for JSON that is already encoded (e.g. served from a cache)."""
+    return Response(
+        content=body, status_code=status_code, media_type="application/json"
+    )
@@ -0,0 +1,103 @@
+"""
+Micro-benchmark for list endpoint serialization.
+
+Compares, for synthetic patient rows:
+- pydantic: one `PatientRead` per row, re-validated through a `response_model`
+  `TypeAdapter`, then `json.dumps` (what the endpoints used to do)
+- adapter:  row dicts validated + dumped by a precompiled `TypeAdapter`
+- orjson:   row dicts straight to bytes (`app.shared.utils.serialization.dumps`)
+
+No database needed. Usage (from backend/):
+    python -m scripts.bench_serialization [--rows 1000 10000] [--repeat 5]
+"""
+
+import argparse
+import json
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.modules.patient.schemas import PatientRead
+from app.shared.utils.serialization import dumps
+
+_list_adapter = TypeAdapter(list[PatientRead])
+
+
+def make_rows(count: int) -> list[dict]:
+    now = datetime(2025, 1, 1, 8, 0)
+    return [
+        {
+            "id": uuid.uuid4(),
+            "patient_number": f"P{i:05d}",
+            "first_name": "Ann",
+            "last_name": "Lee",
+            "address": "1 Main St",
+            "city": "Springfield",
+            "state": "IL",
+            "country": "USA",
+            "phone": "555-0100",
+            "email": f"patient{i}@example.com",
+            "procedure": "Appendectomy",
+            "scheduled_time": now + timedelta(minutes=i),
+            "surgeon_name": "Dr. Smith",
+            "room_no": "OR1",
+            "note": None,
+            "status": "Checked In",
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(count)
+    ]
+
+
+def via_pydantic(rows: list[dict]) -> bytes:
+    models = [PatientRead(**row) for row in rows]
+    validated = _list_adapter.validate_python(models, from_attributes=True)
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+def via_adapter(rows: list[dict]) -> bytes:
+    return _list_adapter.dump_json(_list_adapter.validate_python(rows))
+
+
+def via_orjson(rows: list[dict]) -> bytes:
+    return dumps(rows)
+
+
+def best_of(fn, rows, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(rows)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    candidates = [
+        ("pydantic", via_pydantic),
+        ("adapter", via_adapter),
+        ("orjson", via_orjson),
+    ]
+    print(f"{'rows':>7}  {'path':<9} {'best ms':>9} {'speedup':>8}")
+    for count in args.rows:
+        rows = make_rows(count)
+        baseline = None
+        for name, fn in candidates:
+            seconds = best_of(fn, rows, args.repeat)
+            baseline = baseline or seconds
+            print(
+                f"{count:>7}  {name:<9} {seconds * 1000:>9.2f} {baseline / seconds:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Start-up import profile.
+
+Runs `python -X importtime -c "import app.main"` in a fresh interpreter and
+summarizes the output: total import time, the slowest top-level packages and
+the slowest individual modules.
+
+Usage (from backend/):
+    python -m scripts.import_profile [--top 15] [--module app.main]
+"""
+
+import argparse
+import subprocess
+import sys
+from collections import defaultdict
+
+
+def run_importtime(module: str) -> list[tuple[int, int, str]]:
+    """Returns (self_us, cumulative_us, qualified module name) per import."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr[-2000:])
+        raise SystemExit(f"Importing {module} failed")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return rows
+
+
+def summarize(rows: list[tuple[int, int, str]], top: int) -> str:
+    # Top-level imports are the least indented entries
+    min_indent = min(len(name) - len(name.lstrip()) for _, _, name in rows)
+    total_us = sum(
+        cumulative
+        for _, cumulative, name in rows
+        if len(name) - len(name.lstrip()) == min_indent
+    )
+
+    by_package: dict[str, int] = defaultdict(int)
+    for self_us, _, name in rows:
+        by_package[name.strip().split(".")[0]] += self_us
+
+    lines = [f"Total import time: {total_us / 1000:.1f} ms", ""]
+    lines.append(f"Slowest packages (self time, top {top}):")
+    for package, self_us in sorted(by_package.items(), key=lambda kv: -kv[1])[:top]:
+        share = self_us / total_us * 100 if total_us else 0
+        lines.append(f"  {self_us / 1000:9.1f} ms  {share:5.1f}%  {package}")
+
+    lines.append("")
+    lines.append(f"Slowest modules (cumulative, top {top}):")
+    for _, cumulative, name in sorted(rows, key=lambda r: -r[1])[:top]:
+        lines.append(f"  {cumulative / 1000:9.1f} ms  {name.strip()}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+    print(summarize(run_importtime(args.module), args.top))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# tests/conftest.py
+
+"""
+Shared test setup.
+Settings are read when `app` modules are imported, so the environment is
+filled in first. Tests that need Postgres take the `database` fixture and are
+skipped unless TEST_DATABASE_URL points at a scratch database (tables are
+created there and test rows are left behind).
+"""
+
+import os
+import random
+import string
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+if TEST_DATABASE_URL:
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+os.environ.setdefault("DATABASE_URL", "postgresql://localhost/unused")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("LOG_FORMAT", "text")
+
+STATUSES = (
+    "Checked In",
+    "Pre-Procedure",
+    "In-progress",
+    "Closing",
+    "Recovery",
+    "Complete",
+    "Dismissal",
+)
+
+
+@pytest.fixture(scope="session")
+async def database():
+    """Creates the schema and the statuses in TEST_DATABASE_URL."""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+
+    from sqlalchemy import text
+
+    import app.main  # noqa: F401 - registers every model
+    from app.core.database import SessionLocal, dispose_engine, init_db
+
+    await init_db()
+    async with SessionLocal() as session:
+        for index, status in enumerate(STATUSES):
+            await session.exec(
+                text(
+                    "INSERT INTO status (status, message, color, order_index) "
+                    "VALUES (:status, :status, '#4CAF50', :index) "
+                    "ON CONFLICT (status) DO NOTHING"
+                ),
+                params={"status": status, "index": index},
+            )
+        await session.commit()
+    yield
+    await dispose_engine()
+
+
+@pytest.fixture
+async def user(database):
+    from app.core.database import SessionLocal
+    from app.modules.user.models import User
+    from app.modules.user.schemas import RoleEnum
+
+    async with SessionLocal() as session:
+        row = User(
+            name="Test Admin",
+            email=f"admin-{uuid.uuid4().hex}@hospital.com",
+            hashed_password="x",
+            role=RoleEnum.admin,
+        )
+        session.add(row)
+        await session.commit()
+        await session.refresh(row)
+    return row
+
+
+@pytest.fixture
+async def client(user):
+    """HTTP client for the app (no lifespan), signed in as `user`."""
+    import httpx
+
+    from app.core.security import create_access_token
+    from app.main import app
+
+    token = create_access_token({"sub": str(user.id)}, timedelta(minutes=30))
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://test",
+        headers={"Authorization": f"Bearer {token}"},
+    ) as http:
+        yield http
+
+
+@pytest.fixture
+def make_patient(database):
+    """Factory: inserts a patient (in 'Checked In' unless told otherwise)."""
+    from app.core.database import SessionLocal
+    from app.modules.patient.models import Patient
+
+    async def make(**fields):
+        patient = Patient(
+            patient_number="".join(
+                random.choices(string.ascii_uppercase + string.digits, k=6)
+            ),
+            first_name="Test",
+            last_name="Patient",
+            address="1 Test Street",
+            city="Testville",
+            state="TS",
+            country="Testland",
+            phone="+10000000000",
+            email="family@test.local",
+            procedure="Appendectomy",
+            scheduled_time=datetime(2030, 1, 1, 9, 0),
+            **{"status": "Checked In", **fields},
+        )
+        async with SessionLocal() as session:
+            session.add(patient)
+            await session.commit()
+            await session.refresh(patient)
+        return patient
+
+    return make
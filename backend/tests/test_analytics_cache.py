@@ -0,0 +1,60 @@
+import time
+from datetime import date, timedelta
+
+from app.modules.analytics.cache import AnalyticsCache
+
+TODAY = date.today()
+LAST_WEEK = TODAY - timedelta(days=7)
+YESTERDAY = TODAY - timedelta(days=1)
+
+
+def filled_cache() -> AnalyticsCache:
+    cache = AnalyticsCache(max_entries=100, live_ttl=30, historical_ttl=600)
+    cache.put("overview", LAST_WEEK, LAST_WEEK, "last week")
+    cache.put("overview", LAST_WEEK, YESTERDAY, "past 7 days")
+    cache.put("overview", TODAY, TODAY, "today")
+    cache.put("status_breakdown", None, None, "range-less")
+    return cache
+
+
+def test_evict_days_drops_ranges_covering_a_day():
+    cache = filled_cache()
+
+    assert cache.evict_days([YESTERDAY]) == 2
+    assert cache.get("overview", LAST_WEEK, LAST_WEEK) == "last week"
+    assert cache.get("overview", LAST_WEEK, YESTERDAY) is None
+    assert cache.get("overview", TODAY, TODAY) == "today"
+    assert cache.get("status_breakdown") is None
+
+
+def test_evict_days_range_bounds_are_inclusive():
+    cache = filled_cache()
+
+    assert cache.evict_days([LAST_WEEK]) == 3
+    assert cache.get("overview", TODAY, TODAY) == "today"
+
+
+def test_evict_days_without_days_only_drops_rangeless_entries():
+    cache = filled_cache()
+
+    assert cache.evict_days([]) == 1
+    assert cache.get("overview", LAST_WEEK, YESTERDAY) == "past 7 days"
+
+
+def test_bus_key_lists_the_days():
+    cache = filled_cache()
+
+    cache.delete(f"{LAST_WEEK.isoformat()},{TODAY.isoformat()}")
+    assert cache._cache.keys() == []
+
+
+def test_past_ranges_expire_after_the_historical_ttl(monkeypatch):
+    cache = filled_cache()
+    now = time.monotonic()
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 60)
+    assert cache.get("overview", TODAY, TODAY) is None  # live TTL: 30s
+    assert cache.get("overview", LAST_WEEK, YESTERDAY) == "past 7 days"
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 700)
+    assert cache.get("overview", LAST_WEEK, YESTERDAY) is None
@@ -0,0 +1,361 @@
+import asyncio
+import uuid
+from datetime import UTC, date, datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import text
+
+from app.modules.analytics import service
+from app.modules.analytics.service import (
+    AnalyticsService,
+    _decode_cursor,
+    _encode_cursor,
+    _timeseries_bucket,
+    get_dashboard,
+)
+
+
+@pytest.fixture
+def max_points(monkeypatch):
+    monkeypatch.setattr(service.settings, "ANALYTICS_TIMESERIES_MAX_POINTS", 10)
+    return 10
+
+
+def test_timeseries_bucket_kept_when_range_fits(max_points):
+    assert _timeseries_bucket("1h", timedelta(hours=10)) == ("1h", timedelta(hours=1))
+
+
+def test_timeseries_bucket_widened_past_max_points(max_points):
+    assert _timeseries_bucket("15m", timedelta(hours=10, minutes=1)) == (
+        "2h",
+        timedelta(hours=2),
+    )
+    assert _timeseries_bucket("1h", timedelta(days=30)) == ("7d", timedelta(days=7))
+
+
+def test_timeseries_bucket_never_narrowed(max_points):
+    assert _timeseries_bucket("1d", timedelta(hours=1)) == ("1d", timedelta(days=1))
+
+
+def test_timeseries_bucket_past_the_ladder_uses_whole_days(max_points):
+    # 30d * 10 points = 300 days; a year needs 37-day buckets
+    assert _timeseries_bucket("1d", timedelta(days=365)) == (
+        "37d",
+        timedelta(days=37),
+    )
+
+
+def test_cursor_round_trip():
+    row = {"changed_at": datetime(2025, 3, 10, 8, 30, 15, 123456), "id": uuid.uuid4()}
+    assert _decode_cursor(_encode_cursor(row)) == (row["changed_at"], row["id"])
+
+
+def test_cursor_with_offset_is_read_as_naive_utc():
+    log_id = uuid.uuid4()
+    changed_at = datetime(2025, 3, 10, 10, 30, tzinfo=timezone(timedelta(hours=2)))
+    cursor = _encode_cursor({"changed_at": changed_at, "id": log_id})
+    assert _decode_cursor(cursor) == (datetime(2025, 3, 10, 8, 30), log_id)
+
+
+@pytest.mark.parametrize("cursor", ["", "not base64!", "MjAyNXxub3QtYS11dWlk"])
+def test_invalid_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        _decode_cursor(cursor)
+    assert error.value.status_code == 400
+
+
+@pytest.fixture
+async def add_status_logs(make_patient, user):
+    """
+    Factory: a new patient with status changes at the given times. The logs
+    are deleted afterwards; they're dated in the future, so left behind they
+    would crowd later runs out of the recent activity page.
+    """
+    from app.core.database import SessionLocal
+    from app.modules.status_logs.models import StatusLog
+
+    patient_ids = []
+
+    async def add(*changed_at: datetime, statuses: tuple[str, ...] = ()):
+        """`statuses`: the status entered at each time (default: 'Checked In')."""
+        patient = await make_patient()
+        patient_ids.append(patient.id)
+        statuses = statuses or ("Checked In",) * len(changed_at)
+        async with SessionLocal() as session:
+            for at, previous, new in zip(
+                changed_at, (None, *statuses), statuses, strict=False
+            ):
+                session.add(
+                    StatusLog(
+                        patient_id=patient.id,
+                        previous_status=previous,
+                        new_status=new,
+                        changed_by=user.id,
+                        changed_at=at,
+                    )
+                )
+            await session.commit()
+        return patient
+
+    yield add
+    async with SessionLocal() as session:
+        await session.exec(
+            text("DELETE FROM statuslog WHERE patient_id = ANY(:ids)"),
+            params={"ids": patient_ids},
+        )
+        await session.commit()
+
+
+async def test_recent_activity_since_with_offset(add_status_logs):
+    from app.core.database import SessionLocal
+
+    patient = await add_status_logs(datetime(2031, 1, 1, 7), datetime(2031, 1, 1, 9))
+
+    # 10:00 at UTC+2 is 08:00 UTC: only the 09:00 change is newer
+    since = datetime(2031, 1, 1, 10, tzinfo=timezone(timedelta(hours=2)))
+    async with SessionLocal() as session:
+        result = await AnalyticsService(session).get_recent_activity(since=since)
+
+    changes = [
+        change["changed_at"]
+        for change in result["status_changes"]
+        if change["patient_number"] == patient.patient_number
+    ]
+    assert changes == [datetime(2031, 1, 1, 9)]
+    assert result["latest"] >= datetime(2031, 1, 1, 9)
+
+
+async def test_overview_average_wait(add_status_logs):
+    from app.core.database import SessionLocal
+    from app.modules.analytics.cache import analytics_cache
+
+    day = datetime(2031, 2, 1)
+    # Minutes after 08:00 of each patient's status changes
+    patients = (
+        (0, 30),  # waited 30
+        (60, 150, 600),  # waited 90 (first to second change only)
+        (120,),  # still waiting: not counted
+        (-600, 30),  # first change the day before: not counted
+    )
+    for offsets in patients:
+        await add_status_logs(
+            *(day + timedelta(hours=8, minutes=offset) for offset in offsets)
+        )
+
+    analytics_cache.clear()
+    async with SessionLocal() as session:
+        overview = await AnalyticsService(session).get_overview(day.date(), day.date())
+
+    assert overview["avg_wait_time_minutes"] == 60.0
+
+
+async def test_dashboard_runs_sections_concurrently(database, monkeypatch):
+    from app.core.database import SessionLocal
+    from app.modules.status.counters import status_counters
+
+    await status_counters.load()
+
+    # Both sections wait for each other: run one after the other, they'd time out
+    barrier = asyncio.Barrier(2)
+
+    async def overview(self, start, end):
+        await barrier.wait()
+        return {"start": start, "end": end}
+
+    async def recent_activity(self, limit, cursor, since):
+        await barrier.wait()
+        return {"limit": limit, "since": since}
+
+    monkeypatch.setattr(AnalyticsService, "get_overview", overview)
+    monkeypatch.setattr(AnalyticsService, "get_recent_activity", recent_activity)
+    monkeypatch.setattr(service.settings, "ANALYTICS_SECTION_TIMEOUT", 2)
+
+    since = datetime(2031, 5, 1, 8)
+    dashboard = await get_dashboard(
+        SessionLocal, date(2031, 5, 1), date(2031, 5, 2), since=since
+    )
+
+    assert dashboard["errors"] == {}
+    assert dashboard["overview"] == {"start": date(2031, 5, 1), "end": date(2031, 5, 2)}
+    assert dashboard["recent_activity"] == {"limit": 50, "since": since}
+    assert [row["status"] for row in dashboard["status_breakdown"]]
+    assert set(dashboard["timings_ms"]) == {
+        "overview",
+        "recent_activity",
+        "status_breakdown",
+    }
+
+
+async def test_dashboard_section_failures_are_isolated(database, monkeypatch):
+    from app.core.database import SessionLocal
+
+    async def slow_overview(self, start, end):
+        await asyncio.sleep(5)
+
+    async def broken_activity(self, limit, cursor, since):
+        raise RuntimeError("replica down")
+
+    monkeypatch.setattr(AnalyticsService, "get_overview", slow_overview)
+    monkeypatch.setattr(AnalyticsService, "get_recent_activity", broken_activity)
+    monkeypatch.setattr(service.settings, "ANALYTICS_SECTION_TIMEOUT", 0.05)
+
+    dashboard = await get_dashboard(SessionLocal)
+
+    assert dashboard["overview"] is None
+    assert dashboard["recent_activity"] is None
+    assert dashboard["errors"] == {
+        "overview": "timed out after 0.05s",
+        "recent_activity": "replica down",
+    }
+    assert dashboard["status_breakdown"] is not None
+
+
+async def test_dwell_times(add_status_logs):
+    from app.core.database import SessionLocal
+    from app.modules.analytics.cache import analytics_cache
+
+    day = datetime(2031, 3, 1)
+    shift = day.replace(hour=8)
+    await add_status_logs(
+        shift,
+        shift + timedelta(minutes=20),
+        shift + timedelta(minutes=60),
+        statuses=("Checked In", "Pre-Procedure", "In-progress"),
+    )
+    await add_status_logs(
+        shift,
+        shift + timedelta(minutes=40),
+        statuses=("Checked In", "Pre-Procedure"),
+    )
+    # Entered before the range: its dwell is left out
+    await add_status_logs(
+        day - timedelta(minutes=10),
+        day + timedelta(minutes=10),
+        statuses=("Checked In", "Pre-Procedure"),
+    )
+    # Entered in the range, left after it: counted
+    await add_status_logs(
+        day.replace(hour=23),
+        day.replace(hour=23) + timedelta(minutes=120),
+        statuses=("Checked In", "Pre-Procedure"),
+    )
+
+    analytics_cache.clear()
+    async with SessionLocal() as session:
+        dwell_times = await AnalyticsService(session).get_dwell_times(
+            day.date(), day.date()
+        )
+
+    # Statuses nobody has left yet (In-progress) have no dwell times
+    checked_in, pre_procedure = dwell_times
+    assert checked_in["status"] == "Checked In"
+    assert checked_in["count"] == 3  # 20, 40 and 120 minutes
+    assert checked_in["mean_minutes"] == 60.0
+    assert checked_in["p50_minutes"] == 40.0
+    assert checked_in["p90_minutes"] == 104.0
+    assert checked_in["max_minutes"] == 120.0
+    assert {
+        bucket["from_minutes"]: bucket["count"]
+        for bucket in checked_in["histogram"]
+        if bucket["count"]
+    } == {15: 1, 30: 1, 120: 1}
+    assert checked_in["histogram"][-1] == {
+        "from_minutes": 1440,
+        "to_minutes": None,
+        "count": 0,
+    }
+    assert pre_procedure["status"] == "Pre-Procedure"
+    assert pre_procedure["count"] == 1
+    assert pre_procedure["p99_minutes"] == 40.0
+
+
+async def test_transitions_matrix_and_funnel(add_status_logs):
+    from app.core.database import SessionLocal
+    from app.modules.analytics.cache import analytics_cache
+
+    day = datetime(2031, 4, 1)
+    times = [day + timedelta(hours=8, minutes=10 * i) for i in range(3)]
+    await add_status_logs(
+        *times, statuses=("Checked In", "Pre-Procedure", "In-progress")
+    )
+    await add_status_logs(
+        *times, statuses=("Checked In", "In-progress", "Pre-Procedure")
+    )
+    await add_status_logs(*times[:2])  # Checked In twice
+
+    analytics_cache.clear()
+    async with SessionLocal() as session:
+        transitions = await AnalyticsService(session).get_transitions(
+            day.date(), day.date()
+        )
+
+    assert transitions["statuses"][:3] == ["Checked In", "Pre-Procedure", "In-progress"]
+    assert [
+        (item["from_status"], item["to_status"], item["count"], item["kind"])
+        for item in transitions["matrix"]
+    ] == [
+        (None, "Checked In", 3, "initial"),
+        ("Checked In", "Checked In", 1, "repeated"),
+        ("Checked In", "Pre-Procedure", 1, "forward"),
+        ("Checked In", "In-progress", 1, "skipped"),
+        ("Pre-Procedure", "In-progress", 1, "forward"),
+        ("In-progress", "Pre-Procedure", 1, "backward"),
+    ]
+    assert transitions["totals"] == {
+        "transitions": 8,
+        "initial": 3,
+        "forward": 2,
+        "skipped": 1,
+        "skipped_steps": 1,
+        "backward": 1,
+        "repeated": 1,
+    }
+    funnel = {stage["status"]: stage for stage in transitions["funnel"]}
+    assert (funnel["Checked In"]["patients"], funnel["Checked In"]["entries"]) == (3, 4)
+    assert funnel["Checked In"]["conversion"] is None
+    assert funnel["Pre-Procedure"]["conversion"] == 0.667
+    assert funnel["In-progress"]["conversion"] == 1.0
+    assert funnel["Closing"]["patients"] == 0
+    assert funnel["Recovery"]["conversion"] is None  # nobody reached Closing
+
+
+async def test_status_change_today_evicts_cached_past_ranges(add_status_logs, user):
+    from app.core.database import SessionLocal
+    from app.modules.analytics.cache import analytics_cache
+    from app.modules.patient.schemas import PatientUpdate
+    from app.modules.patient.service import PatientService
+
+    # Admitted and checked in three days ago, completed today
+    checked_in = datetime.now(UTC).replace(tzinfo=None) - timedelta(days=3)
+    patient = await add_status_logs(checked_in)
+    async with SessionLocal() as session:
+        await session.exec(
+            text("UPDATE patient SET created_at = :at WHERE id = :id"),
+            params={"at": checked_in, "id": patient.id},
+        )
+        await session.commit()
+
+    start, end = checked_in.date(), date.today() - timedelta(days=1)
+
+    async def past_range() -> tuple[dict, list[dict]]:
+        async with SessionLocal() as session:
+            analytics = AnalyticsService(session)
+            return (
+                await analytics.get_overview(start, end),
+                await analytics.get_dwell_times(start, end),
+            )
+
+    analytics_cache.clear()
+    overview, dwell_times = await past_range()  # cached with no live TTL
+
+    async with SessionLocal() as session:
+        await PatientService(session).update_patient(
+            patient.patient_number, PatientUpdate(status="Complete"), user.id
+        )
+
+    cached = await past_range()
+    analytics_cache.clear()
+    assert cached == await past_range()
+    assert cached[0]["active_cases"] == overview["active_cases"] - 1
+    assert cached[1] != dwell_times
@@ -0,0 +1,112 @@
+import json
+
+import pytest
+
+from app.core import cache
+from app.core.cache import InvalidationBus, PostgresInvalidationBus, TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_entries_expire_after_ttl(clock):
+    entries = TTLCache("test", max_entries=10, ttl=30)
+    entries.set("a", 1)
+    entries.set("b", 2, ttl=60)
+
+    clock[0] += 29
+    assert entries.get("a") == 1
+    clock[0] += 2
+    assert entries.get("a") is None
+    assert entries.get("b") == 2
+    assert entries.keys() == ["b"]
+
+
+def test_least_recently_used_entry_is_evicted():
+    entries = TTLCache("test", max_entries=2, ttl=30)
+    entries.set("a", 1)
+    entries.set("b", 2)
+    entries.get("a")
+    entries.set("c", 3)
+
+    assert entries.keys() == ["a", "c"]
+    assert entries.get("b") is None
+
+
+def test_zero_size_cache_stores_nothing():
+    entries = TTLCache("test", max_entries=0, ttl=30)
+    entries.set("a", 1)
+    assert entries.get("a") is None
+
+
+def test_add_does_not_overwrite(clock):
+    entries = TTLCache("test", max_entries=10, ttl=30)
+    entries.set("a", "written")
+    entries.add("a", "read before the write")
+    assert entries.get("a") == "written"
+
+    clock[0] += 31
+    entries.add("a", "reloaded")
+    assert entries.get("a") == "reloaded"
+
+
+def test_apply_sets_deletes_and_clears():
+    bus = InvalidationBus()
+    entries = bus.register(TTLCache("test", max_entries=10, ttl=30))
+    entries.set("a", 1)
+    entries.set("b", 2)
+
+    bus._apply("test", "a", 10)
+    assert entries.get("a") == 10
+    bus._apply("test", "a", None)
+    assert entries.get("a") is None
+    assert entries.get("b") == 2
+    bus._apply("test", None, None)
+    assert entries.keys() == []
+
+    bus._apply("unknown", "a", 1)  # not registered in this worker: ignored
+
+
+async def test_invalidate_evicts_locally():
+    bus = InvalidationBus()
+    entries = bus.register(TTLCache("test", max_entries=10, ttl=30))
+    entries.set("a", 1)
+    await bus.invalidate("test", "a")
+    assert entries.get("a") is None
+
+
+def notify(bus: PostgresInvalidationBus, **message) -> None:
+    bus._on_notify(None, 0, cache.NOTIFY_CHANNEL, json.dumps(message))
+
+
+def test_notifications_from_other_workers_are_applied():
+    bus = PostgresInvalidationBus("postgresql://unused")
+    entries = bus.register(TTLCache("test", max_entries=10, ttl=30))
+    entries.set("a", b"old")
+    entries.set("b", b"old")
+
+    notify(bus, o="other", c="test", k="a", v="new")
+    notify(bus, o="other", c="test", k="b", v=None)
+    assert entries.get("a") == b"new"
+    assert entries.get("b") is None
+
+    # Our own messages were applied when sent
+    notify(bus, o=bus.origin, c="test", k="a", v=None)
+    assert entries.get("a") == b"new"
+
+
+def test_bad_notification_does_not_break_the_listener(caplog):
+    bus = PostgresInvalidationBus("postgresql://unused")
+    entries = bus.register(TTLCache("test", max_entries=10, ttl=30))
+    entries.set("a", b"old")
+
+    notify(bus, o="other", c="test", k=["not", "hashable"], v=None)
+    bus._on_notify(None, 0, cache.NOTIFY_CHANNEL, "not json")
+    assert "Could not apply cache invalidation" in caplog.text
+
+    notify(bus, o="other", c="test", k="a", v=None)
+    assert entries.get("a") is None
@@ -0,0 +1,72 @@
+import asyncio
+import uuid
+from datetime import timedelta
+
+import httpx
+import pytest
+
+from app.modules.health import service
+
+
+@pytest.mark.parametrize("path", ["/health/pool", "/health/jobs"])
+async def test_operational_stats_are_admin_only(client, path):
+    from app.core.database import SessionLocal
+    from app.core.security import create_access_token
+    from app.modules.user.models import User
+    from app.modules.user.schemas import RoleEnum
+
+    async with SessionLocal() as session:
+        surgeon = User(
+            name="Test Surgeon",
+            email=f"surgeon-{uuid.uuid4().hex}@hospital.com",
+            hashed_password="x",
+            role=RoleEnum.surgical_team,
+        )
+        session.add(surgeon)
+        await session.commit()
+    surgeon_token = create_access_token({"sub": str(surgeon.id)}, timedelta(minutes=5))
+
+    anonymous = await client.get(path, headers={"Authorization": ""})
+    forbidden = await client.get(
+        path, headers={"Authorization": f"Bearer {surgeon_token}"}
+    )
+    allowed = await client.get(path)
+
+    assert anonymous.status_code == 401
+    assert forbidden.status_code == 403
+    assert allowed.status_code == 200
+
+
+async def test_probes_stay_public(database):
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        assert (await http.get("/health/live")).status_code == 200
+        assert (await http.get("/health/ready")).status_code in (200, 503)
+
+
+async def test_chat_upstream_probe_waits_for_the_socket_to_close(monkeypatch):
+    class Writer:
+        closed = waited = False
+
+        def close(self):
+            self.closed = True
+
+        async def wait_closed(self):
+            await asyncio.sleep(0)
+            self.waited = True
+
+    writer = Writer()
+
+    async def open_connection(host, port):
+        assert (host, port) == (service.CHAT_UPSTREAM_HOST, 443)
+        return None, writer
+
+    monkeypatch.setattr(service.settings, "GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(asyncio, "open_connection", open_connection)
+
+    result = await service._check_chat_upstream()
+
+    assert result["ok"] is True
+    assert writer.closed and writer.waited
@@ -0,0 +1,191 @@
+import asyncio
+import uuid
+
+import orjson
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.modules.idempotency.service import IdempotencyStore
+from app.shared.utils.serialization import json_response
+
+
+def make_store(lease: float = 60, wait: float = 2) -> IdempotencyStore:
+    """One worker's store (its own response cache and running events)."""
+    return IdempotencyStore(
+        ttl_hours=1, lease_seconds=lease, wait_seconds=wait, cache_size=10
+    )
+
+
+def make_request(body: dict, path: str = "/patients/") -> Request:
+    async def receive():
+        return {"type": "http.request", "body": orjson.dumps(body), "more_body": False}
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": path,
+        "headers": [],
+        "query_string": b"",
+    }
+    return Request(scope, receive)
+
+
+class Handler:
+    """Counts its runs; `gate` (when set) holds each run until it's opened."""
+
+    def __init__(self, status_code: int = 201, gate: asyncio.Event | None = None):
+        self.status_code = status_code
+        self.gate = gate
+        self.calls = 0
+        self.started = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        self.started.set()
+        if self.gate is not None:
+            await self.gate.wait()
+        return json_response({"run": self.calls}, self.status_code)
+
+
+@pytest.fixture
+def key():
+    return f"test-{uuid.uuid4()}"
+
+
+async def test_first_request_runs_and_retries_replay_it(user, key):
+    store, handler = make_store(), Handler()
+
+    first = await store.run(make_request({"a": 1}), key, user.id, handler)
+    retry = await store.run(make_request({"a": 1}), key, user.id, handler)
+    # Another worker: nothing cached, the stored row is replayed
+    elsewhere = await make_store().run(make_request({"a": 1}), key, user.id, handler)
+
+    assert handler.calls == 1
+    assert first.status_code == 201
+    assert "idempotent-replayed" not in first.headers
+    for replay in (retry, elsewhere):
+        assert replay.status_code == 201
+        assert replay.body == first.body
+        assert replay.headers["idempotent-replayed"] == "true"
+
+
+async def test_key_reused_for_another_request_is_a_422(user, key):
+    store = make_store()
+    await store.run(make_request({"a": 1}), key, user.id, Handler())
+
+    for request in (make_request({"a": 2}), make_request({"a": 1}, "/patients/X")):
+        with pytest.raises(HTTPException) as error:
+            await store.run(request, key, user.id, Handler())
+        assert error.value.status_code == 422
+
+
+@pytest.mark.parametrize("same_worker", [True, False])
+async def test_concurrent_duplicate_waits_for_the_first(user, key, same_worker):
+    first_worker = make_store()
+    retry_worker = first_worker if same_worker else make_store()
+    handler = Handler(gate=asyncio.Event())
+
+    first = asyncio.create_task(
+        first_worker.run(make_request({"a": 1}), key, user.id, handler)
+    )
+    await handler.started.wait()
+    retry = asyncio.create_task(
+        retry_worker.run(make_request({"a": 1}), key, user.id, handler)
+    )
+    await asyncio.sleep(0.2)
+    assert not retry.done()  # waiting for the first request's outcome
+
+    handler.gate.set()
+    first, retry = await first, await retry
+
+    assert handler.calls == 1
+    assert retry.body == first.body
+    assert retry.headers["idempotent-replayed"] == "true"
+
+
+async def test_duplicate_gives_up_with_a_409(user, key):
+    store = make_store(wait=0.2)
+    handler = Handler(gate=asyncio.Event())
+    first = asyncio.create_task(
+        store.run(make_request({"a": 1}), key, user.id, handler)
+    )
+    await handler.started.wait()
+
+    with pytest.raises(HTTPException) as error:
+        await store.run(make_request({"a": 1}), key, user.id, handler)
+
+    assert error.value.status_code == 409
+    assert error.value.headers == {"Retry-After": "1"}
+    handler.gate.set()
+    await first
+
+
+async def test_lapsed_lease_is_claimed_again(user, key):
+    # The first worker hangs past its lease, as if it had died
+    hung = Handler(gate=asyncio.Event())
+    dead_worker = make_store(lease=0.1)
+    stuck = asyncio.create_task(
+        dead_worker.run(make_request({"a": 1}), key, user.id, hung)
+    )
+    await hung.started.wait()
+
+    other = Handler()
+    response = await make_store(wait=2).run(make_request({"a": 1}), key, user.id, other)
+
+    assert other.calls == 1
+    assert response.status_code == 201
+    assert "idempotent-replayed" not in response.headers
+    # A different request still can't take the key over
+    with pytest.raises(HTTPException) as error:
+        await make_store().run(make_request({"a": 2}), key, user.id, Handler())
+    assert error.value.status_code == 422
+    stuck.cancel()
+
+
+async def test_failures_release_the_key(user, key):
+    store = make_store()
+
+    async def broken():
+        raise RuntimeError("database down")
+
+    with pytest.raises(RuntimeError):
+        await store.run(make_request({"a": 1}), key, user.id, broken)
+    rejected = await store.run(
+        make_request({"a": 1}), key, user.id, Handler(status_code=409)
+    )
+    handler = Handler()
+    accepted = await store.run(make_request({"a": 1}), key, user.id, handler)
+
+    assert rejected.status_code == 409
+    assert accepted.status_code == 201
+    assert handler.calls == 1
+
+
+async def test_admission_retry_creates_one_patient(client, key):
+    body = {
+        "first_name": "Idem",
+        "last_name": key,
+        "address": "1 Test Street",
+        "city": "Testville",
+        "state": "TS",
+        "country": "Testland",
+        "phone": "+10000000000",
+        "email": "family@hospital.com",
+        "procedure": "Appendectomy",
+        "scheduled_time": "2033-01-01T09:00:00",
+    }
+    headers = {"Idempotency-Key": key}
+
+    first = await client.post("/patients/", json=body, headers=headers)
+    retry = await client.post("/patients/", json=body, headers=headers)
+    changed = await client.post(
+        "/patients/", json={**body, "note": "changed"}, headers=headers
+    )
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert changed.status_code == 422
+    found = await client.get("/patients/search/", params={"name": key})
+    assert len(found.json()) == 1
@@ -0,0 +1,101 @@
+import json
+import logging
+import queue
+import sys
+
+from app.core.logging import (
+    DroppingQueueHandler,
+    JsonFormatter,
+    RequestIdFilter,
+    parse_log_levels,
+    request_id_var,
+)
+
+
+def make_record(msg="patient %s updated", *args, **extra) -> logging.LogRecord:
+    record = logging.getLogger("app.test").makeRecord(
+        "app.test", logging.INFO, __file__, 1, msg, args or ("AB12CD",), None
+    )
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_record_carries_extra_fields():
+    record = make_record(route="GET /status/", queries=3, slowest_statement=None)
+
+    payload = json.loads(JsonFormatter().format(record))
+
+    assert payload["level"] == "INFO"
+    assert payload["logger"] == "app.test"
+    assert payload["message"] == "patient AB12CD updated"
+    assert payload["route"] == "GET /status/"
+    assert payload["queries"] == 3
+    assert "slowest_statement" not in payload  # None values are left out
+    assert "args" not in payload and "msg" not in payload
+
+
+def test_json_record_includes_the_traceback():
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.getLogger("app.test").makeRecord(
+            "app.test", logging.ERROR, __file__, 1, "failed", (), sys.exc_info()
+        )
+
+    payload = json.loads(JsonFormatter().format(record))
+
+    assert payload["exc_info"].startswith("Traceback")
+    assert "ValueError: boom" in payload["exc_info"]
+
+
+def test_request_id_filter_stamps_the_current_request():
+    record_filter = RequestIdFilter()
+    outside = make_record()
+    assert record_filter.filter(outside)
+    assert outside.request_id is None
+
+    token = request_id_var.set("req-42")
+    try:
+        inside = make_record()
+        record_filter.filter(inside)
+    finally:
+        request_id_var.reset(token)
+
+    assert inside.request_id == "req-42"
+    assert json.loads(JsonFormatter().format(inside))["request_id"] == "req-42"
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    dropped = DroppingQueueHandler.dropped
+
+    handler.handle(make_record())
+    handler.handle(make_record())
+
+    assert handler.queue.qsize() == 1
+    assert DroppingQueueHandler.dropped == dropped + 1
+
+
+def test_parse_log_levels():
+    spec = "uvicorn.access=warning, sqlalchemy.engine = INFO,broken,=DEBUG"
+    assert parse_log_levels(spec) == {
+        "uvicorn.access": "WARNING",
+        "sqlalchemy.engine": "INFO",
+    }
+    assert parse_log_levels(None) == {}
+
+
+async def test_request_id_is_echoed_and_bound_to_log_records(client, caplog):
+    with caplog.at_level(logging.INFO, logger="app.sql"):
+        response = await client.get(
+            "/users/",
+            params={"role": "surgical_team"},
+            headers={"X-Request-ID": "trace-123"},
+        )
+        generated = await client.get("/users/", params={"role": "surgical_team"})
+
+    assert response.headers["x-request-id"] == "trace-123"
+    assert len(generated.headers["x-request-id"]) == 32
+    first, second = [r for r in caplog.records if r.name == "app.sql"]
+    assert first.request_id == "trace-123"
+    assert second.request_id == generated.headers["x-request-id"]
@@ -0,0 +1,40 @@
+from prometheus_client import REGISTRY
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+async def test_requests_are_labelled_by_route_template(client):
+    labels = {"method": "GET", "route": "/patients/{patient_number}"}
+    before = sample("http_requests_total", **labels, status="404")
+    observed = sample("http_request_duration_seconds_count", **labels)
+
+    for number in ("NOPE01", "NOPE02"):
+        response = await client.get(f"/patients/{number}")
+        assert response.status_code == 404
+
+    assert sample("http_requests_total", **labels, status="404") == before + 2
+    assert sample("http_request_duration_seconds_count", **labels) == observed + 2
+    assert sample("http_requests_in_flight") == 0
+
+
+async def test_metrics_endpoint_is_not_counted(client):
+    labels = {"method": "GET", "route": "/metrics", "status": "200"}
+
+    response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "http_request_duration_seconds_bucket" in response.text
+    assert sample("http_requests_total", **labels) == 0
+
+
+async def test_pool_gauges_follow_checkouts(database):
+    from app.core.database import engine
+
+    base = sample("db_pool_checked_out", engine="primary")
+    async with engine.connect():
+        assert sample("db_pool_checked_out", engine="primary") == base + 1
+    assert sample("db_pool_checked_out", engine="primary") == base
+    assert sample("db_pool_size", engine="primary") == engine.pool.size()
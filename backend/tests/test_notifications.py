@@ -0,0 +1,301 @@
+"""
+Outbox delivery against local stand-ins: an HTTP server for the "webhook"
+channel and a minimal SMTP server for "email".
+"""
+
+import asyncio
+import json
+import threading
+from datetime import UTC, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from app.modules.notifications import service
+from app.modules.notifications.senders import (
+    HttpSender,
+    PermanentSendError,
+    SmtpSender,
+)
+from app.modules.notifications.service import (
+    OutboxWorker,
+    enqueue_status_notifications,
+    retry_delay,
+)
+
+
+class Webhook(ThreadingHTTPServer):
+    """Records POSTed JSON; answers with `statuses` in turn (then 200)."""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), WebhookHandler)
+        self.received: list[dict] = []
+        self.statuses: list[int] = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}/hook"
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        length = int(self.headers["Content-Length"])
+        self.server.received.append(json.loads(self.rfile.read(length)))
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def webhook(monkeypatch):
+    server = Webhook()
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    monkeypatch.setattr(
+        service, "SENDERS", {"webhook": HttpSender("webhook", server.url)}
+    )
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+async def outbox(database, webhook):
+    """An outbox worker over an empty notification table (scratch database)."""
+    from app.core.database import SessionLocal
+
+    async with SessionLocal() as session:
+        await session.exec(text("DELETE FROM notification"))
+        await session.commit()
+    return OutboxWorker(workers=1, batch_size=20, poll_interval=1)
+
+
+async def queue_notification(patient, **fields):
+    from app.core.database import SessionLocal
+    from app.modules.notifications.models import Notification
+
+    async with SessionLocal() as session:
+        notification = Notification(
+            patient_id=patient.id,
+            event="status:Recovery",
+            channel="webhook",
+            recipient="ward-staff",
+            subject="Patient update: Recovery",
+            body="Test Patient is now in 'Recovery'.",
+            **fields,
+        )
+        session.add(notification)
+        await session.commit()
+        await session.refresh(notification)
+    return notification
+
+
+async def fetch(notification):
+    from app.core.database import SessionLocal
+    from app.modules.notifications.models import Notification
+
+    async with SessionLocal() as session:
+        return await session.get(Notification, notification.id)
+
+
+def utcnow() -> datetime:
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+async def test_due_notification_is_sent(outbox, webhook, make_patient):
+    notification = await queue_notification(await make_patient())
+
+    assert await outbox.run_once() == 1
+
+    assert webhook.received == [
+        {
+            "recipient": "ward-staff",
+            "subject": "Patient update: Recovery",
+            "body": "Test Patient is now in 'Recovery'.",
+        }
+    ]
+    row = await fetch(notification)
+    assert (row.state, row.attempts, row.locked_until) == ("sent", 1, None)
+    assert row.sent_at is not None
+    assert await outbox.run_once() == 0
+
+
+async def test_failed_send_is_retried_with_backoff(
+    outbox, webhook, make_patient, monkeypatch
+):
+    monkeypatch.setattr(service.settings, "NOTIFY_RETRY_BASE_SECONDS", 30)
+    notification = await queue_notification(await make_patient())
+    webhook.statuses = [503]
+
+    started = utcnow()
+    assert await outbox.run_once() == 1
+
+    row = await fetch(notification)
+    assert (row.state, row.attempts) == ("pending", 1)
+    assert "503" in row.last_error
+    assert 24 <= (row.available_at - started).total_seconds() <= 37
+    assert await outbox.run_once() == 0  # not due yet
+
+
+def test_retry_delay_doubles_up_to_an_hour(monkeypatch):
+    monkeypatch.setattr(service.settings, "NOTIFY_RETRY_BASE_SECONDS", 30)
+    assert 24 <= retry_delay(1) <= 36
+    assert 96 <= retry_delay(3) <= 144
+    assert 2880 <= retry_delay(20) <= 4320
+
+
+async def test_dead_lettered_after_max_attempts(
+    outbox, webhook, make_patient, monkeypatch
+):
+    monkeypatch.setattr(service.settings, "NOTIFY_MAX_ATTEMPTS", 2)
+    notification = await queue_notification(await make_patient())
+    webhook.statuses = [500, 500]
+
+    await outbox.run_once()
+    assert (await fetch(notification)).state == "pending"
+
+    await make_due(notification)
+    await outbox.run_once()
+    row = await fetch(notification)
+    assert (row.state, row.attempts, row.locked_until) == ("dead", 2, None)
+    assert len(webhook.received) == 2
+
+
+async def test_client_error_is_dead_lettered_at_once(outbox, webhook, make_patient):
+    notification = await queue_notification(await make_patient())
+    webhook.statuses = [422]
+
+    await outbox.run_once()
+    row = await fetch(notification)
+    assert (row.state, row.attempts) == ("dead", 1)
+    assert "422" in row.last_error
+
+
+async def make_due(notification) -> None:
+    from app.core.database import SessionLocal
+
+    async with SessionLocal() as session:
+        await session.exec(
+            text("UPDATE notification SET available_at = :now WHERE id = :id"),
+            params={"now": utcnow() - timedelta(seconds=1), "id": notification.id},
+        )
+        await session.commit()
+
+
+async def test_lapsed_lease_is_claimed_again(outbox, webhook, make_patient):
+    now = utcnow()
+    # Claimed by workers that died / are still sending
+    lapsed = await queue_notification(
+        await make_patient(),
+        state="sending",
+        attempts=1,
+        locked_until=now - timedelta(seconds=1),
+    )
+    held = await queue_notification(
+        await make_patient(),
+        state="sending",
+        attempts=1,
+        locked_until=now + timedelta(minutes=1),
+    )
+
+    assert await outbox.run_once() == 1
+
+    row = await fetch(lapsed)
+    assert (row.state, row.attempts) == ("sent", 2)
+    assert (await fetch(held)).state == "sending"
+
+
+async def test_notifications_roll_back_with_the_status_change(outbox, make_patient):
+    from app.core.database import SessionLocal
+    from app.modules.patient.models import Patient
+
+    patient = await make_patient()
+    async with SessionLocal() as session:
+        row = await session.get(Patient, patient.id)
+        assert enqueue_status_notifications(session, row, "Recovery") == 1
+        row.status = "No such status"  # the status change fails (foreign key)
+        session.add(row)
+        with pytest.raises(IntegrityError):
+            await session.commit()
+        await session.rollback()
+
+    async with SessionLocal() as session:
+        result = await session.exec(
+            text("SELECT count(*) FROM notification WHERE patient_id = :id"),
+            params={"id": patient.id},
+        )
+        assert result.one()[0] == 0
+    assert await outbox.run_once() == 0
+
+
+class SmtpStandIn:
+    """Just enough SMTP for smtplib; refuses recipients containing "refused"."""
+
+    def __init__(self):
+        self.messages: list[bytes] = []
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self._session, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _session(self, reader, writer):
+        def reply(line: str) -> None:
+            writer.write(f"{line}\r\n".encode())
+
+        reply("220 stand-in")
+        while line := await reader.readline():
+            command = line.decode().strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                reply("250 stand-in")
+            elif command.startswith("RCPT") and "REFUSED" in command:
+                reply("550 no such user")
+            elif command == "DATA":
+                reply("354 go ahead")
+                data = b""
+                while (chunk := await reader.readline()) != b".\r\n":
+                    data += chunk
+                self.messages.append(data)
+                reply("250 queued")
+            elif command == "QUIT":
+                reply("221 bye")
+                await writer.drain()
+                break
+            else:
+                reply("250 ok")
+            await writer.drain()
+        writer.close()
+
+
+@pytest.fixture
+async def smtp():
+    server = SmtpStandIn()
+    port = await server.start()
+    yield server, SmtpSender("127.0.0.1", port, "ward@test.local", timeout=5)
+    await server.stop()
+
+
+async def test_smtp_sender(smtp):
+    server, sender = smtp
+    await sender.send("family@test.local", "Patient update", "Now in Recovery.")
+
+    [message] = server.messages
+    assert b"To: family@test.local" in message
+    assert b"Now in Recovery." in message
+
+
+async def test_smtp_refused_recipient_is_permanent(smtp):
+    _, sender = smtp
+    with pytest.raises(PermanentSendError):
+        await sender.send("refused@test.local", "Patient update", "Now in Recovery.")
@@ -0,0 +1,29 @@
+import pytest
+
+from app.core.profiling import parse_sample_routes
+
+
+def test_parse_sample_routes():
+    spec = "GET /patients/{patient_number}=100, post /patients/ = 5"
+    assert parse_sample_routes(spec) == {
+        ("GET", "/patients/{patient_number}"): 100,
+        ("POST", "/patients/"): 5,
+    }
+
+
+@pytest.mark.parametrize("spec", [None, "", " , ,"])
+def test_parse_sample_routes_empty(spec):
+    assert parse_sample_routes(spec) == {}
+
+
+def test_parse_sample_routes_profiles_at_least_every_request():
+    assert parse_sample_routes("GET /status/=0") == {("GET", "/status/"): 1}
+
+
+def test_parse_sample_routes_last_equals_sign_is_the_rate():
+    assert parse_sample_routes("GET /search/?q=a=3") == {("GET", "/search/?q=a"): 3}
+
+
+def test_parse_sample_routes_rejects_missing_rate():
+    with pytest.raises(ValueError):
+        parse_sample_routes("GET /status/")
@@ -0,0 +1,63 @@
+import logging
+import re
+
+from sqlalchemy import text
+from starlette.responses import PlainTextResponse
+
+from app.core.middleware import QueryStatsMiddleware
+from app.core.query_stats import current_request_stats
+
+
+def server_timing(response) -> dict[str, str]:
+    """'db;dur=1.2;desc="3 queries", app;dur=4' -> {"db": 'dur=1.2;desc="3 queries"', ...}"""
+    entries = (
+        part.strip().partition(";")
+        for part in response.headers["server-timing"].split(",")
+    )
+    return {name: params for name, _, params in entries}
+
+
+def query_count(response) -> int:
+    return int(re.search(r'desc="(\d+) queries"', server_timing(response)["db"])[1])
+
+
+async def test_server_timing_counts_the_request_queries(client):
+    response = await client.get("/users/", params={"role": "surgical_team"})
+
+    assert response.status_code == 200
+    assert set(server_timing(response)) == {"db", "db-slowest", "app"}
+    assert query_count(response) >= 2  # the signed-in user + the user list
+
+
+async def test_no_stats_outside_a_request(database):
+    from app.core.database import SessionLocal
+
+    async with SessionLocal() as session:
+        await session.exec(text("SELECT 1"))
+    assert current_request_stats() is None
+
+
+async def test_budget_warning_names_the_route(database, caplog):
+    import httpx
+
+    from app.core.database import SessionLocal
+
+    async def endpoint(scope, receive, send):
+        async with SessionLocal() as session:
+            for _ in range(3):
+                await session.exec(text("SELECT pg_sleep(0)"))
+        await PlainTextResponse("ok")(scope, receive, send)
+
+    middleware = QueryStatsMiddleware(endpoint)
+    middleware.query_budget = 2
+    transport = httpx.ASGITransport(app=middleware)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        with caplog.at_level(logging.INFO, logger="app.sql"):
+            response = await http.get("/report")
+
+    assert query_count(response) == 3
+    (record,) = [r for r in caplog.records if r.name == "app.sql"]
+    assert record.levelno == logging.WARNING
+    assert record.route == "GET unmatched"
+    assert record.queries == 3
+    assert "pg_sleep" in record.slowest_statement
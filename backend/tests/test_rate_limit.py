@@ -0,0 +1,108 @@
+import asyncio
+import time
+import uuid
+from datetime import timedelta
+
+import pytest
+
+from app.core.rate_limit import (
+    MemoryBucketBackend,
+    PostgresBucketBackend,
+    RateLimiter,
+    classify,
+)
+from app.core.security import create_access_token
+
+
+@pytest.mark.parametrize(
+    ("method", "path", "route_class"),
+    [
+        ("POST", "/patients/", "critical"),
+        ("PUT", "/patients/AB12CD", "critical"),
+        ("GET", "/patients/AB12CD", "standard"),
+        ("GET", "/patients/search/", "bulk"),
+        ("GET", "/analytics/overview/", "bulk"),
+        ("GET", "/health/pool", None),
+        ("GET", "/metrics", None),
+        ("OPTIONS", "/patients/", None),
+    ],
+)
+def test_classify(method, path, route_class):
+    assert classify(method, path) == route_class
+
+
+@pytest.fixture
+async def postgres_backend(database):
+    from app.core.database import ASYNC_DATABASE_URL
+
+    backend = PostgresBucketBackend(ASYNC_DATABASE_URL, pool_size=1)
+    await backend.start()
+    yield backend
+    await backend.stop()
+
+
+async def check_burst_then_limit(backend) -> None:
+    key = f"test:{uuid.uuid4()}"
+    rate = 1 / 60  # one token a minute
+
+    assert [await backend.take(key, rate, 3) for _ in range(3)] == [0, 0, 0]
+    wait = await backend.take(key, rate, 3)
+    assert 55 < wait <= 60
+    assert await backend.take(f"test:{uuid.uuid4()}", rate, 3) == 0  # own bucket
+
+
+async def check_refill(backend) -> None:
+    key = f"test:{uuid.uuid4()}"
+
+    assert await backend.take(key, 20.0, 1) == 0
+    assert await backend.take(key, 20.0, 1) > 0
+    await asyncio.sleep(0.06)  # > 1/20 s: a token is due again
+    assert await backend.take(key, 20.0, 1) == 0
+
+
+async def test_memory_take():
+    await check_burst_then_limit(MemoryBucketBackend())
+    await check_refill(MemoryBucketBackend())
+
+
+async def test_postgres_take(postgres_backend):
+    await check_burst_then_limit(postgres_backend)
+    await check_refill(postgres_backend)
+    assert not postgres_backend._failing  # answered by the database
+
+
+async def test_postgres_take_doesnt_fail_open(postgres_backend):
+    key = f"test:{uuid.uuid4()}"
+    assert await postgres_backend.take(key, 0.5, 1) == 0
+    assert await postgres_backend.take(key, 0.5, 1) > 0
+    assert not postgres_backend._failing
+
+
+def scope_with_token(token: str) -> dict:
+    return {
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+        "client": ("10.0.0.1", 1234),
+    }
+
+
+def test_caller_is_the_token_subject_until_it_expires():
+    limiter = RateLimiter(MemoryBucketBackend(), {}, retry_after=1)
+    token = create_access_token({"sub": "user-1"}, timedelta(seconds=5))
+
+    assert limiter.caller(scope_with_token(token)) == "user:user-1"
+    expires_at, _ = limiter._subjects._entries[token]
+    assert expires_at - time.monotonic() <= 5
+
+    long_lived = create_access_token({"sub": "user-2"}, timedelta(hours=1))
+    assert limiter.caller(scope_with_token(long_lived)) == "user:user-2"
+    expires_at, _ = limiter._subjects._entries[long_lived]
+    assert 55 < expires_at - time.monotonic() <= 60
+
+
+def test_caller_without_a_valid_token_is_the_client_address():
+    limiter = RateLimiter(MemoryBucketBackend(), {}, retry_after=1)
+    expired = create_access_token({"sub": "user-1"}, timedelta(seconds=-1))
+
+    assert limiter.caller(scope_with_token(expired)) == "ip:10.0.0.1"
+    assert limiter.caller(scope_with_token("not-a-jwt")) == "ip:10.0.0.1"
+    assert limiter.caller({"headers": [], "client": None}) == "ip:unknown"
@@ -0,0 +1,138 @@
+"""
+Read-your-writes routing between the primary (TEST_DATABASE_URL) and a
+second database standing in for the replica (TEST_READ_REPLICA_URL).
+"""
+
+import asyncio
+import os
+import uuid
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.requests import Request
+
+from app.core import cache
+from app.core import database as db
+from app.core.security import create_access_token
+
+REPLICA_URL = os.environ.get("TEST_READ_REPLICA_URL")
+
+pytestmark = pytest.mark.skipif(
+    not REPLICA_URL, reason="TEST_READ_REPLICA_URL is not set"
+)
+
+
+def make_request(
+    subject: str | None, client: str = "10.0.0.1", minutes: int = 60
+) -> Request:
+    headers = []
+    if subject is not None:
+        token = create_access_token({"sub": subject}, timedelta(minutes=minutes))
+        headers.append((b"authorization", f"Bearer {token}".encode()))
+    return Request({"type": "http", "headers": headers, "client": (client, 1234)})
+
+
+async def served_by(request: Request) -> str:
+    async with db.read_session_factory(request)() as session:
+        result = await session.exec(text("SELECT current_database()"))
+        return result.one()[0]
+
+
+async def write_through_session(request: Request) -> None:
+    """Runs `get_session` like a route that wrote something."""
+    sessions = db.get_session(request)
+    session = await anext(sessions)
+    session.info["has_writes"] = True
+    with pytest.raises(StopAsyncIteration):
+        await anext(sessions)
+
+
+@pytest.fixture
+async def replica(database, monkeypatch):
+    engine = db._create_engine(db._to_async_url(REPLICA_URL))
+    monkeypatch.setattr(db, "read_engine", engine)
+    monkeypatch.setattr(
+        db,
+        "ReadSessionLocal",
+        async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False),
+    )
+    async with db.SessionLocal() as session:
+        primary = (await session.exec(text("SELECT current_database()"))).one()[0]
+    async with engine.connect() as conn:
+        name = (await conn.execute(text("SELECT current_database()"))).scalar()
+    assert name != primary, "the replica must be a different database"
+    yield primary, name
+    await engine.dispose()
+
+
+async def test_reads_stick_to_primary_after_a_write(replica):
+    primary, replica_name = replica
+    writer, other = uuid.uuid4().hex, uuid.uuid4().hex
+
+    assert await served_by(make_request(writer)) == replica_name
+
+    await write_through_session(make_request(writer))
+
+    assert await served_by(make_request(writer)) == primary
+    # Keyed on the user, not the token: a new login still reads its writes
+    assert await served_by(make_request(writer, minutes=5)) == primary
+    assert await served_by(make_request(other)) == replica_name
+    assert await served_by(make_request(None, client="10.0.0.2")) == replica_name
+
+
+async def test_reads_go_back_to_replica_after_sticky_window(replica, monkeypatch):
+    primary, replica_name = replica
+    writer = uuid.uuid4().hex
+    monkeypatch.setattr(db.recent_writers, "ttl", 0.2)
+
+    await write_through_session(make_request(writer))
+    assert await served_by(make_request(writer)) == primary
+
+    await asyncio.sleep(0.3)
+    assert await served_by(make_request(writer)) == replica_name
+
+
+async def test_write_reaches_other_workers(replica, monkeypatch):
+    # Two workers: this one (bus A) and another with its own RecentWriters (bus B)
+    bus_a = cache.PostgresInvalidationBus(db.ASYNC_DATABASE_URL)
+    bus_b = cache.PostgresInvalidationBus(db.ASYNC_DATABASE_URL)
+    other_worker = bus_b.register(db.RecentWriters(ttl=5))
+    await bus_a.start()
+    await bus_b.start()
+    monkeypatch.setattr(cache, "invalidation_bus", bus_a)
+    try:
+        writer = uuid.uuid4().hex
+        request = make_request(writer)
+        await write_through_session(request)
+
+        key = db._caller_key(request)
+        for _ in range(50):
+            if other_worker.wrote_recently(key):
+                break
+            await asyncio.sleep(0.02)
+        assert other_worker.wrote_recently(key)
+    finally:
+        await bus_a.stop()
+        await bus_b.stop()
+
+
+async def test_current_user_is_loaded_from_the_read_session(replica, user):
+    from app.modules.user.models import User
+    from app.shared.role_checker import get_current_user
+
+    # The same user on the stand-in replica, renamed to tell the copies apart
+    async with db.read_engine.begin() as conn:
+        await conn.run_sync(User.__table__.create, checkfirst=True)
+    async with db.ReadSessionLocal() as session:
+        session.add(User(**{**user.model_dump(), "name": "Replica Copy"}))
+        await session.commit()
+
+    request = make_request(str(user.id))
+    token = request.headers["authorization"].split()[1]
+    assert (await get_current_user(token, request)).name == "Replica Copy"
+
+    await write_through_session(request)
+    assert (await get_current_user(token, request)).name == user.name
@@ -0,0 +1,147 @@
+"""Double-booking checks on admission / reschedule, through the patient API."""
+
+import uuid
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.modules.schedule import service
+from app.modules.schedule.service import _days
+
+DAY = datetime(2032, 1, 5)
+
+
+def at(hour: float) -> datetime:
+    return DAY + timedelta(hours=hour)
+
+
+@pytest.fixture
+def room():
+    """A room nobody else books, so rows left by earlier runs don't clash."""
+    return f"OR-{uuid.uuid4().hex[:8]}"
+
+
+@pytest.fixture
+async def surgeon(database):
+    from app.core.database import SessionLocal
+    from app.modules.user.directory import surgeon_directory
+    from app.modules.user.models import User
+    from app.modules.user.schemas import RoleEnum
+
+    async with SessionLocal() as session:
+        row = User(
+            name=f"Dr {uuid.uuid4().hex[:8]}",
+            email=f"surgeon-{uuid.uuid4().hex}@hospital.com",
+            hashed_password="x",
+            role=RoleEnum.surgical_team,
+        )
+        session.add(row)
+        await session.commit()
+    await surgeon_directory.load()
+    return row
+
+
+async def admit(client, start: datetime, minutes: int = 60, **fields):
+    return await client.post(
+        "/patients/",
+        json={
+            "first_name": "Test",
+            "last_name": "Patient",
+            "address": "1 Test Street",
+            "city": "Testville",
+            "state": "TS",
+            "country": "Testland",
+            "phone": "+10000000000",
+            "email": "family@hospital.com",
+            "procedure": "Appendectomy",
+            "scheduled_time": start.isoformat(),
+            "duration_minutes": minutes,
+            **fields,
+        },
+    )
+
+
+def conflicts(response) -> list[tuple[str, str]]:
+    assert response.status_code == 409, response.text
+    return [
+        (conflict["patient_number"], conflict["reason"])
+        for conflict in response.json()["detail"]["conflicts"]
+    ]
+
+
+async def test_room_clash(client, room):
+    first = await admit(client, at(9), room_no=room)
+    assert first.status_code == 201
+
+    clash = await admit(client, at(9.5), room_no=room)
+
+    assert conflicts(clash) == [(first.json()["patient_number"], "room")]
+
+
+async def test_surgeon_clash(client, room, surgeon):
+    first = await admit(client, at(9), room_no=room, surgeon_name=surgeon.name)
+    assert first.status_code == 201
+
+    clash = await admit(
+        client, at(9.75), room_no=f"{room}-b", surgeon_name=surgeon.name
+    )
+
+    body = clash.json()["detail"]["conflicts"][0]
+    assert conflicts(clash) == [(first.json()["patient_number"], "surgeon")]
+    assert body["surgeon_name"] == surgeon.name
+    assert body["end"] == at(10).isoformat()
+
+
+async def test_back_to_back_cases_fit(client, room, surgeon):
+    fields = {"room_no": room, "surgeon_name": surgeon.name}
+    assert (await admit(client, at(9), **fields)).status_code == 201
+    assert (await admit(client, at(10), **fields)).status_code == 201
+    assert (await admit(client, at(8), **fields)).status_code == 201
+
+
+async def test_rescheduling_onto_its_own_slot(client, room, surgeon):
+    admitted = await admit(client, at(9), room_no=room, surgeon_name=surgeon.name)
+    number = admitted.json()["patient_number"]
+
+    moved = await client.put(
+        f"/patients/{number}",
+        json={"scheduled_time": at(9.25).isoformat(), "duration_minutes": 90},
+    )
+
+    assert moved.status_code == 200, moved.text
+    assert moved.json()["scheduled_time"] == at(9.25).isoformat()
+
+
+async def test_rescheduling_into_another_case(client, room):
+    first = await admit(client, at(9), room_no=room)
+    second = await admit(client, at(11), room_no=room)
+
+    moved = await client.put(
+        f"/patients/{second.json()['patient_number']}",
+        json={"scheduled_time": at(9.5).isoformat()},
+    )
+
+    assert conflicts(moved) == [(first.json()["patient_number"], "room")]
+
+
+async def test_case_running_past_midnight(client, room):
+    late = await admit(client, at(23.5), room_no=room)
+    assert late.status_code == 201
+
+    clash = await admit(client, at(24), room_no=room)
+
+    assert conflicts(clash) == [(late.json()["patient_number"], "room")]
+
+
+async def test_conflict_check_can_be_disabled(client, room, monkeypatch):
+    monkeypatch.setattr(service.settings, "SCHEDULE_CONFLICT_CHECK", False)
+
+    assert (await admit(client, at(9), room_no=room)).status_code == 201
+    assert (await admit(client, at(9), room_no=room)).status_code == 201
+
+
+def test_lock_days_cover_the_whole_case():
+    assert _days(at(9), at(10)) == [date(2032, 1, 5)]
+    assert _days(at(23.5), at(24.5)) == [date(2032, 1, 5), date(2032, 1, 6)]
+    # Ending exactly at midnight doesn't touch the next day
+    assert _days(at(23), at(24)) == [date(2032, 1, 5)]
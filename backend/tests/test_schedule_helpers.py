@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+
+from app.modules.schedule.helpers import busy_minutes, find_overlaps
+
+DAY = datetime(2025, 3, 10)
+
+
+def at(hour: float) -> datetime:
+    return DAY + timedelta(hours=hour)
+
+
+def test_find_overlaps():
+    overlaps = find_overlaps(
+        [
+            (at(8), at(10), "a"),
+            (at(9), at(11), "b"),
+            (at(9.5), at(9.75), "c"),
+            (at(12), at(13), "d"),
+        ]
+    )
+    assert {key: sorted(others) for key, others in overlaps.items()} == {
+        "a": ["b", "c"],
+        "b": ["a", "c"],
+        "c": ["a", "b"],
+    }
+
+
+def test_find_overlaps_back_to_back_intervals_do_not_overlap():
+    # Half-open: a case ending at 10:00 and one starting at 10:00 share the room
+    assert find_overlaps([(at(10), at(11), "b"), (at(8), at(10), "a")]) == {}
+
+
+def test_find_overlaps_empty():
+    assert find_overlaps([]) == {}
+
+
+def test_busy_minutes_counts_overlaps_once():
+    assert busy_minutes([(at(8), at(10)), (at(9), at(11)), (at(9.5), at(9.75))]) == 180
+
+
+def test_busy_minutes_back_to_back_and_gaps():
+    assert busy_minutes([(at(10), at(11)), (at(8), at(10))]) == 180
+    assert busy_minutes([(at(8), at(9)), (at(12), at(12.5))]) == 90
+
+
+def test_busy_minutes_empty():
+    assert busy_minutes([]) == 0
@@ -0,0 +1,88 @@
+from datetime import UTC, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from app.core import scheduler
+from app.core.scheduler import CronSchedule, Job
+
+BERLIN = ZoneInfo("Europe/Berlin")
+
+
+def local(*args, fold: int = 0) -> datetime:
+    return datetime(*args, tzinfo=BERLIN, fold=fold)
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=UTC)
+
+
+def test_next_after():
+    schedule = CronSchedule("15 3 * * *")
+    assert schedule.next_after(datetime(2025, 1, 1, 3, 14)) == datetime(
+        2025, 1, 1, 3, 15
+    )
+    assert schedule.next_after(datetime(2025, 1, 1, 3, 15)) == datetime(
+        2025, 1, 2, 3, 15
+    )
+
+
+def test_day_of_month_or_day_of_week():
+    schedule = CronSchedule("0 9 1 * 1")  # the 1st, and every Monday
+    assert schedule.next_after(datetime(2025, 3, 1, 10)) == datetime(2025, 3, 3, 9)
+    assert schedule.next_after(datetime(2025, 3, 31, 10)) == datetime(2025, 4, 1, 9)
+
+
+@pytest.mark.parametrize("expression", ["* * *", "60 * * * *", "*/0 * * * *"])
+def test_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression)
+
+
+def test_spring_forward_skipped_time_runs_after_the_gap():
+    # 2025-03-30: 02:00 CET -> 03:00 CEST; 02:30 doesn't exist that day
+    schedule = CronSchedule("30 2 * * *")
+    next_run = schedule.next_after(local(2025, 3, 30, 1, 0))
+    assert next_run.astimezone(UTC) == utc(2025, 3, 30, 1, 30)  # 03:30 CEST
+    following = schedule.next_after(next_run)
+    assert following.astimezone(UTC) == utc(2025, 3, 31, 0, 30)
+
+
+def test_spring_forward_hourly_job_waits_an_hour():
+    schedule = CronSchedule("0 * * * *")
+    next_run = schedule.next_after(local(2025, 3, 30, 1, 30))
+    assert next_run.astimezone(UTC) == utc(2025, 3, 30, 1, 0)  # 03:00 CEST
+
+
+def test_fall_back_repeated_time_runs_once():
+    # 2025-10-26: 03:00 CEST -> 02:00 CET; 02:30 happens twice
+    schedule = CronSchedule("30 2 * * *")
+    first = schedule.next_after(local(2025, 10, 26, 1, 0))
+    assert first.astimezone(UTC) == utc(2025, 10, 26, 0, 30)  # 02:30 CEST
+
+    # Not again at 02:30 CET, also when asked during the repeated hour
+    assert schedule.next_after(first).astimezone(UTC) == utc(2025, 10, 27, 1, 30)
+    repeated_hour = local(2025, 10, 26, 2, 10, fold=1)  # 02:10 CET
+    assert schedule.next_after(repeated_hour).astimezone(UTC) == utc(
+        2025, 10, 27, 1, 30
+    )
+
+
+def test_fall_back_next_is_never_in_the_past():
+    schedule = CronSchedule("*/15 * * * *")
+    now = local(2025, 10, 26, 2, 50, fold=1)  # 01:50 UTC
+    next_run = schedule.next_after(now)
+    assert next_run.astimezone(UTC) == utc(2025, 10, 26, 2, 0)  # 03:00 CET
+
+
+def test_seconds_until_next_in_scheduler_timezone(monkeypatch):
+    monkeypatch.setattr(scheduler.settings, "SCHEDULER_TIMEZONE", "Europe/Berlin")
+    job = Job("test", func=None, cron=CronSchedule("30 2 * * *"))
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return utc(2025, 10, 25, 23, 0).astimezone(tz)  # 01:00 CEST
+
+    monkeypatch.setattr(scheduler, "datetime", FrozenDatetime)
+    assert job.seconds_until_next() == timedelta(hours=1, minutes=30).total_seconds()
@@ -0,0 +1,87 @@
+import pytest
+from sqlalchemy import text
+
+from app.modules.status.counters import (
+    Snapshot,
+    StatusCounters,
+    current_transaction_id,
+)
+
+
+def test_snapshot_includes():
+    snapshot = Snapshot.parse("100:105:101,103")
+    assert snapshot == Snapshot(100, 105, frozenset({101, 103}))
+    assert snapshot.includes(99)
+    assert snapshot.includes(102)
+    assert not snapshot.includes(101)  # still running when the snapshot was taken
+    assert not snapshot.includes(105)
+    assert Snapshot.parse("7:7:").in_progress == frozenset()
+
+
+def test_changes_are_counted():
+    counters = StatusCounters(reconcile_interval=60)
+    counters._apply("\x1f\x1fChecked In")
+    counters._apply("\x1f\x1fChecked In")
+    counters._apply("\x1fChecked In\x1fPre-Procedure")
+    assert counters._counts == {"Checked In": 1, "Pre-Procedure": 1}
+
+
+def test_changes_already_in_the_loaded_counts_are_skipped():
+    counters = StatusCounters(reconcile_interval=60)
+    counters._snapshot = Snapshot.parse("100:105:101")
+    counters._apply("99\x1f\x1fChecked In")
+    counters._apply("101\x1f\x1fChecked In")
+    counters._apply("106\x1f\x1fChecked In")
+    assert counters._counts == {"Checked In": 2}
+
+
+async def count(counters: StatusCounters) -> int:
+    await counters.load()
+    return counters._counts.get("Checked In", 0)
+
+
+@pytest.fixture
+async def counters(database):
+    return StatusCounters(reconcile_interval=60)
+
+
+async def change_status(patient, status: str) -> int:
+    """Commits a status change; returns its transaction id."""
+    from app.core.database import SessionLocal
+
+    async with SessionLocal() as session:
+        await session.exec(
+            text("UPDATE patient SET status = :status WHERE id = :id"),
+            params={"status": status, "id": patient.id},
+        )
+        xid = await current_transaction_id(session)
+        await session.commit()
+    return xid
+
+
+async def test_change_loaded_before_it_is_recorded_counts_once(counters, make_patient):
+    patient = await make_patient(status="Pre-Procedure")
+    xid = await change_status(patient, "Checked In")
+
+    loaded = await count(counters)  # already sees the change
+    await counters.record("Pre-Procedure", "Checked In", xid)
+    assert counters._counts["Checked In"] == loaded
+
+
+async def test_change_committed_after_load_is_counted(counters, make_patient):
+    from app.core.database import SessionLocal
+
+    patient = await make_patient(status="Pre-Procedure")
+    async with SessionLocal() as session:
+        await session.exec(
+            text("UPDATE patient SET status = 'Checked In' WHERE id = :id"),
+            params={"id": patient.id},
+        )
+        xid = await current_transaction_id(session)
+
+        loaded = await count(counters)  # doesn't see the uncommitted change
+        await session.commit()
+
+    await counters.record("Pre-Procedure", "Checked In", xid)
+    assert counters._counts["Checked In"] == loaded + 1
+    assert await count(counters) == loaded + 1
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import uuid
+from datetime import UTC, datetime
+
+import pytest
+from sqlalchemy import text
+
+from app.modules.status_logs.service import StatusLogWriter
+
+
+@pytest.fixture
+async def writer(database):
+    writer = StatusLogWriter(
+        "write_behind", batch_size=10, flush_interval_ms=10, queue_size=100
+    )
+    await writer.start()
+    yield writer
+    await writer.stop()
+
+
+async def logged_statuses(patient_id: uuid.UUID) -> list[str]:
+    from app.core.database import SessionLocal
+
+    async with SessionLocal() as session:
+        result = await session.exec(
+            text(
+                "SELECT new_status FROM statuslog WHERE patient_id = :id "
+                "ORDER BY changed_at"
+            ),
+            params={"id": patient_id},
+        )
+        return [row[0] for row in result]
+
+
+async def write(writer, session, patient_id, user_id, new_status) -> None:
+    await writer.write(
+        session,
+        patient_id=patient_id,
+        previous_status=None,
+        new_status=new_status,
+        changed_by=user_id,
+    )
+
+
+async def test_rows_are_queued_only_after_commit(writer, make_patient, user):
+    from app.core.database import SessionLocal
+
+    patient = await make_patient()
+    async with SessionLocal() as session:
+        await session.exec(text("SELECT 1"))  # like the reads before a change
+        await write(writer, session, patient.id, user.id, "Pre-Procedure")
+        await session.rollback()  # the status change failed: no log
+        await writer.committed(session)
+
+        await write(writer, session, patient.id, user.id, "In-progress")
+        assert writer._queue.empty()
+        await session.commit()
+        await writer.committed(session)
+
+    await writer.stop()
+    assert await logged_statuses(patient.id) == ["In-progress"]
+
+
+async def test_rejected_rows_are_dropped_and_the_rest_written(
+    writer, make_patient, user, caplog
+):
+    patient = await make_patient()
+
+    def row(new_status, patient_id=patient.id):
+        return {
+            "id": uuid.uuid4(),
+            "patient_id": patient_id,
+            "previous_status": None,
+            "new_status": new_status,
+            "changed_by": user.id,
+            "changed_at": datetime.now(UTC).replace(tzinfo=None),
+        }
+
+    batch = [
+        row("Pre-Procedure"),
+        row("In-progress", patient_id=uuid.uuid4()),  # no such patient
+        row("Closing"),
+        row("Not a status"),
+        row("Recovery"),
+    ]
+    async with asyncio.timeout(5):
+        await writer._flush_with_retry(batch)
+
+    assert await logged_statuses(patient.id) == [
+        "Pre-Procedure",
+        "Closing",
+        "Recovery",
+    ]
+    dropped = [r for r in caplog.records if "Dropped status log row" in r.message]
+    assert len(dropped) == 2
+
+
+async def test_stop_during_a_flush_writes_every_row_once(
+    writer, make_patient, user, monkeypatch, caplog
+):
+    from app.core.database import SessionLocal
+    from app.modules.status_logs import service
+
+    # The first batch's insert commits, then the flusher hangs evicting the
+    # analytics cache: stop() cancels it there
+    inserted, invalidate = asyncio.Event(), service.invalidate_analytics
+
+    async def hang_once(days):
+        if not inserted.is_set():
+            inserted.set()
+            await asyncio.Event().wait()
+        await invalidate(days)
+
+    monkeypatch.setattr(service, "invalidate_analytics", hang_once)
+
+    patient = await make_patient()
+    async with SessionLocal() as session:
+        for _ in range(15):  # batch_size is 10
+            await write(writer, session, patient.id, user.id, "Pre-Procedure")
+        await session.commit()
+        await writer.committed(session)
+
+    async with asyncio.timeout(5):
+        await inserted.wait()
+        await writer.stop()
+
+    assert await logged_statuses(patient.id) == ["Pre-Procedure"] * 15
+    assert not [r for r in caplog.records if r.levelno >= logging.ERROR]
@@ -0,0 +1,92 @@
+import asyncio
+import uuid
+
+import orjson
+import pytest
+
+from app.modules.user.directory import SurgeonDirectory
+from app.modules.user.schemas import RoleEnum
+
+
+async def add_user_out_of_band(name: str, role=RoleEnum.surgical_team):
+    """Inserts a user with Core, bypassing the ORM hooks that reload directories."""
+    from app.core.database import SessionLocal
+    from app.modules.user.models import User
+
+    user_id = uuid.uuid4()
+    async with SessionLocal() as session:
+        await session.exec(
+            User.__table__.insert().values(
+                id=user_id,
+                name=name,
+                email=f"{user_id.hex}@hospital.com",
+                hashed_password="x",
+                role=role,
+            )
+        )
+        await session.commit()
+    return user_id
+
+
+@pytest.fixture
+async def directory(database):
+    directory = SurgeonDirectory(ttl=300)
+    await directory.load()
+    return directory
+
+
+async def test_resolve_reloads_for_an_unknown_id(directory):
+    name = f"Dr {uuid.uuid4().hex[:8]}"
+    surgeon_id = await add_user_out_of_band(name)
+    assert directory.name_for(surgeon_id) is None  # loaded moments ago: no reload
+
+    await directory.resolve([surgeon_id, None])
+
+    assert directory.name_for(surgeon_id) == name
+    assert await directory.surgeon_ids(name) == [surgeon_id]
+
+
+async def test_concurrent_resolves_share_one_reload(directory, monkeypatch):
+    surgeon_id = await add_user_out_of_band(f"Dr {uuid.uuid4().hex[:8]}")
+    loads = 0
+    load = directory.load
+
+    async def counting_load():
+        nonlocal loads
+        loads += 1
+        await load()
+
+    monkeypatch.setattr(directory, "load", counting_load)
+    await asyncio.gather(*(directory.resolve([surgeon_id]) for _ in range(5)))
+
+    assert loads == 1
+    await directory.resolve([surgeon_id])  # known now: no reload
+    assert loads == 1
+
+
+async def test_surgeon_ids_only_list_the_surgical_team(directory):
+    name = f"Dr {uuid.uuid4().hex[:8]}"
+    first = await add_user_out_of_band(name)
+    second = await add_user_out_of_band(name)
+    admin = await add_user_out_of_band(name, role=RoleEnum.admin)
+    await directory.load()
+
+    assert sorted(await directory.surgeon_ids(name)) == sorted([first, second])
+    assert set(directory.ids_matching(name.upper())) == {first, second, admin}
+
+
+async def test_cached_patient_carries_a_new_surgeon_name(make_patient):
+    from app.core.database import SessionLocal
+    from app.modules.patient.service import PatientService
+    from app.modules.user.directory import surgeon_directory
+
+    await surgeon_directory.load()
+    name = f"Dr {uuid.uuid4().hex[:8]}"
+    patient = await make_patient(surgeon_id=await add_user_out_of_band(name))
+
+    async with SessionLocal() as session:
+        body = await PatientService(session).retrieve_patient_json(
+            patient.patient_number
+        )
+
+    assert orjson.loads(body)["surgeon_name"] == name
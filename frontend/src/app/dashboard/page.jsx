@@ -1,6 +1,6 @@
 'use client';
 
-import { useEffect, useState } from 'react';
+import { useEffect, useRef, useState } from 'react';
 import { useRouter } from 'next/navigation';
 import { useAuth } from '@/contexts/AuthContext';
 import { Button } from '@/components/ui/Button';
@@ -23,27 +23,38 @@ export default function DashboardPage() {
   const [overview, setOverview] = useState(null);
   const [activity, setActivity] = useState(null);
   const [breakdown, setBreakdown] = useState([]);
+  // Timestamp of the newest status change we have; refreshes only fetch newer ones
+  const latestChangeRef = useRef(null);
 
   const fetchDashboardData = async () => {
     setDataLoading(true);
     try {
-      const [ovRes, actRes, brRes] = await Promise.all([
-        fetch(`${API_BASE_URL}/analytics/overview?start_date=${startDate}&end_date=${endDate}`),
-        fetch(`${API_BASE_URL}/analytics/recent-activity`),
-        fetch(`${API_BASE_URL}/analytics/status-breakdown`),
-      ]);
-
-      const [overviewData, activityData, breakdownData] = await Promise.all([
-        ovRes.json(),
-        actRes.json(),
-        brRes.json(),
-      ]);
-
-      setOverview(overviewData);
-      setActivity(activityData);
-      setBreakdown(
-        breakdownData.sort((a, b) => a.order_index - b.order_index)
+      // One request; the backend runs the sections concurrently and returns
+      // null for any section that failed or timed out (see `errors`)
+      const since = latestChangeRef.current
+        ? `&since=${encodeURIComponent(latestChangeRef.current)}`
+        : '';
+      const res = await fetch(
+        `${API_BASE_URL}/analytics/dashboard?start_date=${startDate}&end_date=${endDate}${since}`
       );
+      const data = await res.json();
+
+      if (data.errors && Object.keys(data.errors).length) {
+        console.warn('Some dashboard sections failed:', data.errors);
+      }
+      if (data.overview) setOverview(data.overview);
+      if (data.recent_activity) {
+        const recent = data.recent_activity;
+        latestChangeRef.current = recent.latest;
+        setActivity((prev) => ({
+          ...recent,
+          status_changes: [
+            ...recent.status_changes,
+            ...(since && prev ? prev.status_changes : []),
+          ].slice(0, 50),
+        }));
+      }
+      if (data.status_breakdown) setBreakdown(data.status_breakdown);
     } catch (err) {
       console.error('Failed to load dashboard data:', err);
     } finally {
@@ -236,8 +247,8 @@ export default function DashboardPage() {
             <h3 className="font-semibold text-lg mb-2">Recent Activity</h3>
             <ul className="text-sm text-gray-700 space-y-1">
               <li><span className="text-green-600 font-medium">●</span> Completed Surgeries: {activity?.completed_today?.length ?? '-'}</li>
-              <li><span className="text-blue-600 font-medium">●</span> Status Changes: {activity?.status_changes?.length ?? '-'}</li>
-              <li><span className="text-yellow-600 font-medium">●</span> Active Cases: {activity?.active_cases?.length ?? '-'}</li>
+              <li><span className="text-blue-600 font-medium">●</span> Status Changes: {activity?.status_change_count ?? '-'}</li>
+              <li><span className="text-yellow-600 font-medium">●</span> Active Cases: {activity?.active_case_count ?? '-'}</li>
             </ul>
           </CardContent>
         </Card>
@@ -1,6 +1,6 @@
 "use client";
 
-import React, { useState } from "react";
+import React, { useRef, useState } from "react";
 import { useRouter } from "next/navigation";
 import toast from "react-hot-toast";
 
@@ -61,9 +61,12 @@ export default function AddPatient() {
 
   const [errors, setErrors] = useState({});
   const [isSubmitting, setIsSubmitting] = useState(false);
+  // Re-sent when a submit of the same form is retried, so the API admits once
+  const idempotencyKey = useRef(null);
 
   const handleInputChange = (e) => {
     const { name, value } = e.target;
+    idempotencyKey.current = null;
     setFormData((prev) => ({ ...prev, [name]: value }));
     if (errors[name]) setErrors((prev) => ({ ...prev, [name]: "" }));
   };
@@ -103,6 +106,7 @@ export default function AddPatient() {
     }
 
     setIsSubmitting(true);
+    idempotencyKey.current ??= crypto.randomUUID();
     try {
       const token = localStorage.getItem("access_token");
       const payload = {
@@ -117,6 +121,7 @@ export default function AddPatient() {
         headers: {
           "Content-Type": "application/json",
           Authorization: `Bearer ${token}`,
+          "Idempotency-Key": idempotencyKey.current,
         },
         body: JSON.stringify(payload),
       });